@@ -4,19 +4,15 @@ Minimal Flask app for LLMs.txt generation
 """
 
 from flask import Flask, render_template, jsonify, request, send_from_directory
-from openai import OpenAI
 import os
 from pathlib import Path
-import internal_scaping
-import external_scaping
-import llms_txt_generation
-import verify
+import flm_pipeline
+import llm_client
+from certificate import DEFAULT_COMMITMENT
 
 from dotenv import load_dotenv
 load_dotenv()
 
-client = OpenAI()
-
 
 app = Flask(__name__)
 
@@ -33,14 +29,19 @@ def explainer():
 @app.route('/api/flm')
 def flm():
     domain = request.args.get('domain')
-    internal_links = internal_scaping.get_summaries(domain)
-    external_links = external_scaping.get_external_links(domain, domain.replace('.', ' ').rstrip('https://'))
-    certificates = verify.get_certificates(external_links)
-    summary = internal_scaping.create_summary(internal_links)
-    llmstxt = llms_txt_generation.create_llms_txt(domain, summary, internal_links, external_links, certificates)
+    # ?incremental=1 reuses the previous run and only regenerates changed pages
+    incremental = request.args.get('incremental') == '1'
+    # ?commitment=merkle signs only a Merkle root and writes per-link inclusion proofs
+    commitment = request.args.get('commitment', DEFAULT_COMMITMENT)
+    llmstxt = flm_pipeline.build_llms_txt(domain, incremental=incremental, commitment=commitment)
 
     return jsonify(llmstxt)
 
+@app.route('/api/llm-stats')
+def llm_stats():
+    """LLM calls made by this process: latency, tokens, retries and cost per call site"""
+    return jsonify(llm_client.stats())
+
 
 
 if __name__ == '__main__':
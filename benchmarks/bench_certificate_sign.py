@@ -0,0 +1,48 @@
+"""
+Certificate issuance throughput: fresh key per call vs cached signer vs batch.
+
+"before" reproduces the old `certificate.sign`, which generated a new
+2048-bit RSA key for every certificate.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_certificate_sign [n_certs] [links_per_cert]
+"""
+import sys
+import time
+
+import certificate
+
+
+def make_pairs(n: int, links: int):
+    return [(f"https://example.com/page-{i}", [f"https://partner-{j}.example.org/doc" for j in range(links)])
+            for i in range(n)]
+
+
+def run(n: int = 50, links: int = 5):
+    pairs = make_pairs(n, links)
+    signer = certificate.get_signer()
+
+    def before():
+        for url, verified in pairs:
+            certificate.Signer.generate().issue(url, verified)
+
+    def after():
+        for url, verified in pairs:
+            signer.issue(url, verified)
+
+    def batch():
+        signer.issue_many(pairs)
+
+    print(f"{n} certificates, {links} forward links each")
+    print(f"{'Mode':<28} {'certs/s':<10} {'ms/cert':<10}")
+    print("-" * 48)
+    for name, fn in (("before (fresh key per call)", before), ("after (cached key)", after),
+                     ("after (issue_many batch)", batch)):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<28} {n / elapsed:<10.1f} {elapsed / n * 1000:<10.2f}")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,81 @@
+"""
+Accuracy and latency of chunked vs whole-document similarity.
+
+Every synthetic page starts with ~400 words of navigation markup, like the
+raw HTML `verify.normalize` keeps, so whole-document encoding only ever sees
+the menu. Accuracy is the fraction of (related, unrelated) pairs where the
+related pair scores higher.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_chunked_similarity
+"""
+import itertools
+import random
+import tempfile
+import time
+
+import verify
+from embedding_cache import EmbeddingCache
+
+TOPICS = {
+    "fitness": "Strength training builds muscle and bone density. A balanced workout plan mixes "
+               "resistance exercise, cardio and mobility work, with rest days for recovery. "
+               "Personal trainers track progressive overload, heart rate zones and protein intake.",
+    "finance": "Index funds spread investment risk across the whole market at low fees. Investors "
+               "compare expense ratios, dividend yields and tax treatment before buying shares, and "
+               "rebalance their portfolio when bond and stock allocations drift.",
+    "cooking": "Slow braising turns tough cuts of beef tender. Brown the meat, deglaze the pan with "
+               "wine, add stock and aromatics, then simmer covered for hours. Season the sauce and "
+               "reduce it before serving with mashed potatoes.",
+    "astronomy": "Telescopes collect light from distant galaxies and nebulae. Astronomers measure "
+                 "redshift to estimate how fast galaxies recede, and study exoplanet transits to "
+                 "infer planet sizes and orbital periods around other stars.",
+    "gardening": "Tomatoes need full sun, rich compost and steady watering. Gardeners prune suckers, "
+                 "stake the vines, rotate beds each season to limit blight, and mulch to keep soil "
+                 "moisture even during hot summer weeks.",
+}
+
+NAV_WORDS = ("home about products pricing blog careers contact login signup support docs "
+             "<li> <a href=/menu> </a> </li> <div class=nav> </div> search cart account").split()
+
+
+def make_page(topic: str, rng: random.Random) -> str:
+    nav = " ".join(rng.choice(NAV_WORDS) for _ in range(400))
+    sentences = TOPICS[topic].split(". ")
+    rng.shuffle(sentences)
+    return verify.normalize(f"{nav} <main> {'. '.join(sentences)} </main>")
+
+
+def run(pages_per_topic: int = 3, seed: int = 0):
+    rng = random.Random(seed)
+    pages = [(topic, make_page(topic, rng)) for topic in TOPICS for _ in range(pages_per_topic)]
+    pairs = list(itertools.combinations(range(len(pages)), 2))
+
+    # Isolated cache so the first pass is cold and the second is warm
+    cache = EmbeddingCache(verify.MODEL_NAME, cache_dir=tempfile.mkdtemp())
+    verify.get_embedding_cache = lambda: cache
+    verify.get_model()  # exclude model load from timings
+
+    modes = {
+        "whole-doc": lambda a, b: verify.similarity(a, b),
+        "chunked-max": lambda a, b: verify.similarity(a, b, chunked=True, pool="max"),
+        "chunked-mean": lambda a, b: verify.similarity(a, b, chunked=True, pool="mean"),
+    }
+    print(f"{len(pages)} pages, {len(pairs)} pairs")
+    print(f"{'Mode':<14} {'Accuracy':<10} {'Cold ms/pair':<14} {'Warm ms/pair':<14}")
+    print("-" * 54)
+    for name, fn in modes.items():
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            scores = {(i, j): fn(pages[i][1], pages[j][1]) for i, j in pairs}
+            timings.append((time.perf_counter() - start) / len(pairs) * 1000)
+
+        related = [s for (i, j), s in scores.items() if pages[i][0] == pages[j][0]]
+        unrelated = [s for (i, j), s in scores.items() if pages[i][0] != pages[j][0]]
+        accuracy = sum(r > u for r in related for u in unrelated) / (len(related) * len(unrelated))
+        print(f"{name:<14} {accuracy:<10.3f} {timings[0]:<14.2f} {timings[1]:<14.2f}")
+
+
+if __name__ == "__main__":
+    run()
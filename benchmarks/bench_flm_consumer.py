@@ -0,0 +1,122 @@
+"""
+Bulk FLM consumer against a local fake-domain server.
+
+Every "site-<i>.test" domain resolves to 127.0.0.1 (StaticResolver); the
+server answers by Host header: a third serve /flm.txt, a third only
+/.well-known/flm.txt and the rest 404. Responses carry an ETag and wait
+`latency` seconds to mimic a remote host.
+
+Rows: sequential baseline (concurrency 1), cold poll, re-poll (304s),
+and an interrupted run followed by a resume.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_flm_consumer [n_domains] [latency_ms]
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from link_harvesting.flm_consumer import BulkFLMConsumer, SQLiteStore, StaticResolver
+
+
+def fake_manifest(domain: str) -> str:
+    lines = [f"# {domain}", "User-agent: *", "Allow: /"]
+    for j in range(5):
+        url = f"https://partner-{j}.example.org/{domain}.pdf"
+        lines += [f"Forward: {url}", f"Digest-SHA256: {url} {hashlib.sha256(url.encode()).hexdigest()}"]
+    return "\n".join(lines) + "\n"
+
+
+def make_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            domain = self.headers.get("Host", "").split(":")[0]
+            i = int(domain.split("-")[1].split(".")[0]) if domain.startswith("site-") else -1
+            path = ("/flm.txt", "/.well-known/flm.txt", None)[i % 3] if i >= 0 else None
+            if self.path != path:
+                return self._send(404, b"")
+            body = fake_manifest(domain).encode()
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, b"", etag)
+            self._send(200, body, etag)
+
+        def _send(self, status, body, etag=None):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 1024   # the default backlog of 5 drops connections under load
+
+        def handle_error(self, request, client_address):
+            pass                        # clients dropping idle keep-alive connections
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(n: int = 2_000, latency_ms: int = 20):
+    server = make_server(latency_ms / 1000)
+    template = f"http://{{domain}}:{server.server_address[1]}"
+    domains = [f"site-{i}.test" for i in range(n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def poll(db, concurrency=100, items=domains, resume=True, stop_after=None):
+            store = SQLiteStore(os.path.join(tmp, db))
+            consumer = BulkFLMConsumer(store, concurrency=concurrency, url_template=template,
+                                       resolver=StaticResolver())
+
+            async def go():
+                if stop_after is None:
+                    return await consumer.run(items, resume=resume)
+                try:
+                    # Small inputs can finish before stop_after
+                    return await asyncio.wait_for(consumer.run(items, resume=resume), stop_after)
+                except asyncio.TimeoutError:
+                    return dict(consumer.stats, interrupted=True)
+
+            start = time.perf_counter()
+            stats = asyncio.run(go())
+            store.close()
+            return time.perf_counter() - start, stats
+
+        print(f"{n} fake domains, {latency_ms} ms server latency")
+        print(f"{'Run':<28} {'seconds':<9} {'domains/s':<11} stats")
+        print("-" * 90)
+
+        def row(name, seconds, stats, count=n):
+            stats = {k: v for k, v in stats.items() if k != "seconds"}
+            print(f"{name:<28} {seconds:<9.2f} {count / seconds:<11.0f} {stats}")
+
+        sample = domains[: max(n // 20, 10)]
+        row("sequential (1 in flight)", *poll("seq.db", concurrency=1, items=sample), count=len(sample))
+        row("cold poll", *poll("flm.db"))
+        row("re-poll (conditional)", *poll("flm.db"))
+
+        seconds, stats = poll("resume.db", stop_after=0.5)
+        fetched = sum(v for k, v in stats.items() if k not in ("skipped", "interrupted"))
+        row("interrupted after 0.5s", seconds, stats, count=fetched)
+        row("resumed", *poll("resume.db"))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:3]))
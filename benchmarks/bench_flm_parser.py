@@ -0,0 +1,96 @@
+"""
+Parse throughput of flm_parser on a synthetic manifest corpus, plus
+export/load speed of the JSONL and indexed binary formats.
+
+The "legacy regex" row runs the two regexes LLMSTxtAnalyzer used before
+the parser existed (bare URLs + markdown links, which double-counts).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_flm_parser [n_manifests]
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+import flm_parser
+
+_URL_RE = re.compile(r'https?://[^\s<>"{}|\\^`[\]]+[^\s<>"{}|\\^`[\].,;:!?)]')
+_MD_RE = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+
+
+def make_manifest(i: int, rng: random.Random) -> str:
+    domain = f"site-{i}.example.com"
+    lines = [f"# {domain}", f"> Documentation and resources for {domain}.", ""]
+    if i % 2:
+        # flm.txt style
+        lines += ["User-agent: llm-search-bot", "Disallow: /drafts/", "Allow: /", ""]
+        for j in range(rng.randint(5, 40)):
+            url = f"https://partner-{j}.example.org/doc-{i}.pdf"
+            lines.append(f"Forward: {url}")
+            lines.append(f"Digest-SHA256: {url} {rng.getrandbits(256):064x}")
+    for s in range(rng.randint(2, 6)):
+        lines += ["", f"## Section {s}", "Some prose describing this part of the site without links."]
+        for j in range(rng.randint(5, 30)):
+            lines.append(f"- [Page {j}](https://{domain}/s{s}/p{j}): see also https://ref-{j}.example.net/x")
+    return "\n".join(lines) + "\n"
+
+
+def legacy_extract(content: str):
+    urls = _URL_RE.findall(content)
+    urls += [url for _, url in _MD_RE.findall(content) if url.startswith("http")]
+    return urls
+
+
+def run(n: int = 5_000, seed: int = 0):
+    rng = random.Random(seed)
+    corpus = [make_manifest(i, rng) for i in range(n)]
+    mb = sum(len(t) for t in corpus) / 1e6
+    print(f"{n} manifests, {mb:.1f} MB")
+    print(f"{'Step':<26} {'seconds':<10} {'manifests/s':<14} {'MB/s':<8}")
+    print("-" * 60)
+
+    def row(name, seconds):
+        print(f"{name:<26} {seconds:<10.3f} {n / seconds:<14.0f} {mb / seconds:<8.1f}")
+
+    start = time.perf_counter()
+    for text in corpus:
+        legacy_extract(text)
+    row("legacy regex (links only)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    manifests = [flm_parser.parse_manifest(text) for text in corpus]
+    row("parse_manifest", time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl, index = os.path.join(tmp, "m.jsonl"), os.path.join(tmp, "m.flmidx")
+
+        start = time.perf_counter()
+        flm_parser.write_jsonl(manifests, jsonl)
+        row("write_jsonl", time.perf_counter() - start)
+        start = time.perf_counter()
+        sum(1 for _ in flm_parser.read_jsonl(jsonl))
+        row("read_jsonl", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        flm_parser.write_index(manifests, index)
+        row("write_index", time.perf_counter() - start)
+        with flm_parser.ManifestIndex(index) as loaded:
+            start = time.perf_counter()
+            sum(1 for _ in loaded)
+            row("ManifestIndex scan", time.perf_counter() - start)
+            picks = [rng.randrange(n) for _ in range(1_000)]
+            start = time.perf_counter()
+            for i in picks:
+                loaded[i]
+            elapsed = time.perf_counter() - start
+            print(f"{'ManifestIndex random get':<26} {elapsed / len(picks) * 1e6:.1f} us/record")
+
+        print(f"\nSizes: text {mb:.1f} MB, jsonl {os.path.getsize(jsonl) / 1e6:.1f} MB, "
+              f"index {os.path.getsize(index) / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,107 @@
+"""
+Output formatter time and peak RSS: whole-document writes vs streaming writers.
+
+"legacy" reproduces the formatters before streaming: every page is held
+in a list, the whole {"metadata", "pages"} document is built in memory and
+written with json.dump(indent=2) / pure-Python yaml.dump, and llms.txt /
+llms-full.txt take two passes. "stream" feeds pages one at a time from a
+generator into open_stream() writers, as LLMSGenerator.run does.
+
+Each case runs in a fresh process so peak RSS is not shared between rows.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_formatters [n_pages ...]     (default: 10000 100000)
+"""
+import json
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import yaml
+
+CONTENT_CHARS = 2_000
+LEGACY_YAML_LIMIT = 20_000   # pure-Python yaml.dump beyond this takes minutes
+
+
+def make_pages(n: int):
+    from crawl_to_llm.data_models import Page
+    body = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 40)[:CONTENT_CHARS]
+    for i in range(n):
+        yield Page(url=f"https://example.com/docs/page-{i}", title=f"Page {i}", content=f"# Page {i}\n\n{body}",
+                   word_count=300, description=f"Description of page {i}.", metadata={"title": f"Page {i}", "depth": i % 5})
+
+
+def legacy_write(fmt: str, pages, metadata, out_dir):
+    domain = "example.com"
+    if fmt == "text":
+        with open(os.path.join(out_dir, f"{domain}-llms.txt"), "w", encoding="utf-8") as f:
+            f.write(f"# {domain}\n\n> Generated from {len(pages)} pages.\n\n")
+            for page in pages:
+                f.write(f"- [{page.title}]({page.url}): {page.description}\n")
+        with open(os.path.join(out_dir, f"{domain}-llms-full.txt"), "w", encoding="utf-8") as f:
+            for i, page in enumerate(pages, 1):
+                f.write(f"---\n## Page {i}: {page.title}\n**URL:** {page.url}\n\n{page.content}\n\n")
+        return
+    doc = {"metadata": metadata, "pages": [page.model_dump() for page in pages]}
+    with open(os.path.join(out_dir, f"{domain}.{fmt}"), "w", encoding="utf-8") as f:
+        if fmt == "json":
+            json.dump(doc, f, indent=2)
+        else:
+            yaml.dump(doc, f, Dumper=yaml.Dumper, default_flow_style=False, sort_keys=False)
+
+
+def case(mode: str, fmt: str, n: int, queue):
+    import logging
+    from crawl_to_llm.formatter import JsonFormatter, JsonlFormatter, TextFormatter, YamlFormatter
+    formatters = {"text": TextFormatter, "json": JsonFormatter, "yaml": YamlFormatter, "jsonl": JsonlFormatter}
+    logging.disable(logging.INFO)
+    metadata = {"base_url": "https://example.com", "crawl_strategy": "systematic",
+                "ai_provider": "openai", "page_count": 0, "site_name": "example.com"}
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        if mode == "legacy":
+            pages = list(make_pages(n))
+            metadata["page_count"] = len(pages)
+            legacy_write(fmt, pages, metadata, out_dir)
+        else:
+            with formatters[fmt](out_dir).open_stream(metadata) as writer:
+                for page in make_pages(n):
+                    writer.add(page)
+        seconds = time.perf_counter() - start
+        size = sum(os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir))
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((seconds, peak_mb, size / 1e6))
+
+
+def measure(mode: str, fmt: str, n: int):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=case, args=(mode, fmt, n, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def run(*sizes: int):
+    sizes = sizes or (10_000, 100_000)
+    print(f"YAML dumper for streaming: {'libyaml CDumper' if yaml.__with_libyaml__ else 'pure Python'}")
+    print(f"{'pages':<8} {'format':<7} {'mode':<7} {'seconds':<9} {'pages/s':<10} {'peak RSS MB':<12} {'output MB':<9}")
+    print("-" * 68)
+    for n in sizes:
+        for fmt in ("text", "json", "yaml", "jsonl"):
+            for mode in ("legacy", "stream"):
+                if mode == "legacy" and fmt == "jsonl":
+                    continue
+                if mode == "legacy" and fmt == "yaml" and n > LEGACY_YAML_LIMIT:
+                    print(f"{n:<8} {fmt:<7} {mode:<7} skipped (pure-Python yaml.dump above {LEGACY_YAML_LIMIT} pages)")
+                    continue
+                seconds, peak, size = measure(mode, fmt, n)
+                print(f"{n:<8} {fmt:<7} {mode:<7} {seconds:<9.2f} {n / seconds:<10.0f} {peak:<12.0f} {size:<9.0f}")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:]))
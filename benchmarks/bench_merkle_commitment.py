@@ -0,0 +1,42 @@
+"""
+Hash-list vs Merkle-root certificates for large forward-link lists.
+
+Reports issue time, certificate size and the cost of checking a single URL
+against a freshly parsed certificate (what a crawler pays per manifest).
+
+Usage (from the repo root):
+    python -m benchmarks.bench_merkle_commitment [sizes...]
+"""
+import json
+import sys
+import time
+
+import certificate
+
+
+def run(sizes=(1_000, 10_000, 50_000), checks: int = 100):
+    signer = certificate.get_signer()
+    print(f"{'Links':<8} {'Mode':<8} {'Issue ms':<10} {'Cert KB':<10} {'Proof B':<10} {'Check us':<10}")
+    print("-" * 60)
+    for n in sizes:
+        urls = [f"https://partner-{i}.example.org/whitepaper-{i}.pdf" for i in range(n)]
+        probe = urls[n // 2]
+        for mode in ("hashes", "merkle"):
+            start = time.perf_counter()
+            issued = signer.issue("https://example.com", urls, commitment=mode)
+            issue_ms = (time.perf_counter() - start) * 1000
+
+            proof = issued.proofs[probe] if issued.proofs else None
+            start = time.perf_counter()
+            for _ in range(checks):
+                certificate.clear_certificate_cache()
+                assert certificate.verify_inclusion(issued.cert_pem, probe, proof)
+            check_us = (time.perf_counter() - start) / checks * 1e6
+
+            proof_bytes = len(json.dumps(proof)) if proof else 0
+            print(f"{n:<8} {mode:<8} {issue_ms:<10.1f} {len(issued.cert_pem) / 1024:<10.1f} "
+                  f"{proof_bytes:<10} {check_us:<10.1f}")
+
+
+if __name__ == "__main__":
+    run(tuple(int(a) for a in sys.argv[1:]) or (1_000, 10_000, 50_000))
@@ -0,0 +1,87 @@
+"""
+Peak RSS of holding crawled pages: inline content vs spilled to a PageStore.
+
+Both modes build N Page objects and keep them alive (as a crawl that
+collects pages, or pages queued between stages, would), then read every
+page's content back once. "inline" stores content on the Page; "store"
+writes it to a PageStore and keeps only the handle. Also compares word
+counting by str.split() against count_words() on one large page.
+
+Each case runs in a fresh process so peak RSS is not shared between rows.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_page_store [n_pages ...]     (default: 10000 50000)
+"""
+import multiprocessing as mp
+import resource
+import sys
+import time
+import tracemalloc
+
+CONTENT_CHARS = 20_000
+
+
+def body(i: int) -> str:
+    # Distinct per page, so nothing is shared between pages
+    return f"# Page {i}\n\n" + (f"Lorem ipsum dolor sit amet {i}, consectetur adipiscing elit. " * 400)[:CONTENT_CHARS]
+
+
+def case(mode: str, n: int, queue):
+    from crawl_to_llm.data_models import Page
+    from crawl_to_llm.page_store import PageStore
+    store = PageStore() if mode == "store" else None
+    start = time.perf_counter()
+    pages = []
+    for i in range(n):
+        content = body(i)
+        if store is None:
+            pages.append(Page(url=f"https://example.com/{i}", title=f"Page {i}", content=content, word_count=0))
+        else:
+            pages.append(Page(url=f"https://example.com/{i}", title=f"Page {i}", content="",
+                              content_ref=store.put(content), word_count=0))
+    chars = sum(len(page.read_content()) for page in pages)
+    seconds = time.perf_counter() - start
+    if store is not None:
+        store.close()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((seconds, peak_mb, chars / 1e6))
+
+
+def measure(mode: str, n: int):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=case, args=(mode, n, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def word_count_row():
+    from crawl_to_llm.page_store import count_words
+    text = body(0) * 50      # ~1 MB page
+    for name, fn in (("str.split", lambda t: len(t.split())), ("count_words", count_words)):
+        start = time.perf_counter()
+        fn(text)
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        words = fn(text)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<12} {words} words in {seconds * 1000:.1f} ms, {peak / 1024:.0f} KB allocated at peak")
+
+
+def run(*sizes: int):
+    sizes = sizes or (10_000, 50_000)
+    print(f"{'pages':<8} {'mode':<7} {'seconds':<9} {'peak RSS MB':<12} {'content MB':<10}")
+    print("-" * 50)
+    for n in sizes:
+        for mode in ("inline", "store"):
+            seconds, peak, chars = measure(mode, n)
+            print(f"{n:<8} {mode:<7} {seconds:<9.2f} {peak:<12.0f} {chars:<10.0f}")
+    print()
+    word_count_row()
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:]))
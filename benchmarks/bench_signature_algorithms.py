@@ -0,0 +1,41 @@
+"""
+Sign/verify throughput for RSA-2048 vs Ed25519 trust links.
+
+Measures payload signing and verification (what an LLM crawler does per
+manifest), full certificate issuance and certificate signature checks.
+
+Usage (from the repo root):
+    python -m benchmarks.bench_signature_algorithms [n]
+"""
+import sys
+import time
+
+import certificate
+
+
+def rate(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def run(n: int = 500):
+    links = [f"https://partner-{i}.example.org/doc" for i in range(5)]
+    print(f"{'Algorithm':<10} {'payload sign/s':<16} {'payload verify/s':<18} {'cert issue/s':<14} {'cert verify/s':<14}")
+    print("-" * 74)
+    for name in certificate.SIGNATURE_ALGORITHMS:
+        signer = certificate.Signer.generate(name)
+        issued = signer.issue("https://example.com", links)
+        public_key = signer.public_key
+        data = b'{"url": "https://example.com"}'
+
+        sign_rate = rate(lambda: signer._sign_bytes(data), n)
+        verify_rate = rate(lambda: certificate.verify_payload(issued.payload, issued.signature, public_key), n)
+        issue_rate = rate(lambda: signer.issue("https://example.com", links), n)
+        cert_rate = rate(lambda: certificate.verify_certificate_signature(issued.cert_pem), n)
+        print(f"{name:<10} {sign_rate:<16.0f} {verify_rate:<18.0f} {issue_rate:<14.0f} {cert_rate:<14.0f}")
+
+
+if __name__ == "__main__":
+    run(*(int(a) for a in sys.argv[1:2]))
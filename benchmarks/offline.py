@@ -0,0 +1,429 @@
+"""
+Offline stand-ins for OpenAI and live websites, for reproducible end-to-end runs.
+
+- FakeOpenAI: an OpenAI-compatible /v1/chat/completions endpoint with
+  configurable latency, token counts, 429 injection and a server-side
+  concurrency limit. Answers are deterministic functions of the prompt and
+  take the JSON shapes the pipeline asks for.
+- SyntheticSite: a deterministic website with a configurable page count
+  and link graph, robots.txt, sitemaps (an index once there are more than
+  SITEMAP_CHUNK pages), llms.txt, flm.txt, ETags and 304s. update() changes
+  pages so incremental runs have something to find.
+- ManifestCorpus: many llms.txt files on one host (for LLMSTxtAnalyzer).
+- offline(): serves both from a background thread and flips the switch:
+  OPENAI_BASE_URL / OPENAI_API_KEY point llm_client (internal_scaping,
+  link_harvester) and AIEnhancer at the fake server, and SITE_SCHEME=http
+  makes the scripts that build https://{domain} URLs reach the local
+  sites. WebCrawler needs no switch: give it the site's URL. With several
+  sites, the first links to (and web search finds) the others, which play
+  the external web.
+
+    with offline(sites=[SyntheticSite(pages=200)], llm=FakeOpenAI(latency=0.2)) as harness:
+        internal_scaping.get_summaries(harness.sites[0].url, max_scapes=50)
+        print(harness.llm.stats())
+
+Usage (from the repo root), to serve and print the switch for other shells:
+    python -m benchmarks.offline [--pages 200] [--sites 1] [--latency 0.2] [--rate-429 0.05]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from email.utils import formatdate
+from typing import Dict, List, Optional, Sequence
+
+from aiohttp import web
+
+SITEMAP_CHUNK = 500     # URLs per sitemap file; larger sites get a sitemap index
+WORDS = ("data", "model", "pipeline", "crawler", "manifest", "latency", "token", "cache", "index", "vector",
+         "summary", "forward", "digest", "browser", "queue", "budget", "schema", "request", "signal", "page",
+         "archive", "network", "release", "feature", "pricing", "account", "support", "guide", "report", "team")
+NAV = "Home | Docs | Blog | Pricing | Careers | Contact"
+FOOTER = "© Synthetic Inc. All rights reserved. Privacy policy · Terms of service · Cookie settings"
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+class _Server(ABC):
+    """An aiohttp application bound to 127.0.0.1 on a free port."""
+
+    def __init__(self):
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @abstractmethod
+    def app(self) -> web.Application:
+        """Build the aiohttp application to serve."""
+
+    async def start(self):
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port or 0).start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class FakeOpenAI(_Server):
+    """
+    OpenAI-compatible chat completions with controllable performance.
+
+    Args:
+        latency: Seconds before every answer.
+        token_latency: Extra seconds per completion token (generation speed).
+        jitter: Uniform +/- share of the latency, drawn from the seeded RNG.
+        completion_tokens: Tokens per answer (text answers are about 4 characters per token).
+        prompt_tokens: Reported prompt tokens; None counts 4 characters per token.
+        rate_429: Share of requests answered with 429 and Retry-After.
+        retry_after: Seconds sent in Retry-After.
+        concurrency_limit: Requests in flight above this get a 429 (None: unlimited).
+        search_urls: URLs returned to web-search prompts (link_harvester.seed_urls_via_openai).
+        seed: Seed of the jitter and 429 draws.
+    """
+
+    def __init__(self, latency: float = 0.05, token_latency: float = 0.0, jitter: float = 0.0,
+                 completion_tokens: int = 30, prompt_tokens: Optional[int] = None, rate_429: float = 0.0,
+                 retry_after: float = 0.1, concurrency_limit: Optional[int] = None,
+                 search_urls: Sequence[str] = (), seed: int = 0):
+        super().__init__()
+        self.latency = latency
+        self.token_latency = token_latency
+        self.jitter = jitter
+        self.completion_tokens = completion_tokens
+        self.prompt_tokens = prompt_tokens
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.concurrency_limit = concurrency_limit
+        self.search_urls = list(search_urls)
+        self._rng = random.Random(seed)
+        self.requests = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "throttled": self.throttled, "max_in_flight": self.max_in_flight}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        return app
+
+    def answer(self, messages: List[dict], json_mode: bool) -> str:
+        """Deterministic answer in the shape the caller expects."""
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        user = " ".join(m.get("content") or "" for m in messages if m.get("role") != "system")
+        rng = random.Random(hashlib.sha256((system + user).encode("utf-8")).digest())
+        text = _words(rng, max(1, self.completion_tokens * 4 // 7))
+        if '"urls"' in system:
+            return json.dumps({"urls": self.search_urls})
+        if '"relevant"' in system:
+            return json.dumps({"relevant": True})
+        if json_mode:
+            return json.dumps({"title": _words(rng, 3).title(), "summary": text, "important": rng.random() < 0.25})
+        return text[0].upper() + text[1:] + "."
+
+    async def _completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.requests += 1
+        throttle = self._rng.random() < self.rate_429
+        if throttle or (self.concurrency_limit is not None and self.in_flight >= self.concurrency_limit):
+            self.throttled += 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached (offline harness)", "type": "rate_limit_exceeded"}},
+                status=429, headers={"retry-after": str(self.retry_after)})
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency + self.token_latency * self.completion_tokens
+            if self.jitter:
+                delay *= 1 + self._rng.uniform(-self.jitter, self.jitter)
+            await asyncio.sleep(max(delay, 0.0))
+        finally:
+            self.in_flight -= 1
+        messages = body.get("messages", [])
+        content = self.answer(messages, (body.get("response_format") or {}).get("type") == "json_object")
+        prompt_tokens = self.prompt_tokens
+        if prompt_tokens is None:
+            prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+        return web.json_response({
+            "id": f"chatcmpl-offline-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "offline"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": self.completion_tokens,
+                      "total_tokens": prompt_tokens + self.completion_tokens},
+        })
+
+
+class SyntheticSite(_Server):
+    """
+    A deterministic website served from memory.
+
+    Page 0 is the home page at "/", page i at "/p/i". Every page links to
+    the next one (so the whole site is reachable from home) plus
+    links_per_page - 1 pages drawn from the seeded RNG; the home page also
+    links to external_links. Pages share a navigation bar and footer.
+
+    Args:
+        pages: Number of pages.
+        links_per_page: Internal links on every page.
+        words_per_page: Body words per page.
+        external_links: URLs the home page, llms.txt and flm.txt point to.
+        name: Site name used in titles, llms.txt and flm.txt.
+        seed: Seed of the link graph and the text.
+    """
+
+    def __init__(self, pages: int = 50, links_per_page: int = 5, words_per_page: int = 300,
+                 external_links: Sequence[str] = (), name: str = "Synthetic", seed: int = 0):
+        super().__init__()
+        self.pages = pages
+        self.links_per_page = links_per_page
+        self.words_per_page = words_per_page
+        self.external_links = list(external_links)
+        self.name = name
+        self.seed = seed
+        self.versions = [0] * pages
+        self.modified = [1_700_000_000.0] * pages     # fixed epoch, so lastmods repeat across runs
+        self.requests = 0
+        self.not_modified = 0
+
+    def path(self, i: int) -> str:
+        return "/" if i == 0 else f"/p/{i}"
+
+    def update(self, indexes: Sequence[int]):
+        """Changes the content (and lastmod) of these pages."""
+        for i in indexes:
+            self.versions[i] += 1
+            self.modified[i] += 86_400 * self.versions[i]
+
+    def links(self, i: int) -> List[int]:
+        rng = random.Random(f"{self.seed}-links-{i}")
+        targets = [(i + 1) % self.pages] if self.pages > 1 else []
+        targets += [rng.randrange(self.pages) for _ in range(max(self.links_per_page - 1, 0))]
+        return list(dict.fromkeys(t for t in targets if t != i))
+
+    def html(self, i: int) -> str:
+        rng = random.Random(f"{self.seed}-text-{i}-{self.versions[i]}")
+        title = f"{self.name} page {i}" if i else f"{self.name} home"
+        paragraphs = "".join(f"<p>{_words(rng, 60)}.</p>" for _ in range(max(1, self.words_per_page // 60)))
+        links = "".join(f'<li><a href="{self.path(t)}">{self.name} page {t}</a></li>' for t in self.links(i))
+        if i == 0:
+            links += "".join(f'<li><a href="{url}">{url}</a></li>' for url in self.external_links)
+        return (f"<!doctype html><html><head><title>{title}</title></head><body>"
+                f"<nav>{NAV}</nav><h1>{title}</h1>{paragraphs}<ul>{links}</ul>"
+                f"<footer>{FOOTER}</footer></body></html>")
+
+    def llms_txt(self) -> str:
+        lines = [f"# {self.name}", "", f"> {self.name} is a synthetic site for offline benchmarks.", "",
+                 "## Pages", ""]
+        lines += [f"- [{self.name} page {i}]({self.url}{self.path(i)}): page {i}" for i in range(min(self.pages, 20))]
+        if self.external_links:
+            lines += ["", "## Elsewhere", ""] + [f"- [{url}]({url})" for url in self.external_links]
+        return "\n".join(lines) + "\n"
+
+    def flm_txt(self) -> str:
+        return "".join(f"Forward: {url}\n" for url in self.external_links)
+
+    def sitemap(self, chunk: Optional[int] = None) -> str:
+        if chunk is None and self.pages > SITEMAP_CHUNK:
+            files = "".join(f"<sitemap><loc>{self.url}/sitemap-{n}.xml</loc></sitemap>"
+                            for n in range((self.pages + SITEMAP_CHUNK - 1) // SITEMAP_CHUNK))
+            return ('<?xml version="1.0" encoding="UTF-8"?>'
+                    f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{files}</sitemapindex>')
+        first = (chunk or 0) * SITEMAP_CHUNK
+        urls = "".join(
+            f"<url><loc>{self.url}{self.path(i)}</loc>"
+            f"<lastmod>{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.modified[i]))}</lastmod></url>"
+            for i in range(first, min(first + SITEMAP_CHUNK, self.pages)))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>')
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/", self._page)
+        app.router.add_get("/p/{i:\\d+}", self._page)
+        app.router.add_get("/robots.txt", self._text(lambda: f"User-agent: *\nAllow: /\nSitemap: {self.url}/sitemap.xml\n"))
+        app.router.add_get("/llms.txt", self._text(self.llms_txt))
+        app.router.add_get("/flm.txt", self._text(self.flm_txt))
+        app.router.add_get("/.well-known/flm.txt", self._text(self.flm_txt))
+        app.router.add_get("/sitemap.xml", self._text(self.sitemap, "application/xml"))
+        app.router.add_get("/sitemap-{n:\\d+}.xml", self._sitemap_chunk)
+        return app
+
+    def _text(self, render, content_type: str = "text/plain"):
+        async def handler(request: web.Request) -> web.Response:
+            self.requests += 1
+            return web.Response(text=render(), content_type=content_type)
+        return handler
+
+    async def _sitemap_chunk(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        return web.Response(text=self.sitemap(int(request.match_info["n"])), content_type="application/xml")
+
+    async def _page(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        i = int(request.match_info.get("i", 0))
+        if i >= self.pages:
+            raise web.HTTPNotFound()
+        etag = f'"{i}-{self.versions[i]}"'
+        last_modified = formatdate(self.modified[i], usegmt=True)
+        if request.headers.get("If-None-Match") == etag or (
+                "If-None-Match" not in request.headers and request.headers.get("If-Modified-Since") == last_modified):
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag, "Last-Modified": last_modified})
+        return web.Response(text=self.html(i), content_type="text/html",
+                            headers={"ETag": etag, "Last-Modified": last_modified})
+
+
+class ManifestCorpus(_Server):
+    """
+    Many llms.txt / flm.txt files on one host, at /m/<i>/llms.txt.
+
+    Args:
+        manifests: File contents; see benchmarks.bench_flm_parser.make_manifest for a generator.
+    """
+
+    def __init__(self, manifests: Sequence[str]):
+        super().__init__()
+        self.manifests = list(manifests)
+        self.requests = 0
+
+    @property
+    def urls(self) -> List[str]:
+        return [f"{self.url}/m/{i}/llms.txt" for i in range(len(self.manifests))]
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/m/{i:\\d+}/llms.txt", self._manifest)
+        return app
+
+    async def _manifest(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        i = int(request.match_info["i"])
+        if i >= len(self.manifests):
+            raise web.HTTPNotFound()
+        return web.Response(text=self.manifests[i], content_type="text/plain")
+
+
+class Harness:
+    """Running stand-ins; see offline()."""
+
+    def __init__(self, llm: FakeOpenAI, sites: List[SyntheticSite]):
+        self.llm = llm
+        self.sites = sites
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="offline-harness", daemon=True)
+
+    @property
+    def env(self) -> Dict[str, str]:
+        """Environment that points the pipeline at the stand-ins."""
+        return {"OPENAI_BASE_URL": self.llm.base_url, "OPENAI_API_KEY": "offline", "SITE_SCHEME": "http"}
+
+    def call(self, coro):
+        """Runs a coroutine on the harness loop (e.g. to reconfigure a server) and returns its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def start(self):
+        self._thread.start()
+        for server in [self.llm, *self.sites]:
+            self.call(server.start())
+        # Ports are known only now: unless configured, the first site and the
+        # search model point at the other sites, which play the external web
+        others = [f"{site.url}/" for site in self.sites[1:]]
+        if others and not self.sites[0].external_links:
+            self.sites[0].external_links = others
+        if others and not self.llm.search_urls:
+            self.llm.search_urls = others
+
+    def stop(self):
+        for server in [self.llm, *self.sites]:
+            self.call(server.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+@contextmanager
+def offline(sites: Optional[Sequence[SyntheticSite]] = None, llm: Optional[FakeOpenAI] = None):
+    """
+    Serves the stand-ins and points the pipeline at them for the duration of the block.
+
+    The environment is restored on exit, and the shared llm_client
+    reconnects on entry and exit so it picks up the current endpoint (its
+    stats carry on).
+    """
+    harness = Harness(llm or FakeOpenAI(), list(sites) if sites is not None else [SyntheticSite()])
+    harness.start()
+    saved = {key: os.environ.get(key) for key in harness.env}
+    os.environ.update(harness.env)
+    _reset_llm_client()
+    try:
+        yield harness
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        _reset_llm_client()
+        harness.stop()
+
+
+def _reset_llm_client():
+    client = sys.modules.get("llm_client")
+    if client is not None:
+        client.reset()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI endpoint and synthetic sites.")
+    parser.add_argument("--sites", type=int, default=1)
+    parser.add_argument("--pages", type=int, default=50, help="pages per site")
+    parser.add_argument("--links", type=int, default=5, help="internal links per page")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per LLM answer")
+    parser.add_argument("--completion-tokens", type=int, default=30)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="share of LLM requests throttled")
+    parser.add_argument("--concurrency-limit", type=int, default=None, help="LLM requests in flight before 429s")
+    args = parser.parse_args()
+
+    sites = [SyntheticSite(pages=args.pages, links_per_page=args.links, name=f"Synthetic{n}", seed=n)
+             for n in range(args.sites)]
+    llm = FakeOpenAI(latency=args.latency, completion_tokens=args.completion_tokens, rate_429=args.rate_429,
+                     concurrency_limit=args.concurrency_limit)
+    with offline(sites, llm) as harness:
+        for key, value in harness.env.items():
+            print(f"export {key}={value}")
+        for site in harness.sites:
+            print(f"# {site.name}: {site.url}/ ({site.pages} pages)")
+        print("# Ctrl-C to stop", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+End-to-end benchmark suite with a JSON history and baseline comparison.
+
+Covers the hot paths of the pipeline:
+
+    get_summaries            pages/s     crawl + summarise a synthetic site
+    crawl_outward            URLs/s      link_harvester's outward crawler
+    extract_text             MB/s        link_harvester.extract_text on synthetic HTML
+    extract_links            links/s     link_harvester.extract_links on the same HTML
+    create_llms_txt_{1k,10k,100k}  s     llms.txt rendering at 1k, 10k and 100k pages
+    certificate_sign         certs/s     certificate.sign with the cached signer
+    llmstxt_analyzer         files/s     LLMSTxtAnalyzer.analyze_llms_txt_file
+
+Everything runs offline: sites and OpenAI are the stand-ins from
+benchmarks.offline (the fake LLM answers with zero latency, so LLM-bound
+paths measure the pipeline's own overhead), and the suite runs in a
+temporary working directory so no cache or database of the repo is
+touched. Each case is run --warmup times untimed, then keeps the best of
+--repeat runs.
+
+Every run is appended to the history file (one JSON object per line, with
+commit, host and results) and compared with the baseline: a metric
+regresses when it is worse than the baseline by more than its threshold
+(a share, e.g. 0.1 = 10%). --quick runs use smaller inputs, so the
+baseline file keeps one set of results per mode ("full", "quick") and a
+run is only compared with, and --save-baseline only writes, its own.
+Thresholds come from the baseline file's "thresholds" ({"default": 0.1,
+"<name pattern>": 0.25, ...}) and --threshold options. The exit status
+is 1 if anything regressed.
+
+Usage (from the repo root):
+    python -m benchmarks.suite                          # run all, record, compare
+    python -m benchmarks.suite --quick --only 'extract_*,create_llms_txt_*'
+    python -m benchmarks.suite --save-baseline          # make this run the baseline
+    python -m benchmarks.suite --threshold 0.15 --threshold 'create_llms_txt_*=0.3'
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+HISTORY_PATH = os.path.join(RESULTS_DIR, "history.jsonl")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+DEFAULT_THRESHOLD = 0.10
+REPEAT = 3
+WARMUP = 1      # untimed runs per case first (imports, lazy clients, parser caches)
+MIN_SECONDS = 0.2   # CPU-bound cases repeat their work until they have run this long
+
+# Work per case: (full, --quick)
+SIZES = {
+    "get_summaries": (100, 20),         # pages
+    "crawl_outward": (200, 50),         # URLs
+    "extract": (500, 100),              # HTML pages
+    "certificate_sign": (50, 10),       # certificates
+    "llmstxt_analyzer": (300, 50),      # llms.txt files
+}
+LLMS_TXT_PAGES = {"create_llms_txt_1k": 1_000, "create_llms_txt_10k": 10_000, "create_llms_txt_100k": 100_000}
+
+
+class Metric(NamedTuple):
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[bool], Metric]     # quick -> one measurement
+    quick: bool = True                # also part of --quick runs
+
+
+def _rate(count: float, seconds: float, unit: str) -> Metric:
+    return Metric(count / seconds, unit, True)
+
+
+def _per_pass(fn: Callable[[], object]) -> float:
+    """Seconds per call of fn, calling it until MIN_SECONDS have passed."""
+    passes, start = 0, time.perf_counter()
+    while True:
+        fn()
+        passes += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SECONDS:
+            return elapsed / passes
+
+
+def bench_get_summaries(quick: bool) -> Metric:
+    import internal_scaping
+    from benchmarks.offline import FakeOpenAI, SyntheticSite, offline
+    pages = SIZES["get_summaries"][quick]
+    with offline([SyntheticSite(pages=pages)], FakeOpenAI(latency=0.0)) as harness:
+        start = time.perf_counter()
+        summaries = internal_scaping.get_summaries(harness.sites[0].url, max_scapes=pages)
+        return _rate(len(summaries), time.perf_counter() - start, "pages/s")
+
+
+def bench_crawl_outward(quick: bool) -> Metric:
+    from benchmarks.offline import SyntheticSite, offline
+    from link_harvesting import link_harvester
+    urls = SIZES["crawl_outward"][quick]
+    with offline([SyntheticSite(pages=urls), SyntheticSite(pages=1, seed=1)]) as harness:
+        site = harness.sites[0]
+        start = time.perf_counter()
+        link_harvester.crawl_outward(site.url, limit=urls, delay=0)
+        return _rate(site.requests, time.perf_counter() - start, "URLs/s")
+
+
+def _html_corpus(quick: bool) -> List[str]:
+    from benchmarks.offline import SyntheticSite
+    site = SyntheticSite(pages=SIZES["extract"][quick], words_per_page=600,
+                         external_links=[f"https://partner-{i}.example.org/" for i in range(10)])
+    return [site.html(i) for i in range(site.pages)]
+
+
+def bench_extract_text(quick: bool) -> Metric:
+    from link_harvesting.link_harvester import extract_text
+    corpus = _html_corpus(quick)
+    seconds = _per_pass(lambda: [extract_text(html) for html in corpus])
+    return _rate(sum(len(html) for html in corpus) / 1e6, seconds, "MB/s")
+
+
+def bench_extract_links(quick: bool) -> Metric:
+    from link_harvesting.link_harvester import extract_links
+    corpus = _html_corpus(quick)
+    links = sum(len(extract_links(html, "https://synthetic.example.com/")) for html in corpus)
+    seconds = _per_pass(lambda: [extract_links(html, "https://synthetic.example.com/") for html in corpus])
+    return _rate(links, seconds, "links/s")
+
+
+def bench_create_llms_txt(pages: int) -> Callable[[bool], Metric]:
+    def run(quick: bool) -> Metric:
+        import llms_txt_generation
+        internal_links = {f"https://synthetic.example.com/p/{i}": {"title": f"Page {i}",
+                                                                   "summary": f"Summary of page {i}. " * 8}
+                          for i in range(pages)}
+        seed = next(iter(internal_links))
+        external_links = {seed: [f"https://partner-{j}.example.org/doc" for j in range(5)]}
+        certificates = {seed: ["-----BEGIN CERTIFICATE-----\nMIIB...\n-----END CERTIFICATE-----"]}
+        digests = {url: "0" * 64 for url in external_links[seed]}
+        seconds = _per_pass(lambda: llms_txt_generation.create_llms_txt(
+            "synthetic.example.com", "A synthetic site.", internal_links, external_links, certificates, digests))
+        return Metric(seconds, "s", False)
+    return run
+
+
+def bench_certificate_sign(quick: bool) -> Metric:
+    import certificate
+    from benchmarks.bench_certificate_sign import make_pairs
+    pairs = make_pairs(SIZES["certificate_sign"][quick], 5)
+    certificate.get_signer()    # key loading is not what is measured
+    start = time.perf_counter()
+    for url, verified in pairs:
+        certificate.sign(url, verified)
+    return _rate(len(pairs), time.perf_counter() - start, "certs/s")
+
+
+def bench_llmstxt_analyzer(quick: bool) -> Metric:
+    import random
+    from benchmarks.bench_flm_parser import make_manifest
+    from benchmarks.offline import ManifestCorpus, offline
+    from llmstxt_analysis.llmstxt_analysis import LLMSTxtAnalyzer
+    rng = random.Random(0)
+    corpus = ManifestCorpus([make_manifest(i, rng) for i in range(SIZES["llmstxt_analyzer"][quick])])
+    with offline(sites=[]) as harness:
+        harness.call(corpus.start())
+        analyzer = LLMSTxtAnalyzer()
+        try:
+            start = time.perf_counter()
+            for url in corpus.urls:
+                analyzer.add_analysis(url, analyzer.analyze_llms_txt_file(url))
+            return _rate(len(corpus.urls), time.perf_counter() - start, "files/s")
+        finally:
+            analyzer.journal.complete()
+            harness.call(corpus.stop())
+
+
+CASES = [
+    Case("get_summaries", bench_get_summaries),
+    Case("crawl_outward", bench_crawl_outward),
+    Case("extract_text", bench_extract_text),
+    Case("extract_links", bench_extract_links),
+    *(Case(name, bench_create_llms_txt(pages), quick=pages < 100_000) for name, pages in LLMS_TXT_PAGES.items()),
+    Case("certificate_sign", bench_certificate_sign),
+    Case("llmstxt_analyzer", bench_llmstxt_analyzer),
+]
+
+
+def best(metrics: List[Metric]) -> Metric:
+    return max(metrics, key=lambda m: m.value) if metrics[0].higher_is_better else min(metrics, key=lambda m: m.value)
+
+
+def run_cases(cases: List[Case], quick: bool, repeat: int, warmup: int = WARMUP) -> Dict[str, Metric]:
+    """Runs each case warmup + repeat times in a scratch directory; the scripts' own output is swallowed."""
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-suite-") as scratch:
+        os.chdir(scratch)
+        os.makedirs("link_harvesting", exist_ok=True)     # link_harvester opens link_harvesting/links.db
+        try:
+            for case in cases:
+                runs = []
+                for _ in range(warmup + repeat):
+                    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                        runs.append(case.run(quick))
+                results[case.name] = metric = best(runs[warmup:])
+                print(f"  {case.name:<24} {metric.value:>12.4g} {metric.unit}", flush=True)
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def threshold_for(name: str, thresholds: Dict[str, float]) -> float:
+    """The most specific matching pattern wins (an exact name before any wildcard)."""
+    if name in thresholds:
+        return thresholds[name]
+    matches = [pattern for pattern in thresholds if pattern != "default" and fnmatch.fnmatch(name, pattern)]
+    if matches:
+        return thresholds[max(matches, key=len)]
+    return thresholds.get("default", DEFAULT_THRESHOLD)
+
+
+def compare(results: Dict[str, Metric], baseline: Dict[str, dict], thresholds: Dict[str, float]) -> List[str]:
+    """Prints the comparison table and returns the names of the regressed metrics."""
+    regressions = []
+    print(f"\n{'benchmark':<24} {'baseline':>12} {'current':>12} {'change':>8} {'limit':>7}  unit")
+    print("-" * 76)
+    for name, metric in results.items():
+        base = baseline.get(name)
+        if base is None or not base["value"]:
+            print(f"{name:<24} {'-':>12} {metric.value:>12.4g} {'new':>8} {'':>7}  {metric.unit}")
+            continue
+        change = (metric.value - base["value"]) / base["value"]
+        worse = -change if metric.higher_is_better else change
+        limit = threshold_for(name, thresholds)
+        flag = ""
+        if worse > limit:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<24} {base['value']:>12.4g} {metric.value:>12.4g} {change:>+8.1%} {limit:>7.0%}  "
+              f"{metric.unit}{flag}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def record(results: Dict[str, Metric], quick: bool) -> dict:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": {name: metric._asdict() for name, metric in results.items()},
+    }
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite and check for regressions.")
+    parser.add_argument("--only", default=None, help="comma-separated names or patterns of cases to run")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs; skips create_llms_txt_100k")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="runs per case; the best one counts")
+    parser.add_argument("--warmup", type=int, default=WARMUP, help="untimed runs per case before those")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", action="append", default=[], metavar="[PATTERN=]SHARE",
+                        help="allowed slowdown, e.g. 0.1 (all) or 'create_llms_txt_*=0.3'; repeatable")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in CASES:
+            print(case.name + ("" if case.quick else "  (full runs only)"))
+        return 0
+
+    sys.path.insert(0, ROOT)
+    cases = [case for case in CASES if case.quick or not args.quick]
+    if args.only:
+        patterns = [p.strip() for p in args.only.split(",") if p.strip()]
+        cases = [case for case in cases if any(fnmatch.fnmatch(case.name, p) for p in patterns)]
+    print(f"Running {len(cases)} benchmarks ({'quick' if args.quick else 'full'}, best of {args.repeat})")
+    results = run_cases(cases, args.quick, args.repeat, args.warmup)
+
+    entry = record(results, args.quick)
+    os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+    # Quick and full runs measure different input sizes; each has its own baseline
+    mode = "quick" if args.quick else "full"
+    baseline = load_baseline(args.baseline)
+    modes = baseline.get("modes", {})
+    thresholds = dict(baseline.get("thresholds", {}))
+    for option in args.threshold:
+        pattern, _, share = option.rpartition("=")
+        thresholds[pattern or "default"] = float(share)
+    print(f"\nCompared with the {mode} baseline")
+    regressions = compare(results, modes.get(mode, {}).get("results", {}), thresholds)
+
+    if args.save_baseline:
+        merged = dict(modes.get(mode, {}).get("results", {}))
+        merged.update(entry["results"])
+        modes[mode] = {"commit": entry["commit"], "timestamp": entry["timestamp"], "platform": entry["platform"],
+                       "results": merged}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"thresholds": thresholds or {"default": DEFAULT_THRESHOLD}, "modes": modes}, f, indent=2)
+        print(f"\n{mode.capitalize()} baseline saved to {args.baseline}")
+    print(f"Recorded in {args.history}")
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,130 +1,555 @@
 import sys, json, time, base64, requests, click, hashlib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives.asymmetric import ed25519, padding, rsa
 from cryptography import x509
 from cryptography.x509.oid import NameOID, ObjectIdentifier
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from hashlib import sha256
+from typing import Dict, Iterable, List, Optional, Tuple
+from merkle import ALGORITHM as MERKLE_ALGORITHM, MerkleTree, verify_proof
 import json
 import os 
+import threading
 from datetime import timezone
 
 CUSTOM_OID = "1.3.6.1.4.1.99999.1"
 CERTIFICATE_PATH = 'flm.txt/llm_cert.pem'
+# Signing key per algorithm, loaded once per process; override with FLM_SIGNING_KEY / FLM_SIGNING_KEY_ED25519
+SIGNING_KEY_PATHS = {
+    "rsa": os.getenv("FLM_SIGNING_KEY", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_key.pem")),
+    "ed25519": os.getenv("FLM_SIGNING_KEY_ED25519",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_key_ed25519.pem")),
+}
+# Signature algorithm for certificates and payloads ("rsa" or "ed25519")
+SIGNING_ALGORITHM = os.getenv("FLM_SIGNING_ALG", "rsa")
+CERT_VALIDITY_DAYS = 30
+CERT_RENEW_DAYS = 7         # re-sign once a stored certificate has less than this left
+CERT_CACHE_SIZE = 4096      # parsed certificates kept in memory, keyed by fingerprint
+# "hashes": JSON of every URL's SHA-256; "merkle": only the Merkle root, proofs ship with the manifest
+DEFAULT_COMMITMENT = "hashes"
+TOKEN_TTL = 3600
 
 def sha256_hex(data):
     return hashlib.sha256(data.encode()).hexdigest()
 
-def sign(live_url, verified_list: list[str]):
+class RSAAlgorithm:
+    """RSA-2048 with PKCS1v15/SHA-256 (JWT "RS256")"""
+    name = "rsa"
+    jwt_alg = "RS256"
+    key_types = (rsa.RSAPrivateKey, rsa.RSAPublicKey)
+    cert_hash = hashes.SHA256()
+    key_format = serialization.PrivateFormat.TraditionalOpenSSL
+
+    @staticmethod
+    def generate():
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    @staticmethod
+    def sign(private_key, data: bytes) -> bytes:
+        return private_key.sign(data, padding.PKCS1v15(), hashes.SHA256())
+
+    @staticmethod
+    def verify(public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data, padding.PKCS1v15(), hashes.SHA256())
+
+class Ed25519Algorithm:
+    """Ed25519 (JWT "EdDSA"); X.509 signing takes no separate hash"""
+    name = "ed25519"
+    jwt_alg = "EdDSA"
+    key_types = (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)
+    cert_hash = None
+    key_format = serialization.PrivateFormat.PKCS8
+
+    @staticmethod
+    def generate():
+        return ed25519.Ed25519PrivateKey.generate()
+
+    @staticmethod
+    def sign(private_key, data: bytes) -> bytes:
+        return private_key.sign(data)
+
+    @staticmethod
+    def verify(public_key, signature: bytes, data: bytes):
+        public_key.verify(signature, data)
+
+SIGNATURE_ALGORITHMS = {alg.name: alg for alg in (RSAAlgorithm, Ed25519Algorithm)}
+
+def algorithm_for_key(key):
+    """Pick the signature algorithm matching a private or public key"""
+    for alg in SIGNATURE_ALGORITHMS.values():
+        if isinstance(key, alg.key_types):
+            return alg
+    raise ValueError(f"Unsupported key type {type(key).__name__}")
+
+@dataclass
+class IssuedCertificate:
+    """A trust-link certificate plus the signed JWT-like payload for one live URL"""
+    url: str
+    cert_pem: str
+    payload: dict
+    signature: str      # base64url of the payload signature
+    algorithm: str = "rsa"
+    proofs: Optional[Dict[str, List[List[str]]]] = None     # url -> Merkle inclusion proof
+
+class Signer:
+    """
+    Issues FLM certificates with one long-lived key
+
+    Args:
+        private_key: RSA or Ed25519 private key used for certificates and payload signatures.
+        common_name: Subject/issuer common name of issued certificates.
+        organization: Subject/issuer organization of issued certificates.
+    """
+
+    def __init__(self, private_key, common_name: str = u"example.com", organization: str = u"MyOrg"):
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        self.algorithm = algorithm_for_key(private_key)
+        self.name = x509.Name([
+            x509.NameAttribute(NameOID.COMMON_NAME, common_name),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, organization)
+        ])
+
+    @classmethod
+    def from_pem_file(cls, path: str, password: Optional[bytes] = None, **kwargs) -> "Signer":
+        with open(path, 'rb') as f:
+            return cls(serialization.load_pem_private_key(f.read(), password=password), **kwargs)
+
+    @classmethod
+    def generate(cls, algorithm: str = SIGNING_ALGORITHM, **kwargs) -> "Signer":
+        return cls(SIGNATURE_ALGORITHMS[algorithm].generate(), **kwargs)
+
+    @property
+    def key_pem(self) -> str:
+        return self.private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=self.algorithm.key_format,
+            encryption_algorithm=serialization.NoEncryption()
+        ).decode()
+
+    @property
+    def public_key_pem(self) -> str:
+        return self.public_key.public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+    def _sign_bytes(self, data: bytes) -> bytes:
+        return self.algorithm.sign(self.private_key, data)
+
+    def issue(self, live_url: str, verified_list: List[str], now: Optional[datetime] = None,
+              commitment: str = DEFAULT_COMMITMENT) -> IssuedCertificate:
+        """
+        Issue a certificate committing to verified_list plus a signed payload for live_url
+
+        Args:
+            live_url: The URL to verify
+            verified_list: List of URLs to verify
+            now: Issue time (shared across a batch)
+            commitment: "hashes" (every URL hash in the extension) or "merkle" (root only)
+        """
+        now = now or datetime.now(timezone.utc)
+
+        proofs = None
+        if commitment == "merkle":
+            # Constant-size extension; per-URL proofs are returned alongside
+            tree = MerkleTree(verified_list)
+            ext_value = json.dumps({"alg": MERKLE_ALGORITHM, "root": tree.root, "count": len(verified_list)}).encode('utf-8')
+            proofs = tree.proofs()
+        elif commitment == "hashes":
+            # Create URL hashes
+            url_hashes = {}
+            for i, url in enumerate(verified_list):
+                url_hashes[str(i)] = sha256(url.encode('utf-8')).hexdigest()
+            ext_value = json.dumps(url_hashes).encode('utf-8')
+        else:
+            raise ValueError(f"Unknown commitment mode '{commitment}'")
+
+        # Create custom extension
+        custom_ext = x509.UnrecognizedExtension(ObjectIdentifier(CUSTOM_OID), ext_value)
+
+        # Build certificate
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(self.name)
+            .issuer_name(self.name)
+            .public_key(self.public_key)
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now)
+            .not_valid_after(now + timedelta(days=CERT_VALIDITY_DAYS))
+            .add_extension(custom_ext, critical=False)
+            .sign(self.private_key, self.algorithm.cert_hash)
+        )
+
+        # Generate JWT payload
+        iat = int(now.timestamp())
+        payload = {
+            "url": live_url,
+            "hash": sha256_hex(live_url),
+            "method": "llm-verify",
+            "alg": self.algorithm.jwt_alg,
+            "iat": iat,
+            "exp": iat + TOKEN_TTL
+        }
+
+        # Generate signature
+        sig = self._sign_bytes(json.dumps(payload).encode())
+
+        return IssuedCertificate(
+            url=live_url,
+            cert_pem=cert.public_bytes(serialization.Encoding.PEM).decode(),
+            payload=payload,
+            signature=base64.urlsafe_b64encode(sig).decode().rstrip("="),
+            proofs=proofs,
+            algorithm=self.algorithm.name,
+        )
+
+    def issue_many(self, pairs: Iterable[Tuple[str, List[str]]],
+                   commitment: str = DEFAULT_COMMITMENT) -> List[IssuedCertificate]:
+        """Issue certificates for many (live_url, verified_list) pairs in one call"""
+        now = datetime.now(timezone.utc)
+        return [self.issue(live_url, verified_list, now, commitment) for live_url, verified_list in pairs]
+
+@lru_cache(maxsize=None)
+def get_signer(algorithm: str = SIGNING_ALGORITHM, key_path: Optional[str] = None) -> Signer:
+    """
+    Load the signing key of `algorithm` once and cache the Signer
+
+    The key comes from `key_path`, else SIGNING_KEY_PATHS[algorithm]. If the
+    file is missing, an ephemeral key is generated (valid for this process only).
+
+    Raises:
+        ValueError: If the algorithm is unknown or the key file holds another key type
+    """
+    if algorithm not in SIGNATURE_ALGORITHMS:
+        raise ValueError(f"Unknown signature algorithm '{algorithm}'")
+    key_path = key_path or SIGNING_KEY_PATHS[algorithm]
+    if not os.path.exists(key_path):
+        click.echo(f"⚠️  Signing key {key_path} not found — using an ephemeral {algorithm} key", err=True)
+        return Signer.generate(algorithm)
+    signer = Signer.from_pem_file(key_path)
+    if signer.algorithm.name != algorithm:
+        raise ValueError(f"{key_path} holds an {signer.algorithm.name} key, but {algorithm} signing was requested")
+    return signer
+
+def sign(live_url, verified_list: list[str], algorithm: str = SIGNING_ALGORITHM):
     """
     Generate and return a certificate with URL hashes
-    
+
     Args:
         live_url: The URL to verify
         verified_list: List of URLs to verify
-        
-    Returns:
-        tuple: (certificate_pem, private_key_pem)
-    """
-    # Generate key
-    priv = rsa.generate_private_key(public_exponent=65537, key_size=2048)
-
-    # Create certificate subject
-    subject = issuer = x509.Name([
-        x509.NameAttribute(NameOID.COMMON_NAME, u"example.com"),
-        x509.NameAttribute(NameOID.ORGANIZATION_NAME, u"MyOrg")
-    ])
-
-    # Create URL hashes
-    url_hashes = {}
-    for i, url in enumerate(verified_list):
-        url_hash = sha256(url.encode('utf-8')).hexdigest()
-        url_hashes[str(i)] = url_hash
-    
-    # Create custom extension
-    CUSTOM = ObjectIdentifier(CUSTOM_OID)
-    ext_value = json.dumps(url_hashes).encode('utf-8')
-    custom_ext = x509.UnrecognizedExtension(CUSTOM, ext_value)
-
-    # Build certificate
-    cert = (
-        x509.CertificateBuilder()
-        .subject_name(subject)
-        .issuer_name(issuer)
-        .public_key(priv.public_key())
-        .serial_number(x509.random_serial_number())
-        .not_valid_before(datetime.now(timezone.utc))
-        .not_valid_after(datetime.now(timezone.utc) + timedelta(days=30))
-        .add_extension(custom_ext, critical=False)
-        .sign(priv, hashes.SHA256())
-    )
-
-    # Generate JWT payload
-    payload = {
-        "url": live_url,
-        "hash": sha256_hex(live_url),
-        "method": "llm-verify",
-        "iat": int(time.time()),
-        "exp": int(time.time()) + 3600
-    }
-
-    # Generate signature
-    data = json.dumps(payload).encode()
-    sig = priv.sign(data, padding.PKCS1v15(), hashes.SHA256())
+        algorithm: Signature algorithm ("rsa" or "ed25519")
 
+    Returns:
+        str: The certificate PEM (the signing key stays with the cached signer)
+    """
+    issued = get_signer(algorithm).issue(live_url, verified_list)
     click.echo("✅ Verification passed — trust link issued.")
-    # result = {"payload": payload, "signature": sig}
-    
-    # Return certificate and private key as PEM strings
-    cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
-    key_pem = priv.private_bytes(
-        encoding=serialization.Encoding.PEM,
-        format=serialization.PrivateFormat.TraditionalOpenSSL,
-        encryption_algorithm=serialization.NoEncryption()
-    ).decode()
-    
-    return cert_pem, key_pem
+    return issued.cert_pem
+
+def sign_many(pairs: Iterable[Tuple[str, List[str]]], commitment: str = DEFAULT_COMMITMENT,
+              algorithm: str = SIGNING_ALGORITHM) -> List[IssuedCertificate]:
+    """
+    Issue certificates for many (live_url, verified_list) pairs with the cached signer
+
+    Args:
+        pairs: (live_url, verified_list) pairs
+        commitment: "hashes" or "merkle"
+        algorithm: Signature algorithm ("rsa" or "ed25519")
+
+    Returns:
+        list[IssuedCertificate]: One issued certificate per pair, in input order
+    """
+    issued = get_signer(algorithm).issue_many(pairs, commitment)
+    click.echo(f"✅ Verification passed — {len(issued)} trust links issued.")
+    return issued
+
+
+@dataclass
+class ParsedCertificate:
+    """A certificate parsed once, with its decoded LLM verification extension"""
+    fingerprint: str                    # SHA-256 of the DER encoding
+    cert: x509.Certificate
+    commitment: Optional[dict]          # None if the extension is missing or invalid
+    error: str = ""
+    signature_ok: Optional[bool] = None # self-signature check, filled in lazily
+
+_cert_cache: "OrderedDict[str, ParsedCertificate]" = OrderedDict()
+_cert_cache_lock = threading.Lock()
+
+def certificate_fingerprint(cert_pem) -> str:
+    """SHA-256 fingerprint of a PEM certificate, without a full X.509 parse"""
+    text = cert_pem.decode() if isinstance(cert_pem, bytes) else cert_pem
+    lines = text.strip().splitlines()
+    body = "".join(line.strip() for line in lines if line and not line.startswith("-----"))
+    return hashlib.sha256(base64.b64decode(body)).hexdigest()
+
+def parse_certificate(cert_pem) -> ParsedCertificate:
+    """
+    Parse a PEM certificate and decode its extension, cached by fingerprint
+
+    Raises:
+        ValueError: If the PEM cannot be parsed
+    """
+    fingerprint = certificate_fingerprint(cert_pem)
+    with _cert_cache_lock:
+        parsed = _cert_cache.get(fingerprint)
+        if parsed is not None:
+            _cert_cache.move_to_end(fingerprint)
+            return parsed
+
+    cert = x509.load_pem_x509_certificate(cert_pem.encode() if isinstance(cert_pem, str) else cert_pem)
+    commitment, error = None, ""
+    try:
+        ext = cert.extensions.get_extension_for_oid(ObjectIdentifier(CUSTOM_OID))
+        if isinstance(ext.value, x509.UnrecognizedExtension):
+            commitment = json.loads(ext.value.value)
+        else:
+            error = "Certificate has LLM verification extension but value format is invalid"
+    except x509.ExtensionNotFound:
+        error = "Certificate does not contain LLM verification extension"
+    except ValueError:
+        error = "Certificate has LLM verification extension but value format is invalid"
+
+    parsed = ParsedCertificate(fingerprint, cert, commitment, error)
+    with _cert_cache_lock:
+        _cert_cache[fingerprint] = parsed
+        if len(_cert_cache) > CERT_CACHE_SIZE:
+            _cert_cache.popitem(last=False)
+    return parsed
 
+def _validity(cert: x509.Certificate) -> Tuple[datetime, datetime]:
+    """(not_before, not_after) as aware UTC datetimes on any cryptography version"""
+    not_before = getattr(cert, "not_valid_before_utc", None) or cert.not_valid_before.replace(tzinfo=timezone.utc)
+    not_after = getattr(cert, "not_valid_after_utc", None) or cert.not_valid_after.replace(tzinfo=timezone.utc)
+    return not_before, not_after
 
-def verify_cert(cert_path=CERTIFICATE_PATH):
+def needs_renewal(cert_pem, margin_days: float = CERT_RENEW_DAYS) -> bool:
+    """
+    True if the certificate has expired, expires within `margin_days`, or cannot be parsed
+
+    Args:
+        cert_pem: PEM string or bytes
+        margin_days: Renew this many days before not_valid_after
+    """
+    try:
+        _, not_after = _validity(parse_certificate(cert_pem).cert)
+    except ValueError:
+        return True
+    return not_after - datetime.now(timezone.utc) < timedelta(days=margin_days)
+
+def clear_certificate_cache():
+    with _cert_cache_lock:
+        _cert_cache.clear()
+
+def load_commitment(cert_pem: str) -> dict:
+    """Return the decoded LLM verification extension of a certificate (cached)"""
+    parsed = parse_certificate(cert_pem)
+    if parsed.commitment is None:
+        raise ValueError(parsed.error)
+    return parsed.commitment
+
+def verify_inclusion(cert_pem: str, url: str, proof: Optional[List[List[str]]] = None) -> bool:
+    """
+    Check that a single URL is committed to by a certificate
+
+    Merkle certificates need the URL's inclusion proof (O(log n)); hash-list
+    certificates are checked by scanning the stored hashes.
+
+    Args:
+        cert_pem: The certificate as a PEM string
+        url: The forward link to check
+        proof: Inclusion proof issued alongside the manifest (Merkle mode only)
+    """
+    try:
+        commitment = load_commitment(cert_pem)
+    except ValueError:
+        return False
+    return _committed(commitment, url, proof)
+
+def _committed(commitment: dict, url: str, proof: Optional[List[List[str]]]) -> bool:
+    if commitment.get("alg") == MERKLE_ALGORITHM:
+        return proof is not None and verify_proof(url, proof, commitment["root"])
+    return sha256_hex(url) in commitment.values()
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _load_public_key(key):
+    """Accept a public key object, a public key PEM or a certificate PEM"""
+    if not isinstance(key, (str, bytes)):
+        return key
+    key = key.encode() if isinstance(key, str) else key
+    if b"BEGIN CERTIFICATE" in key:
+        return x509.load_pem_x509_certificate(key).public_key()
+    return serialization.load_pem_public_key(key)
+
+def verify_payload(payload: dict, signature: str, public_key) -> bool:
+    """
+    Check the signature over a trust-link payload and that it has not expired
+
+    Args:
+        payload: The payload dict as issued
+        signature: base64url payload signature
+        public_key: Public key object, public key PEM or the issued certificate PEM
+    """
+    try:
+        key = _load_public_key(public_key)
+        algorithm_for_key(key).verify(key, _b64url_decode(signature), json.dumps(payload).encode())
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+    return payload.get("exp", 0) >= time.time()
+
+def verify_certificate_signature(cert_pem: str, public_key=None) -> bool:
+    """
+    Check a certificate's signature (self-signed by default) with RSA or Ed25519
+
+    Args:
+        cert_pem: The certificate as a PEM string
+        public_key: Issuer key; defaults to the certificate's own public key
+    """
+    try:
+        cert = x509.load_pem_x509_certificate(cert_pem.encode() if isinstance(cert_pem, str) else cert_pem)
+        key = _load_public_key(public_key) if public_key is not None else cert.public_key()
+        alg = algorithm_for_key(key)
+        if alg is RSAAlgorithm:
+            key.verify(cert.signature, cert.tbs_certificate_bytes, padding.PKCS1v15(), cert.signature_hash_algorithm)
+        else:
+            alg.verify(key, cert.signature, cert.tbs_certificate_bytes)
+    except (InvalidSignature, ValueError, TypeError):
+        return False
+    return True
+
+@dataclass
+class CertCheckResult:
+    """Outcome of checking one certificate (and optionally one URL against it)"""
+    source: str                         # file path, or "pem[i]" for inline PEM strings
+    ok: bool
+    message: str
+    url: Optional[str] = None
+    fingerprint: Optional[str] = None
+    commitment: Optional[dict] = None
+    elapsed: float = 0.0
+
+def _read_cert(cert) -> bytes:
+    """Accept PEM text/bytes or a path to a PEM file"""
+    if isinstance(cert, os.PathLike):
+        cert = os.fspath(cert)
+    data = cert.encode() if isinstance(cert, str) else cert
+    if b"-----BEGIN CERTIFICATE" in data:
+        return data
+    with open(cert, 'rb') as f:
+        return f.read()
+
+def check_certificate(cert, url: Optional[str] = None, proof: Optional[List[List[str]]] = None,
+                      check_signature: bool = True, source: Optional[str] = None) -> CertCheckResult:
+    """
+    Check one certificate without exiting the process
+
+    Checks, in order: parseable, LLM verification extension present, inside its
+    validity window, self-signature valid (optional) and, if `url` is given,
+    that the URL is committed to.
+
+    Args:
+        cert: PEM string/bytes or a path to a PEM file
+        url: Forward link to check against the certificate's commitment
+        proof: Merkle inclusion proof for `url`
+        check_signature: Verify the certificate's self-signature
+        source: Label for the result (defaults to the path)
+    """
+    start = time.perf_counter()
+    source = source or (cert if isinstance(cert, str) and "-----BEGIN" not in cert else "pem")
+
+    def result(ok, message, parsed=None):
+        return CertCheckResult(source, ok, message, url,
+                               parsed.fingerprint if parsed else None,
+                               parsed.commitment if parsed else None,
+                               time.perf_counter() - start)
+
+    try:
+        parsed = parse_certificate(_read_cert(cert))
+    except (OSError, ValueError) as e:
+        return result(False, f"Error reading certificate: {e}")
+    if parsed.commitment is None:
+        return result(False, parsed.error, parsed)
+
+    now = datetime.now(timezone.utc)
+    not_before, not_after = _validity(parsed.cert)
+    if not (not_before <= now <= not_after):
+        return result(False, f"Certificate not valid at {now.isoformat()} (valid {not_before.isoformat()} – {not_after.isoformat()})", parsed)
+
+    if check_signature:
+        if parsed.signature_ok is None:
+            parsed.signature_ok = verify_certificate_signature(parsed.cert.public_bytes(serialization.Encoding.PEM))
+        if not parsed.signature_ok:
+            return result(False, "Certificate signature is invalid", parsed)
+
+    if url is not None and not _committed(parsed.commitment, url, proof):
+        return result(False, f"{url} is not committed to by this certificate", parsed)
+    return result(True, "Certificate verified", parsed)
+
+def verify_certs(items: Iterable, max_workers: int = 8, check_signature: bool = True) -> List[CertCheckResult]:
+    """
+    Check many certificates concurrently
+
+    Parsed certificates and extension payloads are cached by fingerprint, so
+    the same certificate referenced by many manifests is parsed once.
+
+    Args:
+        items: Certificates (PEM, str path or os.PathLike), or tuples (cert, url) / (cert, url, proof)
+        max_workers: Number of worker threads
+        check_signature: Verify each certificate's self-signature
+
+    Returns:
+        list[CertCheckResult]: One result per item, in input order
+    """
+    jobs = []
+    for i, item in enumerate(items):
+        cert, url, proof = (tuple(item) + (None, None))[:3] if isinstance(item, (tuple, list)) else (item, None, None)
+        if isinstance(cert, os.PathLike):
+            cert = os.fspath(cert)
+        label = f"pem[{i}]" if isinstance(cert, bytes) or "-----BEGIN" in cert else cert
+        jobs.append((cert, url, proof, label))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(check_certificate, cert, url, proof, check_signature, label)
+                   for cert, url, proof, label in jobs]
+        return [f.result() for f in futures]
+
+def verify_cert(cert_path=CERTIFICATE_PATH, url: Optional[str] = None, proof: Optional[List[List[str]]] = None):
     """
     Verify if the certificate contains the LLM verification extension
-    
+
+    With `url`, also check that this one forward link is committed to: an
+    O(log n) inclusion check for Merkle certificates (pass the proof from
+    the manifest's Merkle-Proof line), a hash lookup otherwise.
+
     Args:
         cert_path: Path to the certificate file (relative to project root)
+        url: Forward link to check against the certificate
+        proof: Merkle inclusion proof for `url`
     """
-    try:
-        # Get the absolute path to the certificate
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        cert_path = os.path.join(project_root, cert_path)
-        
-        # Read certificate from file
-        click.echo(f"Reading certificate from {cert_path}...")
-        with open(cert_path, 'rb') as f:
-            cert_data = f.read()
-
-        cert = x509.load_pem_x509_certificate(cert_data)
-        
-        # Check for LLM verification extension
-        try:
-            ext = cert.extensions.get_extension_for_oid(ObjectIdentifier(CUSTOM_OID))
-            if isinstance(ext.value, x509.UnrecognizedExtension):
-                click.echo(f"✅ Certificate contains LLM verification extension with value: {ext.value.value.decode()}")
-            else:
-                click.echo("❌ Certificate has LLM verification extension but value format is invalid", err=True)
-                sys.exit(1)
-        except x509.ExtensionNotFound:
-            click.echo("❌ Certificate does not contain LLM verification extension", err=True)
-            sys.exit(1)
-            
-    except Exception as e:
-        click.echo(f"❌ Error verifying certificate: {str(e)}", err=True)
+    # Get the absolute path to the certificate
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cert_path = os.path.join(project_root, cert_path)
+
+    click.echo(f"Reading certificate from {cert_path}...")
+    result = check_certificate(cert_path, url=url, proof=proof, check_signature=False)
+    if not result.ok:
+        click.echo(f"❌ {result.message}", err=True)
         sys.exit(1)
 
+    click.echo(f"✅ Certificate contains LLM verification extension with value: {json.dumps(result.commitment)}")
+    if url is not None:
+        click.echo(f"✅ {url} is committed to by the certificate")
     click.echo("✅ Certificate verification completed")
 
 if __name__ == "__main__":
-    cert_pem, key_pem = sign("https://www.purdueglobal.edu", ["https://www.purdueglobal.edu/blog/b", "https://www.purdueglobal.edu/blog/a"])
+    cert_pem = sign("https://www.purdueglobal.edu", ["https://www.purdueglobal.edu/blog/b", "https://www.purdueglobal.edu/blog/a"])
     verify_cert()  # Uses the default CERTIFICATE_PATH
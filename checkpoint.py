@@ -0,0 +1,105 @@
+"""
+Append-only checkpoint journal for long jobs that should survive a crash.
+
+A job appends one JSON line per unit of finished work (a summarised page,
+an analysed file, newly discovered URLs). Writes are buffered and fsynced
+in batches, so a crash loses at most the last batch. Re-opening the journal
+with resume=True replays the records so the job can skip what it already
+did; a half-written last line is dropped. Once the job finishes,
+complete() deletes the journal.
+
+Shared by the pipeline scripts (flm_pipeline, llmstxt_analysis) and by
+crawl_to_llm's LLMSGenerator, which journals crawled pages and generated
+descriptions per run and finished sites per batch.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+FSYNC_EVERY = 20        # records between fsyncs
+FSYNC_INTERVAL = 1.0    # seconds between fsyncs while records keep coming
+
+
+class CheckpointJournal:
+    """
+    JSON-lines journal of {"kind": ..., **data} records.
+
+    Args:
+        path: Journal file.
+        resume: Load the existing journal into `records` and append to it;
+            otherwise start an empty journal.
+        fsync_every: Records written between fsyncs.
+        fsync_interval: Seconds after which pending records are fsynced.
+    """
+
+    def __init__(self, path: str, resume: bool = False, fsync_every: int = FSYNC_EVERY,
+                 fsync_interval: float = FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.records: List[Dict[str, Any]] = self._replay() if resume else []
+        self._file = open(path, "ab" if resume else "wb")
+        self._pending = 0
+        self._synced = time.monotonic()
+
+    def _replay(self) -> List[Dict[str, Any]]:
+        records, valid = [], 0
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return records
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid += len(line)
+        if valid < os.path.getsize(self.path):
+            # Cut a torn last record so appended records start on a fresh line
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+        return records
+
+    def of(self, kind: str) -> List[Dict[str, Any]]:
+        """Replayed records of one kind, in write order."""
+        return [r for r in self.records if r.get("kind") == kind]
+
+    def append(self, kind: str, **data):
+        self._file.write((json.dumps({"kind": kind, **data}) + "\n").encode("utf-8"))
+        self._pending += 1
+        if self._pending >= self.fsync_every or time.monotonic() - self._synced >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Makes every appended record durable."""
+        if self._file.closed or not self._pending:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._synced = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def complete(self):
+        """The job finished: the journal is no longer needed."""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
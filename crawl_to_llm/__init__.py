@@ -3,6 +3,9 @@ Exports the public API for the crawl_to_llm package.
 """
 from .generator import LLMSGenerator
 from .data_models import Page
+from .browser_pool import BrowserPool
+from .page_store import PageStore
+from .crawl_state import CrawlState
 
-__all__ = ["LLMSGenerator", "Page"]
+__all__ = ["LLMSGenerator", "Page", "BrowserPool", "PageStore", "CrawlState"]
 __version__ = "1.0.0"
@@ -0,0 +1,123 @@
+"""
+Command-line batch runner: generate llms.txt output for many sites in one process.
+
+All sites share one browser pool, one LLM limiter (concurrency and tokens
+per minute) and one description cache; see LLMSGenerator.run_batch.
+
+Usage:
+    python -m crawl_to_llm.batch sites.txt --browsers 4 --llm-concurrency 20 --tpm 90000
+"""
+import argparse
+import asyncio
+import math
+import os
+from typing import Iterable, Optional
+
+from .browser_pool import BrowserPool, POOL_SIZE
+from .data_models import BatchResult
+from .enhancer import AIEnhancer, TPM_BUDGET
+from .generator import LLMSGenerator
+from .rate_limit import AdaptiveLimiter, INITIAL_CONCURRENCY, MAX_CONCURRENCY
+
+
+def read_sites(lines: Iterable[str]) -> list:
+    """URLs from a sites file: one per line, blank lines and # comments skipped, https:// assumed."""
+    sites = []
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            sites.append(line if "://" in line else f"https://{line}")
+    return sites
+
+
+async def run_batch(
+    urls: Iterable[str],
+    strategy: str = "systematic",
+    output_format: str = "text",
+    max_pages: int = 50,
+    incremental: bool = False,
+    browsers: int = POOL_SIZE,
+    llm_concurrency: int = MAX_CONCURRENCY,
+    tpm: Optional[int] = TPM_BUDGET,
+    max_connections: Optional[int] = None,
+    site_concurrency: Optional[int] = None,
+    site_timeout: Optional[float] = None,
+    output_dir: str = "output",
+    resume: bool = False,
+    strip_boilerplate: bool = True,
+    refresh_after_days: Optional[float] = None,
+) -> BatchResult:
+    """
+    Builds a generator with the given global budgets and runs the batch.
+
+    Args:
+        browsers: Browser instances, i.e. sites crawled at once.
+        llm_concurrency: Upper bound on concurrent LLM calls across all sites.
+        tpm: Tokens-per-minute budget across all sites, or None.
+        max_connections: Outbound page fetches across all crawls (split evenly between browsers).
+        site_concurrency: Sites in flight at once (default: browsers).
+        site_timeout: Seconds after which a site is abandoned.
+        resume: Continue an interrupted batch from its checkpoints.
+        strip_boilerplate: Remove blocks repeated across each site's pages.
+        refresh_after_days: Regenerate cached descriptions older than this many days.
+        Other arguments are passed to LLMSGenerator.run for every site.
+    """
+    pool = BrowserPool(size=browsers)
+    limiter = AdaptiveLimiter(initial=min(INITIAL_CONCURRENCY, llm_concurrency), max_limit=llm_concurrency, tpm=tpm)
+    connections = max(1, math.floor(max_connections / browsers)) if max_connections else None
+    generator = LLMSGenerator(browser_pool=pool, enhancer=AIEnhancer(limiter=limiter, refresh_after_days=refresh_after_days),
+                              output_dir=output_dir, connections_per_crawl=connections,
+                              strip_boilerplate=strip_boilerplate)
+    async with pool:
+        return await generator.run_batch(urls, strategy, output_format, max_pages, incremental,
+                                         site_concurrency=site_concurrency, site_timeout=site_timeout,
+                                         resume=resume)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate llms.txt output for a list of sites.")
+    parser.add_argument("sites_file", help="one URL or domain per line")
+    parser.add_argument("--strategy", default="systematic", choices=["systematic", "comprehensive", "sitemap", "sitemap-incremental"])
+    parser.add_argument("--format", default="text", choices=["text", "json", "yaml", "jsonl"])
+    parser.add_argument("--max-pages", type=int, default=50, help="pages per site")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--browsers", type=int, default=POOL_SIZE)
+    parser.add_argument("--llm-concurrency", type=int, default=MAX_CONCURRENCY)
+    parser.add_argument("--tpm", type=int, default=TPM_BUDGET, help="tokens per minute across all sites")
+    parser.add_argument("--max-connections", type=int, default=None, help="outbound page fetches across all crawls")
+    parser.add_argument("--sites-at-once", type=int, default=None, help="default: --browsers")
+    parser.add_argument("--site-timeout", type=float, default=None, help="seconds")
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--resume", action="store_true", help="continue an interrupted batch")
+    parser.add_argument("--keep-boilerplate", action="store_true",
+                        help="keep navigation, footers and other blocks repeated across a site's pages")
+    parser.add_argument("--refresh-after-days", type=float, default=None,
+                        help="regenerate cached AI descriptions older than this (default: never)")
+    parser.add_argument("--summary", default=None, help="summary JSON path (default: <output-dir>/batch-summary.json)")
+    args = parser.parse_args()
+
+    with open(args.sites_file, encoding="utf-8") as f:
+        sites = read_sites(f)
+    summary = asyncio.run(run_batch(
+        sites, args.strategy, args.format, args.max_pages, args.incremental,
+        browsers=args.browsers, llm_concurrency=args.llm_concurrency, tpm=args.tpm,
+        max_connections=args.max_connections, site_concurrency=args.sites_at_once,
+        site_timeout=args.site_timeout, output_dir=args.output_dir, resume=args.resume,
+        strip_boilerplate=not args.keep_boilerplate, refresh_after_days=args.refresh_after_days,
+    ))
+    summary_path = args.summary or os.path.join(args.output_dir, "batch-summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(summary.model_dump_json(indent=2))
+
+    print(f"{'site':<40} {'status':<7} {'pages':>6} {'LLM calls':>9} {'cost $':>9} {'seconds':>8} {'boilerplate':>12}")
+    for site in summary.sites:
+        print(f"{site.url[:40]:<40} {site.status:<7} {site.pages:>6} {site.llm_calls:>9} "
+              f"{site.cost_usd:>9.4f} {site.seconds:>8.1f} {site.boilerplate_tokens_saved:>8} tok")
+    print(f"\n{summary.sites_ok}/{len(summary.sites)} sites ok, {summary.pages} pages in {summary.seconds:.1f}s "
+          f"({summary.pages_per_second} pages/s, {summary.sites_per_minute} sites/min), "
+          f"{summary.llm_calls} LLM calls, {summary.prompt_tokens + summary.completion_tokens} tokens, "
+          f"${summary.cost_usd:.4f}. Summary: {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
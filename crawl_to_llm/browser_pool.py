@@ -0,0 +1,180 @@
+"""
+A managed pool of crawl4ai browser instances shared across crawls.
+Browsers are started once (optionally up front), leased to one crawl at a
+time, recycled after a page budget or a failed health check, and closed
+together when the pool closes.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 2                   # browsers, i.e. concurrent crawls
+MAX_PAGES_PER_BROWSER = 500     # recycle a browser after serving this many pages
+HEALTH_CHECK_INTERVAL = 60.0    # seconds an idle browser is trusted without a probe
+HEALTH_CHECK_TIMEOUT = 15.0
+HEALTH_CHECK_URL = "raw:<html><body>ok</body></html>"   # rendered locally, no network
+
+
+def default_browser_factory():
+    """A headless crawl4ai AsyncWebCrawler (not yet started)."""
+    from crawl4ai import AsyncWebCrawler, BrowserConfig
+    return AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False))
+
+
+class PooledBrowser:
+    """One slot in the pool: the crawler it currently holds and its usage counters."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.crawler: Any = None
+        self.pages = 0          # pages served since launch; callers add to this
+        self.crawls = 0
+        self.launched = 0.0
+        self.checked = 0.0
+        self.broken = False     # the last lease raised; restart before reuse
+
+
+class BrowserPool:
+    """
+    Leases started crawl4ai browsers to crawls and manages their lifecycle.
+
+    A pool belongs to the event loop it was started in. Use it as an async
+    context manager, or call start() / close() yourself.
+
+    Args:
+        size: Number of browsers (and therefore concurrent crawls).
+        max_pages_per_browser: Pages after which a browser is closed and relaunched.
+        health_check_interval: Seconds after which an idle browser is probed before reuse.
+        warm_start: Launch every browser in start() instead of on first lease.
+        factory: Callable returning an unstarted AsyncWebCrawler-like object.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_pages_per_browser: int = MAX_PAGES_PER_BROWSER,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+        warm_start: bool = True,
+        factory: Optional[Callable[[], Any]] = None,
+    ):
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.health_check_interval = health_check_interval
+        self.warm_start = warm_start
+        self.factory = factory or default_browser_factory
+        self.launches = 0
+        self._slots = [PooledBrowser(i) for i in range(size)]
+        self._idle: Optional[asyncio.Queue] = None
+        self._closed = False
+
+    def _queue(self) -> asyncio.Queue:
+        # Created lazily so it binds to the loop the pool is used in
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+        return self._idle
+
+    async def start(self) -> "BrowserPool":
+        """Open the pool; with warm_start, launch all browsers now."""
+        self._closed = False
+        self._queue()
+        if self.warm_start:
+            await asyncio.gather(*(self._launch(s) for s in self._slots if s.crawler is None))
+        return self
+
+    async def close(self):
+        """Close idle browsers now; leased ones are closed when they are released."""
+        self._closed = True
+        if self._idle is None:
+            return
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        await asyncio.gather(*(self._retire(s, "pool closed") for s in idle))
+        for slot in idle:
+            self._idle.put_nowait(slot)
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _launch(self, slot: PooledBrowser):
+        crawler = self.factory()
+        await crawler.start()
+        slot.crawler, slot.pages, slot.crawls, slot.broken = crawler, 0, 0, False
+        slot.launched = slot.checked = time.monotonic()
+        self.launches += 1
+        logger.info(f"Launched browser {slot.index} ({self.launches} launches so far)")
+
+    async def _retire(self, slot: PooledBrowser, reason: str):
+        if slot.crawler is None:
+            return
+        logger.info(f"Closing browser {slot.index}: {reason}")
+        try:
+            await slot.crawler.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser {slot.index}: {e}")
+        slot.crawler = None
+
+    async def _healthy(self, slot: PooledBrowser) -> bool:
+        """Probe the browser with a local page if it has been idle for a while."""
+        if time.monotonic() - slot.checked < self.health_check_interval:
+            return True
+        try:
+            result = await asyncio.wait_for(slot.crawler.arun(url=HEALTH_CHECK_URL), HEALTH_CHECK_TIMEOUT)
+            healthy = bool(getattr(result, "success", False))
+        except Exception as e:
+            logger.warning(f"Health check failed for browser {slot.index}: {e}")
+            healthy = False
+        slot.checked = time.monotonic()
+        return healthy
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Lease a started browser for one crawl; waits while all are busy.
+
+        Yields the PooledBrowser slot: use `slot.crawler`, and add the number
+        of pages crawled to `slot.pages` so the recycle budget is enforced.
+        """
+        if self._closed:
+            raise RuntimeError("BrowserPool is closed")
+        idle = self._queue()
+        slot = await idle.get()
+        try:
+            if slot.crawler is not None:
+                if slot.broken:
+                    await self._retire(slot, "last crawl raised")
+                elif slot.pages >= self.max_pages_per_browser:
+                    await self._retire(slot, f"served {slot.pages} pages")
+                elif not await self._healthy(slot):
+                    await self._retire(slot, "failed health check")
+            if slot.crawler is None:
+                await self._launch(slot)
+            slot.crawls += 1
+            try:
+                yield slot
+            except Exception:
+                # Only real errors count; cancellation or an abandoned stream is not the browser's fault
+                slot.broken = True
+                raise
+            slot.checked = time.monotonic()     # a successful crawl is as good as a probe
+        finally:
+            if self._closed:
+                await self._retire(slot, "pool closed")
+            idle.put_nowait(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "launches": self.launches,
+            "running": sum(1 for s in self._slots if s.crawler is not None),
+            "pages": [s.pages for s in self._slots],
+        }
@@ -0,0 +1,89 @@
+"""
+Per-site crawl state for incremental recrawls.
+
+For every URL crawled from a site's sitemap, one SQLite file per site
+keeps the sitemap <lastmod>, the HTTP validators (ETag, Last-Modified), a
+hash of the content and the page itself. A recrawl fetches only URLs whose
+lastmod advanced (or that cannot be shown unchanged) and serves the rest
+from here.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+STATE_DIR = ".crawl_state"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class CrawlState:
+    """
+    SQLite-backed URL -> (lastmod, validators, content hash, page) store for one site.
+
+    Args:
+        domain: Site the state belongs to (names the file).
+        state_dir: Directory holding one database per site.
+    """
+
+    def __init__(self, domain: str, state_dir: str = STATE_DIR):
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, domain.replace("/", "_").replace(":", "_") + ".db")
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")   # a lost last write only costs one recrawl
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages(
+                 url TEXT PRIMARY KEY, lastmod TEXT, etag TEXT, last_modified TEXT,
+                 content_hash TEXT, title TEXT, word_count INTEGER, metadata TEXT,
+                 content TEXT, crawled REAL)"""
+        )
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Stored validators of url (no page content), or None if it was never crawled."""
+        row = self.conn.execute(
+            "SELECT lastmod, etag, last_modified, content_hash FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"lastmod": row[0], "etag": row[1], "last_modified": row[2], "content_hash": row[3]}
+
+    def page(self, url: str) -> Optional[Dict[str, Any]]:
+        """The stored page (url, title, content, word_count, metadata), or None."""
+        row = self.conn.execute(
+            "SELECT title, content, word_count, metadata FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"url": url, "title": row[0], "content": row[1], "word_count": row[2],
+                "metadata": json.loads(row[3] or "{}")}
+
+    def put(self, url: str, title: str, content: str, word_count: int, metadata: Dict[str, Any],
+            lastmod: Optional[str] = None, etag: Optional[str] = None, last_modified: Optional[str] = None) -> bool:
+        """Stores a freshly crawled page. Returns True if its content differs from the stored one."""
+        new_hash = content_hash(content)
+        old = self.get(url)
+        self.conn.execute(
+            """INSERT OR REPLACE INTO pages
+               (url, lastmod, etag, last_modified, content_hash, title, word_count, metadata, content, crawled)
+               VALUES (?,?,?,?,?,?,?,?,?,?)""",
+            (url, lastmod, etag, last_modified, new_hash, title, word_count,
+             json.dumps(metadata, default=str), content, time.time()),
+        )
+        self.conn.commit()
+        return old is None or old["content_hash"] != new_hash
+
+    def prune(self, keep) -> int:
+        """Drops pages whose URL is not in keep (e.g. removed from the sitemap). Returns how many."""
+        keep = set(keep)
+        stale = [url for (url,) in self.conn.execute("SELECT url FROM pages") if url not in keep]
+        self.conn.executemany("DELETE FROM pages WHERE url = ?", ((url,) for url in stale))
+        self.conn.commit()
+        return len(stale)
+
+    def close(self):
+        self.conn.close()
@@ -2,10 +2,17 @@
 A clean, focused wrapper around the web crawling logic.
 This module abstracts the underlying crawl4ai library.
 """
+import asyncio
 import logging
 import urllib.parse
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
 from .data_models import Page
+from .page_store import PageStore, count_words
+from .browser_pool import BrowserPool
+from .crawl_state import CrawlState, STATE_DIR
+from .sitemap import SitemapEntry, USER_AGENT, fetch_sitemap, lastmod_advanced
+
+CONDITIONAL_CHECKS = 8      # concurrent If-None-Match requests for sitemap URLs without a lastmod
 
 # Set up a logger for this module
 logger = logging.getLogger(__name__)
@@ -13,15 +20,52 @@ logger = logging.getLogger(__name__)
 class WebCrawler:
     """
     Crawls a website using various strategies and returns structured page data.
+
+    Browsers come from a BrowserPool, so repeated crawls reuse running
+    browsers. Pass a pool to share it with other crawlers; otherwise the
+    crawler owns one. Use `async with WebCrawler() as crawler` (or call
+    close()) to shut the browsers down.
+
+    The 'sitemap-incremental' strategy keeps per-site state (see CrawlState)
+    and recrawls only sitemap URLs that are new or whose lastmod advanced;
+    unchanged pages are served from the state.
+
+    Args:
+        pool: Browser pool to lease browsers from.
+        connections_per_crawl: Pages one crawl fetches concurrently (crawl4ai's
+            semaphore_count); None keeps crawl4ai's default. Outbound connections
+            are then bounded by pool size * connections_per_crawl.
+        state_dir: Where the incremental strategy keeps its per-site state.
     """
-    async def crawl(self, base_url: str, strategy: str = 'systematic', max_pages: int = 50) -> List[Page]:
+    def __init__(self, pool: Optional[BrowserPool] = None, connections_per_crawl: Optional[int] = None,
+                 state_dir: str = STATE_DIR):
+        self.pool = pool or BrowserPool(warm_start=False)
+        self._owns_pool = pool is None
+        self.connections_per_crawl = connections_per_crawl
+        self.state_dir = state_dir
+
+    async def __aenter__(self) -> "WebCrawler":
+        await self.pool.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Closes the browser pool if this crawler created it."""
+        if self._owns_pool:
+            await self.pool.close()
+
+    async def crawl(self, base_url: str, strategy: str = 'systematic', max_pages: int = 50,
+                    page_store: Optional[PageStore] = None) -> List[Page]:
         """
         The main public method to start a crawl.
 
         Args:
             base_url: The starting URL to crawl.
-            strategy: The crawling strategy ('systematic', 'comprehensive', 'sitemap').
+            strategy: The crawling strategy ('systematic', 'comprehensive', 'sitemap', 'sitemap-incremental').
             max_pages: The maximum number of pages to retrieve.
+            page_store: Spill page content to this store; pages then carry only a handle.
 
         Returns:
             A list of Page objects.
@@ -34,93 +78,323 @@ class WebCrawler:
             return []
 
         if strategy == "sitemap":
-            return await self._crawl_from_sitemap(base_url, max_pages)
+            return await self._crawl_from_sitemap(base_url, max_pages, page_store)
+        elif strategy == "sitemap-incremental":
+            return [page async for page in self._crawl_incremental(base_url, max_pages, page_store)]
         else:
-            return await self._crawl_website(base_url, strategy, max_pages)
+            return await self._crawl_website(base_url, strategy, max_pages, page_store)
+
+    async def crawl_stream(self, base_url: str, strategy: str = 'systematic', max_pages: int = 50,
+                           page_store: Optional[PageStore] = None) -> AsyncIterator[Page]:
+        """
+        Like crawl(), but yields each Page as soon as crawl4ai produces it.
+
+        The browser stays leased while the caller consumes the stream, so a
+        slow consumer slows the crawl down instead of letting results pile up.
+
+        Args:
+            base_url: The starting URL to crawl.
+            strategy: The crawling strategy ('systematic', 'comprehensive', 'sitemap', 'sitemap-incremental').
+            max_pages: The maximum number of pages to yield.
+            page_store: Spill page content to this store; pages then carry only a handle.
+        """
+        logger.info(f"Starting streaming crawl for '{base_url}' with strategy '{strategy}' (max_pages: {max_pages})")
+        if strategy == "sitemap-incremental":
+            pages = self._crawl_incremental(base_url, max_pages, page_store)
+            try:
+                async for page in pages:
+                    yield page
+            finally:
+                await pages.aclose()
+            return
+        try:
+            if strategy == "sitemap":
+                config = self._sitemap_config(max_pages, stream=True)
+            else:
+                config = self._website_config(strategy, max_pages, stream=True)
+        except ImportError:
+            logger.error("crawl4ai is not installed. Please run: pip install 'crawl4ai[all]'")
+            return
+
+        count = 0
+        try:
+            async with self.pool.acquire() as browser:
+                results = await browser.crawler.arun(url=base_url, config=config)
+                if not hasattr(results, "__aiter__"):
+                    # Single-page crawls come back as one result even with stream=True
+                    results = _as_async_iter(results if isinstance(results, list) else [results] if results else [])
+                try:
+                    async for result in results:
+                        browser.pages += 1
+                        page = self._to_page(result, page_store)
+                        if page is None:
+                            continue
+                        yield page
+                        count += 1
+                        if count >= max_pages:
+                            break
+                finally:
+                    if hasattr(results, "aclose"):
+                        await results.aclose()
+        except Exception as e:
+            logger.error(f"An error occurred during streaming crawl: {e}", exc_info=True)
+        logger.info(f"Streaming crawl for '{base_url}' yielded {count} pages")
+
+    def _website_config(self, strategy: str, max_pages: int, stream: bool = False):
+        """Run config for a systematic or comprehensive crawl."""
+        from crawl4ai import CrawlerRunConfig
+        from crawl4ai.deep_crawling import BestFirstCrawlingStrategy
+        from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+
+        is_comprehensive = strategy == 'comprehensive'
+
+        deep_crawl_strategy = BestFirstCrawlingStrategy(
+            max_depth=6 if is_comprehensive else 2,
+            max_pages=max_pages * 2,  # Discover more pages than the target
+            include_external=False
+        )
 
-    async def _crawl_website(self, base_url: str, strategy: str, max_pages: int) -> List[Page]:
+        return CrawlerRunConfig(
+            deep_crawl_strategy=deep_crawl_strategy,
+            scraping_strategy=LXMLWebScrapingStrategy(),
+            word_count_threshold=50,
+            page_timeout=30000,
+            stream=stream,
+            **self._connection_limit()
+        )
+
+    def _sitemap_config(self, max_pages: int, stream: bool = False):
+        """Run config for a sitemap crawl."""
+        from crawl4ai import CrawlerRunConfig
+        from crawl4ai import SitemapCrawlingStrategy
+        from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+
+        return CrawlerRunConfig(
+            scraping_strategy=LXMLWebScrapingStrategy(),
+            word_count_threshold=50,
+            page_timeout=15000,
+            deep_crawl_strategy=SitemapCrawlingStrategy(
+                max_pages=max_pages
+            ),
+            stream=stream,
+            **self._connection_limit()
+        )
+
+    def _connection_limit(self) -> dict:
+        if self.connections_per_crawl is None:
+            return {}
+        return {"semaphore_count": self.connections_per_crawl}
+
+    async def _crawl_website(self, base_url: str, strategy: str, max_pages: int,
+                             page_store: Optional[PageStore] = None) -> List[Page]:
         """Performs a systematic or comprehensive crawl."""
         try:
-            from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
-            from crawl4ai.deep_crawling import BestFirstCrawlingStrategy
-            from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
-            import urllib.parse
-
-            base_domain = urllib.parse.urlparse(base_url).netloc
-            is_comprehensive = strategy == 'comprehensive'
-
-            deep_crawl_strategy = BestFirstCrawlingStrategy(
-                max_depth=6 if is_comprehensive else 2,
-                max_pages=max_pages * 2,  # Discover more pages than the target
-                include_external=False
-            )
-
-            config = CrawlerRunConfig(
-                deep_crawl_strategy=deep_crawl_strategy,
-                scraping_strategy=LXMLWebScrapingStrategy(),
-                word_count_threshold=50,
-                page_timeout=30000
-            )
-
-            results = await AsyncWebCrawler().arun(url=base_url, config=config)
-            
-            # Ensure results are always in a list
-            if not isinstance(results, list):
-                results = [results] if results else []
-
-            crawled_pages = self._process_crawl_results(results)
+            config = self._website_config(strategy, max_pages)
+
+            async with self.pool.acquire() as browser:
+                results = await browser.crawler.arun(url=base_url, config=config)
+
+                # Ensure results are always in a list
+                if not isinstance(results, list):
+                    results = [results] if results else []
+                browser.pages += len(results)
+
+            crawled_pages = self._process_crawl_results(results, page_store)
             return crawled_pages[:max_pages]
 
         except Exception as e:
             logger.error(f"An error occurred during website crawl: {e}", exc_info=True)
             return []
 
-    async def _crawl_from_sitemap(self, base_url: str, max_pages: int) -> List[Page]:
+    async def _crawl_from_sitemap(self, base_url: str, max_pages: int,
+                                  page_store: Optional[PageStore] = None) -> List[Page]:
         """Crawls a website using its sitemap."""
         try:
-            from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
-            from crawl4ai import SitemapCrawlingStrategy
-            from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
-
-            config = CrawlerRunConfig(
-                scraping_strategy=LXMLWebScrapingStrategy(),
-                word_count_threshold=50,
-                page_timeout=15000,
-                deep_crawl_strategy=SitemapCrawlingStrategy(
-                    max_pages=max_pages
-                )
-            )
-
-            results = await AsyncWebCrawler().arun(url=base_url, config=config)
-            
-            if not isinstance(results, list):
-                results = [results] if results else []
-            
-            crawled_pages = self._process_crawl_results(results)
+            config = self._sitemap_config(max_pages)
+
+            async with self.pool.acquire() as browser:
+                results = await browser.crawler.arun(url=base_url, config=config)
+
+                if not isinstance(results, list):
+                    results = [results] if results else []
+                browser.pages += len(results)
+
+            crawled_pages = self._process_crawl_results(results, page_store)
             return crawled_pages[:max_pages]
 
         except Exception as e:
             logger.error(f"An error occurred during sitemap crawl: {e}", exc_info=True)
             return []
 
-    def _process_crawl_results(self, results: list) -> List[Page]:
+    def _pages_config(self, stream: bool = False):
+        """Run config for fetching a given list of URLs (no link following)."""
+        from crawl4ai import CrawlerRunConfig
+        from crawl4ai.content_scraping_strategy import LXMLWebScrapingStrategy
+
+        return CrawlerRunConfig(
+            scraping_strategy=LXMLWebScrapingStrategy(),
+            word_count_threshold=50,
+            page_timeout=15000,
+            stream=stream,
+            **self._connection_limit()
+        )
+
+    async def _crawl_incremental(self, base_url: str, max_pages: int,
+                                 page_store: Optional[PageStore] = None) -> AsyncIterator[Page]:
+        """
+        Recrawls only what changed according to the sitemap; yields unchanged pages from CrawlState.
+
+        A sitemap URL is crawled when it is new, its <lastmod> advanced, or it
+        has no lastmod and a conditional GET with the stored ETag /
+        Last-Modified does not answer 304. URLs gone from the sitemap are
+        dropped from the state. Without a sitemap this falls back to a
+        systematic crawl.
+        """
+        try:
+            import aiohttp
+            config = self._pages_config(stream=True)
+        except ImportError:
+            logger.error("crawl4ai is not installed. Please run: pip install 'crawl4ai[all]'")
+            return
+
+        state = CrawlState(urllib.parse.urlsplit(base_url).netloc, self.state_dir)
+        try:
+            async with aiohttp.ClientSession(headers={"User-Agent": USER_AGENT}) as session:
+                entries = await fetch_sitemap(session, base_url)
+                if not entries:
+                    logger.warning(f"No sitemap found for '{base_url}'; falling back to a systematic crawl")
+                    state.close()
+                    async for page in self.crawl_stream(base_url, "systematic", max_pages, page_store):
+                        yield page
+                    return
+                dropped = state.prune(entry.loc for entry in entries)
+                entries = entries[:max_pages]
+                stale, new = await self._changed_entries(session, state, entries)
+
+            unchanged = [entry for entry in entries if entry.loc not in stale]
+            logger.info(f"Incremental sitemap crawl for '{base_url}': recrawling {len(stale)} of {len(entries)} URLs "
+                        f"({len(new)} new), {len(unchanged)} unchanged, "
+                        f"{dropped} removed from the sitemap")
+            for entry in unchanged:
+                yield self._stored_page(state.page(entry.loc), page_store)
+
+            crawled = set()
+            if stale:
+                async with self.pool.acquire() as browser:
+                    results = await browser.crawler.arun_many(urls=list(stale), config=config)
+                    if not hasattr(results, "__aiter__"):
+                        results = _as_async_iter(results if isinstance(results, list) else [results] if results else [])
+                    try:
+                        async for result in results:
+                            browser.pages += 1
+                            page = self._to_page(result, page_store)
+                            if page is None or page.url not in stale:
+                                continue
+                            headers = {k.lower(): v for k, v in (getattr(result, "response_headers", None) or {}).items()}
+                            state.put(page.url, page.title, page.read_content(), page.word_count, page.metadata,
+                                      lastmod=stale[page.url].lastmod,
+                                      etag=headers.get("etag"), last_modified=headers.get("last-modified"))
+                            crawled.add(page.url)
+                            yield page
+                    finally:
+                        if hasattr(results, "aclose"):
+                            await results.aclose()
+            # A page that failed to recrawl is still better served stale than dropped
+            for url in stale.keys() - crawled:
+                stored = state.page(url)
+                if stored is not None:
+                    logger.warning(f"Recrawl of {url} failed; using the stored copy")
+                    yield self._stored_page(stored, page_store)
+        except Exception as e:
+            logger.error(f"An error occurred during incremental sitemap crawl: {e}", exc_info=True)
+        finally:
+            state.close()
+
+    async def _changed_entries(self, session, state: CrawlState,
+                               entries: List[SitemapEntry]) -> Tuple[Dict[str, SitemapEntry], Set[str]]:
+        """
+        URLs to recrawl mapped to their sitemap entry, and the subset never crawled before.
+        """
+        import aiohttp
+        changed: Dict[str, SitemapEntry] = {}
+        new = set()
+        to_check = []
+        for entry in entries:
+            stored = state.get(entry.loc)
+            if stored is None:
+                changed[entry.loc] = entry
+                new.add(entry.loc)
+            elif entry.lastmod is not None and stored["lastmod"] is not None:
+                if lastmod_advanced(entry.lastmod, stored["lastmod"]):
+                    changed[entry.loc] = entry
+            elif stored["etag"] or stored["last_modified"]:
+                to_check.append((entry, stored))
+            else:
+                changed[entry.loc] = entry
+
+        semaphore = asyncio.Semaphore(CONDITIONAL_CHECKS)
+
+        async def unchanged(entry: SitemapEntry, stored) -> bool:
+            headers = {}
+            if stored["etag"]:
+                headers["If-None-Match"] = stored["etag"]
+            if stored["last_modified"]:
+                headers["If-Modified-Since"] = stored["last_modified"]
+            async with semaphore:
+                try:
+                    async with session.get(entry.loc, headers=headers, allow_redirects=False,
+                                           timeout=aiohttp.ClientTimeout(total=15)) as resp:
+                        return resp.status == 304
+                except Exception:
+                    return False
+
+        results = await asyncio.gather(*(unchanged(entry, stored) for entry, stored in to_check))
+        for (entry, _), same in zip(to_check, results):
+            if not same:
+                changed[entry.loc] = entry
+        return changed, new
+
+    def _stored_page(self, stored: dict, page_store: Optional[PageStore] = None) -> Page:
+        content = stored.pop("content")
+        if page_store is not None:
+            return Page(content="", content_ref=page_store.put(content), **stored)
+        return Page(content=content, **stored)
+
+    def _process_crawl_results(self, results: list, page_store: Optional[PageStore] = None) -> List[Page]:
         """Converts raw crawl4ai results into a list of Page objects."""
         pages = []
         for result in results:
-            if result and result.success:
-                content = ""
-                if hasattr(result, 'markdown') and result.markdown:
-                    content = result.markdown.raw_markdown or ""
-                elif hasattr(result, 'cleaned_html') and result.cleaned_html:
-                    content = result.cleaned_html
-
-                word_count = len(content.split())
-                if word_count > 0:
-                    pages.append(Page(
-                        url=result.url,
-                        title=result.metadata.get('title', 'Untitled'),
-                        content=content,
-                        word_count=word_count,
-                        metadata=result.metadata or {}
-                    ))
+            page = self._to_page(result, page_store)
+            if page is not None:
+                pages.append(page)
         return pages
+
+    def _to_page(self, result, page_store: Optional[PageStore] = None) -> Optional[Page]:
+        """
+        Converts one crawl4ai result into a Page, or None if it failed or is empty.
+        With a page_store the content is written there and the Page holds only its handle.
+        """
+        if not (result and result.success):
+            return None
+        content = ""
+        if hasattr(result, 'markdown') and result.markdown:
+            content = result.markdown.raw_markdown or ""
+        elif hasattr(result, 'cleaned_html') and result.cleaned_html:
+            content = result.cleaned_html
+
+        word_count = count_words(content)
+        if word_count == 0:
+            return None
+        return Page(
+            url=result.url,
+            title=result.metadata.get('title', 'Untitled'),
+            content="" if page_store is not None else content,
+            content_ref=page_store.put(content) if page_store is not None else None,
+            word_count=word_count,
+            metadata=result.metadata or {}
+        )
+
+
+async def _as_async_iter(items):
+    for item in items:
+        yield item
@@ -2,18 +2,70 @@
 Defines the core Pydantic models for data structures.
 """
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_serializer
+
+from .page_store import ContentRef
 
 class Page(BaseModel):
-    """Represents a single crawled web page."""
+    """
+    Represents a single crawled web page.
+
+    When the crawl spills content to a PageStore, `content` is empty and
+    `content_ref` points at the stored text; use read_content() rather than
+    `content` directly. Serialization (model_dump / model_dump_json) always
+    includes the full content.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     url: str
     title: str
     content: str
     word_count: int
     description: Optional[str] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    content_ref: Optional[ContentRef] = Field(default=None, exclude=True, repr=False)
+
+    def read_content(self, max_chars: Optional[int] = None) -> str:
+        """The page content, loaded from the page store if it was spilled there."""
+        if self.content_ref is not None:
+            return self.content_ref.read(max_chars)
+        return self.content if max_chars is None else self.content[:max_chars]
+
+    @field_serializer("content")
+    def _serialize_content(self, content: str) -> str:
+        return self.read_content() if self.content_ref is not None else content
 
 class CrawlResult(BaseModel):
     """Represents the complete result of a crawl operation."""
     pages: List[Page]
     metadata: Dict[str, Any] = Field(default_factory=dict)
+
+class SiteResult(BaseModel):
+    """Outcome of one LLMSGenerator.run (one site)."""
+    url: str
+    status: str = "ok"      # ok | empty | error
+    pages: int = 0
+    changed: Optional[int] = None   # pages whose content changed, for incremental runs
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    seconds: float = 0.0
+    boilerplate_bytes_saved: int = 0    # content removed as cross-page boilerplate
+    boilerplate_tokens_saved: int = 0   # the same, estimated in tokens
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    """Summary of a multi-site LLMSGenerator.run_batch."""
+    sites: List[SiteResult]
+    sites_ok: int = 0
+    sites_failed: int = 0
+    pages: int = 0
+    seconds: float = 0.0
+    pages_per_second: float = 0.0
+    sites_per_minute: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    metrics: Dict[str, Any] = Field(default_factory=dict)
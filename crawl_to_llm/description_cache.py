@@ -0,0 +1,99 @@
+"""
+Persistent cache of AI page descriptions.
+
+Entries are keyed by a hash of everything that determines the output: the
+model, its sampling settings, the prompt template and the page's title and
+content. An unchanged page therefore always gets the same description, and
+changing the prompt or model invalidates old entries automatically.
+Storage is a single SQLite file, bounded by least-recently-used eviction.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+
+CACHE_PATH = ".cache_descriptions.db"
+MAX_ENTRIES = 200_000
+EVICT_SLACK = 0.1           # let the table grow 10% past max_entries before trimming it
+
+
+class DescriptionCache:
+    """
+    SQLite-backed description cache.
+
+    Args:
+        path: Database file.
+        max_entries: Size cap; least recently used entries are evicted beyond it.
+        refresh_after_days: Treat entries older than this as misses, so they are regenerated.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = MAX_ENTRIES,
+                 refresh_after_days: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.refresh_after_days = refresh_after_days
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")   # a lost last write only costs one regeneration
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS descriptions(
+                 key TEXT PRIMARY KEY, description TEXT, created REAL, used REAL)"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS descriptions_used ON descriptions(used)")
+        self._count = self.conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(title: str, content: str, model: str, prompt_template: str, **settings) -> str:
+        """Cache key for one page under one model / prompt configuration."""
+        spec = json.dumps([model, prompt_template, sorted(settings.items())])
+        h = hashlib.sha256(spec.encode("utf-8"))
+        h.update(b"\0" + title.encode("utf-8") + b"\0" + content.encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT description, created FROM descriptions WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.refresh_after_days is not None
+                           and now - row[1] > self.refresh_after_days * 86400):
+            self.misses += 1
+            return None
+        self.conn.execute("UPDATE descriptions SET used = ? WHERE key = ?", (now, key))
+        self.conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, description: str):
+        now = time.time()
+        exists = self.conn.execute("SELECT 1 FROM descriptions WHERE key = ?", (key,)).fetchone()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO descriptions (key, description, created, used) VALUES (?,?,?,?)",
+            (key, description, now, now),
+        )
+        if not exists:
+            self._count += 1
+        if self._count > self.max_entries * (1 + EVICT_SLACK):
+            self.evict()
+        self.conn.commit()
+
+    def evict(self):
+        """Trims the table to max_entries, dropping the least recently used entries."""
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM descriptions WHERE key IN (SELECT key FROM descriptions ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+            self.conn.commit()
+            self._count = self.max_entries
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        self.conn.close()
@@ -3,17 +3,106 @@ Handles the AI-based description generation ("enhancing" the crawled data) using
 """
 import asyncio
 import logging
-from typing import List, Optional
+import time
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional, Union
+import llm_client
+from llm_client import LLMClient, LLMUnavailable, backoff_delay, is_retryable, retry_after, status_of, token_counts
 from .data_models import Page
+from .description_cache import DescriptionCache
+from .rate_limit import AdaptiveLimiter, MAX_RETRIES
 import os
 
 logger = logging.getLogger(__name__)
 
+# Placeholder descriptions written when generation fails; never worth reusing
+NO_DESCRIPTION = "AI description could not be generated."
+FAILED_DESCRIPTION = "AI enhancement failed due to an error."
+
+QUEUE_SIZE = 20     # pages buffered between pipeline stages
+MODEL = "gpt-3.5-turbo"
+TEMPERATURE = 0.7
+MAX_TOKENS = 128    # completion budget per description
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes web pages."
+PROMPT_TEMPLATE = """
+        Analyze the following webpage content and generate a concise, one-sentence description.
+        Focus on the main purpose or key takeaway of the page. Do not use phrases like "This page is about".
+
+        **Page Title:** "{title}"
+        **Page Content Snippet:**
+        ---
+        {content_snippet}
+        ---
+        
+        **Concise one-sentence description:**
+        """
+TPM_BUDGET = int(os.getenv("OPENAI_TPM", "0")) or None   # tokens per minute; unset = no budget
+CALL_SITE = "enhancer.describe"         # name of the description calls in llm_client stats
+
+
+def new_usage() -> Dict[str, int]:
+    """Counters for LLM calls and the tokens they used."""
+    return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+
+def estimate_cost(usage: Dict[str, int]) -> float:
+    """USD cost of the tokens counted in a usage dict at MODEL's price in llm_client.PRICES."""
+    return llm_client.cost_of(MODEL, usage["prompt_tokens"], usage["completion_tokens"])
+
+
 class AIEnhancer:
     """
     Takes a list of Page objects and populates their description field using OpenAI.
+
+    Calls go through an AdaptiveLimiter: concurrency adapts to latency and
+    429s, Retry-After is honoured, failed calls are retried with jittered
+    backoff, and an optional tokens-per-minute budget is enforced.
+
+    Descriptions are cached by a hash of the page's title and content plus
+    the model, sampling settings and prompt template, so unchanged pages
+    keep their description across runs without an API call.
+
+    Args:
+        limiter: Shared limiter (e.g. one per API key across enhancers).
+        max_retries: Retries per page for 429s, 5xx, timeouts and connection errors.
+        cache: Description cache; None opens the default one, False disables caching.
+        refresh_after_days: Regenerate cached descriptions older than this (default cache only).
+        client: LLM client whose per-call-site stats record the calls (default: the process-wide
+            llm_client one, so the calls show up in llm_client.stats()).
     """
 
+    def __init__(self, limiter: Optional[AdaptiveLimiter] = None, max_retries: int = MAX_RETRIES,
+                 cache: Union[DescriptionCache, bool, None] = None, client: Optional[LLMClient] = None,
+                 refresh_after_days: Optional[float] = None):
+        self.limiter = limiter or AdaptiveLimiter(tpm=TPM_BUDGET)
+        self.client = client or llm_client.get_client()
+        self.max_retries = max_retries
+        if cache is None:
+            cache = DescriptionCache(refresh_after_days=refresh_after_days)
+        self.cache = cache if cache is not False else None
+        self.usage = new_usage()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current concurrency, retries, throttling, token usage and cache hits."""
+        metrics = self.limiter.metrics()
+        metrics.update(self.usage)
+        if self.cache is not None:
+            metrics.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses)
+        return metrics
+
+    def _cache_key(self, page: Page) -> str:
+        return DescriptionCache.key(page.title, page.read_content(), MODEL, SYSTEM_PROMPT + PROMPT_TEMPLATE,
+                                    temperature=TEMPERATURE, max_tokens=MAX_TOKENS)
+
+    def from_cache(self, page: Page) -> bool:
+        """Fills in a cached description; True on a hit."""
+        if self.cache is None:
+            return False
+        description = self.cache.get(self._cache_key(page))
+        if description is None:
+            return False
+        page.description = description
+        return True
+
     async def enhance_pages(self, pages: List[Page]) -> List[Page]:
         """
         Processes a list of pages in parallel to generate descriptions using OpenAI.
@@ -24,85 +113,146 @@ class AIEnhancer:
         Returns:
             The list of Page objects with descriptions populated.
         """
-        semaphore = asyncio.Semaphore(5)
-        tasks = []
-        for page in pages:
-            task = asyncio.create_task(self._enhance_single_page(page, semaphore))
-            tasks.append(task)
-        
-        enhanced_pages = await asyncio.gather(*tasks)
-        return [p for p in enhanced_pages if p]
+        async for _ in self.enhance_stream(_as_async_iter(pages), overwrite=True):
+            pass
+        return pages
 
-    async def _enhance_single_page(self, page: Page, semaphore: asyncio.Semaphore) -> Optional[Page]:
-        """Generates a description for a single page using OpenAI."""
-        async with semaphore:
-            prompt = self._create_prompt(page)
+    async def enhance_stream(self, pages: AsyncIterable[Page], queue_size: int = QUEUE_SIZE,
+                             overwrite: bool = False, workers: Optional[int] = None,
+                             usage: Optional[Dict[str, int]] = None,
+                             cache_lookup: bool = True) -> AsyncIterator[Page]:
+        """
+        Enhances pages as they arrive and yields them as soon as they are done.
+
+        Pages flow through bounded queues, so a slow LLM stops pulling from
+        the source and a slow consumer stops the LLM workers: at most about
+        2 * queue_size + limiter.max_limit pages are in memory. Output order
+        is completion order.
+
+        Args:
+            pages: Async iterable of Page objects (e.g. WebCrawler.crawl_stream).
+            queue_size: Capacity of the inbound and outbound queues.
+            overwrite: Regenerate descriptions that are already set (by default such pages pass through).
+            workers: Cap on this stream's concurrent LLM calls (default: the limiter's max). Streams
+                sharing one limiter also get a fair share of it; see AdaptiveLimiter.join().
+            usage: Dict from new_usage() to which this stream's calls and tokens are added.
+            cache_lookup: Look pages up in the description cache; False when the caller already did
+                (new descriptions are still stored).
+        """
+        # The limiter decides how many workers, across all streams, call the API at once
+        workers = min(workers or self.limiter.max_limit, self.limiter.max_limit)
+        inbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        outbox: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        errors = []
+
+        async def feed():
             try:
-                description = await self._generate_with_openai(prompt)
-                page.description = description.strip() if description else "AI description could not be generated."
-                return page
+                async for page in pages:
+                    # Pages that need no API call bypass the workers and the limiter
+                    if (not overwrite and page.description is not None) or (cache_lookup and self.from_cache(page)):
+                        await outbox.put(page)
+                    else:
+                        await inbox.put(page)
+            except Exception as e:
+                errors.append(e)
+            for _ in range(workers):
+                await inbox.put(None)
+
+        async def work():
+            while True:
+                page = await inbox.get()
+                if page is None:
+                    await outbox.put(None)
+                    return
+                if overwrite or page.description is None:
+                    page = await self._enhance_single_page(page, usage, stream)
+                await outbox.put(page)
+
+        stream = self.limiter.join()
+        tasks = [asyncio.create_task(feed())] + [asyncio.create_task(work()) for _ in range(workers)]
+        try:
+            finished = 0
+            while finished < workers:
+                page = await outbox.get()
+                if page is None:
+                    finished += 1
+                    continue
+                yield page
+            if errors:
+                raise errors[0]
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.limiter.leave(stream)
+
+    async def _enhance_single_page(self, page: Page, usage: Optional[Dict[str, int]] = None,
+                                   stream: Optional[object] = None) -> Optional[Page]:
+        """Generates a description for a single page using OpenAI, retrying transient failures."""
+        prompt = self._create_prompt(page)
+        # OpenAI counts prompt + max_tokens against the TPM limit when the request is admitted
+        tokens = len(prompt) // 4 + MAX_TOKENS
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(tokens, stream)
+            start = time.monotonic()
+            try:
+                description = await self._generate_with_openai(prompt, usage)
+            except asyncio.CancelledError:
+                # A cancelled run must not keep its slot, or the limiter starves every later caller
+                await self.limiter.release(stream=stream)
+                raise
             except Exception as e:
+                wait = retry_after(e)
+                await self.limiter.release(throttled=status_of(e) == 429, retry_after=wait, stream=stream)
+                if attempt < self.max_retries and is_retryable(e):
+                    # With Retry-After the limiter already holds every caller back
+                    delay = 0.0 if wait is not None else backoff_delay(attempt)
+                    self.limiter.record_retry(delay)
+                    self.client.record_retry(CALL_SITE)
+                    logger.warning(f"Retrying {page.url} (attempt {attempt + 1}/{self.max_retries}): {e}")
+                    await asyncio.sleep(delay)
+                    continue
                 logger.error(f"Failed to enhance page {page.url}: {e}")
-                page.description = "AI enhancement failed due to an error."
+                page.description = FAILED_DESCRIPTION
                 return page
+            await self.limiter.release(latency=time.monotonic() - start, stream=stream)
+            if description and description.strip():
+                page.description = description.strip()
+                if self.cache is not None:
+                    self.cache.put(self._cache_key(page), page.description)
+            else:
+                page.description = NO_DESCRIPTION
+            return page
 
     def _create_prompt(self, page: Page) -> str:
         """Creates a standardized prompt for the LLM."""
-        content_snippet = (page.content[:2000] + '...') if len(page.content) > 2000 else page.content
-        return f"""
-        Analyze the following webpage content and generate a concise, one-sentence description.
-        Focus on the main purpose or key takeaway of the page. Do not use phrases like "This page is about".
+        content = page.read_content(2001)     # one character more tells whether it was cut
+        content_snippet = (content[:2000] + '...') if len(content) > 2000 else content
+        return PROMPT_TEMPLATE.format(title=page.title, content_snippet=content_snippet)
 
-        **Page Title:** "{page.title}"
-        **Page Content Snippet:**
-        ---
-        {content_snippet}
-        ---
-        
-        **Concise one-sentence description:**
-        """
+    def _record_usage(self, response, messages: List[Dict[str, str]], usage: Optional[Dict[str, int]]):
+        """Counts one call's tokens, from the response when it reports them, else estimated."""
+        prompt_tokens, completion_tokens = token_counts(response, messages)
+        counts = {"calls": 1, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+        for target in (self.usage, usage):
+            if target is not None:
+                for key, value in counts.items():
+                    target[key] += value
 
-    async def _generate_with_openai(self, prompt: str) -> str:
-        """Generates content using the OpenAI API."""
+    async def _generate_with_openai(self, prompt: str, usage: Optional[Dict[str, int]] = None) -> str:
+        """Generates content using the OpenAI API, through the instrumented client."""
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}]
         try:
-            import openai
-        except ImportError:
-            logger.error("openai is not installed. Please run: pip install openai")
+            # Retries are ours (see _enhance_single_page), driven by the limiter
+            response = await self.client.achat(CALL_SITE, retries=0, model=MODEL, messages=messages,
+                                               max_tokens=MAX_TOKENS, temperature=TEMPERATURE)
+        except LLMUnavailable as e:
+            logger.error(str(e))
             return ""
-        import os
+        self._record_usage(response, messages, usage)
+        return (response.choices[0].message.content or "").strip()
 
-        api_key = os.getenv("OPENAI_API_KEY")
-        model = "gpt-3.5-turbo"
-        if not api_key:
-            logger.error("OpenAI API key not found in environment variable.")
-            return ""
-        openai.api_key = api_key
 
-        # Use openai's async API if available, else run in thread
-        try:
-            response = await openai.ChatCompletion.acreate(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that summarizes web pages."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=128,
-                temperature=0.7,
-            )
-            return response.choices[0].message.content.strip()
-        except AttributeError:
-            # Fallback for older openai versions (run in thread)
-            import asyncio
-            loop = asyncio.get_event_loop()
-            def sync_call():
-                return openai.ChatCompletion.create(
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant that summarizes web pages."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    max_tokens=128,
-                    temperature=0.7,
-                )
-            resp = await loop.run_in_executor(None, sync_call)
-            return resp.choices[0].message.content.strip()
+async def _as_async_iter(items):
+    for item in items:
+        yield item
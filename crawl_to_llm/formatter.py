@@ -5,15 +5,19 @@ This module uses a strategy pattern for different formatters.
 import os
 import json
 import yaml
+import shutil
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
 
 from .data_models import Page
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C emitter when PyYAML was built with it; same output, many times faster
+YamlDumper = getattr(yaml, "CDumper", yaml.Dumper)
+
 class BaseFormatter(ABC):
     """Abstract base class for all formatters."""
 
@@ -30,62 +34,267 @@ class BaseFormatter(ABC):
         """Extracts the domain name from a URL for file naming."""
         return urlparse(url).netloc.replace("www.", "")
 
+    def open_stream(self, metadata: Dict[str, Any], page_count: Optional[int] = None) -> "PageWriter":
+        """
+        Returns an incremental writer: add() pages as they become ready, then close().
+
+        The default writer buffers the pages and calls write() on close;
+        formatters that can serialize page by page override this.
+
+        Args:
+            metadata: Run metadata. When page_count is None, its "page_count"
+                is set to the number of pages added once the writer closes.
+            page_count: Number of pages, if known up front.
+        """
+        return PageWriter(self, metadata, page_count)
+
+
+class PageWriter:
+    """Incremental output for one run. Usable as a context manager."""
+
+    def __init__(self, formatter: BaseFormatter, metadata: Dict[str, Any], page_count: Optional[int] = None):
+        self.formatter = formatter
+        self.metadata = metadata
+        self.page_count = page_count
+        self.count = 0
+        self._pages: List[Page] = []
+
+    def add(self, page: Page):
+        self.count += 1
+        self._pages.append(page)
+
+    def close(self):
+        self._finalize_metadata()
+        self.formatter.write(self._pages, self.metadata)
+        self._pages = []
+
+    def abort(self):
+        """Drops whatever was written so far."""
+        self._pages = []
+
+    def _finalize_metadata(self):
+        if self.page_count is None:
+            self.metadata["page_count"] = self.count
+
+    def __enter__(self) -> "PageWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class _OutputFile:
+    """
+    An output file whose header depends on the final page count.
+
+    With the header known up front the body goes straight to `path`;
+    otherwise it is spooled to `path.part` and copied in after the header.
+    """
+
+    def __init__(self, path: str, header: Optional[str] = None):
+        self.path = path
+        self.spooled = header is None
+        self.body = open(path + ".part" if self.spooled else path, "w", encoding="utf-8")
+        if header is not None:
+            self.body.write(header)
+
+    def finish(self, header: str, footer: str = ""):
+        if not self.spooled:
+            self.body.write(footer)
+            self.body.close()
+            return
+        self.body.close()
+        # Binary copy: reading the spool back in text mode would rewrite \r and \r\n inside page content
+        with open(self.path, "wb") as out, open(self.path + ".part", "rb") as part:
+            out.write(header.encode("utf-8"))
+            shutil.copyfileobj(part, out)
+            out.write(footer.encode("utf-8"))
+        os.remove(self.path + ".part")
+
+    def discard(self):
+        self.body.close()
+        os.remove(self.body.name)
+
 class TextFormatter(BaseFormatter):
     """Formats output into llms.txt and llms-full.txt."""
 
     def write(self, pages: List[Page], metadata: Dict[str, Any]):
-        base_url = metadata.get("base_url", "")
-        domain = self._get_domain(base_url)
-        
-        # --- llms.txt (Descriptions) ---
-        llms_path = os.path.join(self.output_dir, f"{domain}-llms.txt")
-        with open(llms_path, "w", encoding="utf-8") as f:
-            f.write(f"# {metadata.get('site_name', domain)}\n\n")
-            f.write(f"> Generated from {len(pages)} pages.\n\n")
+        with self.open_stream(metadata, page_count=len(pages)) as writer:
             for page in pages:
-                f.write(f"- [{page.title}]({page.url}): {page.description or 'No description generated.'}\n")
-        logger.info(f"Successfully wrote llms.txt to {llms_path}")
+                writer.add(page)
+
+    def open_stream(self, metadata: Dict[str, Any], page_count: Optional[int] = None) -> "TextPageWriter":
+        return TextPageWriter(self, metadata, page_count)
+
+
+class TextPageWriter(PageWriter):
+    """Writes llms.txt and llms-full.txt together, one page at a time."""
+
+    def __init__(self, formatter: BaseFormatter, metadata: Dict[str, Any], page_count: Optional[int] = None):
+        super().__init__(formatter, metadata, page_count)
+        self.base_url = metadata.get("base_url", "")
+        domain = formatter._get_domain(self.base_url)
+        self.site_name = metadata.get('site_name', domain)
+        known = page_count is not None
+        self._llms = _OutputFile(os.path.join(formatter.output_dir, f"{domain}-llms.txt"),
+                                 self._llms_header(page_count) if known else None)
+        self._full = _OutputFile(os.path.join(formatter.output_dir, f"{domain}-llms-full.txt"),
+                                 self._full_header(page_count) if known else None)
 
+    def _llms_header(self, n: int) -> str:
+        return f"# {self.site_name}\n\n> Generated from {n} pages.\n\n"
+
+    def _full_header(self, n: int) -> str:
+        return f"# Full Content for {self.base_url}\n# Total pages: {n}\n\n"
+
+    def add(self, page: Page):
+        self.count += 1
+        # --- llms.txt (Descriptions) ---
+        self._llms.body.write(f"- [{page.title}]({page.url}): {page.description or 'No description generated.'}\n")
         # --- llms-full.txt (Full Content) ---
-        full_path = os.path.join(self.output_dir, f"{domain}-llms-full.txt")
-        with open(full_path, "w", encoding="utf-8") as f:
-            f.write(f"# Full Content for {base_url}\n")
-            f.write(f"# Total pages: {len(pages)}\n\n")
-            for i, page in enumerate(pages, 1):
-                f.write(f"---\n## Page {i}: {page.title}\n**URL:** {page.url}\n\n")
-                f.write(page.content)
-                f.write("\n\n")
-        logger.info(f"Successfully wrote llms-full.txt to {full_path}")
+        self._full.body.write(f"---\n## Page {self.count}: {page.title}\n**URL:** {page.url}\n\n")
+        self._full.body.write(page.read_content())
+        self._full.body.write("\n\n")
+
+    def close(self):
+        self._finalize_metadata()
+        self._llms.finish(self._llms_header(self.count))
+        logger.info(f"Successfully wrote llms.txt to {self._llms.path}")
+        self._full.finish(self._full_header(self.count))
+        logger.info(f"Successfully wrote llms-full.txt to {self._full.path}")
+
+    def abort(self):
+        self._llms.discard()
+        self._full.discard()
 
 
 class JsonFormatter(BaseFormatter):
     """Formats output into a JSON file."""
 
     def write(self, pages: List[Page], metadata: Dict[str, Any]):
-        domain = self._get_domain(metadata.get("base_url", ""))
-        filepath = os.path.join(self.output_dir, f"{domain}.json")
-        
-        output_data = {
-            "metadata": metadata,
-            "pages": [page.model_dump() for page in pages]
-        }
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=2)
-        logger.info(f"Successfully wrote JSON output to {filepath}")
+        with self.open_stream(metadata, page_count=len(pages)) as writer:
+            for page in pages:
+                writer.add(page)
+
+    def open_stream(self, metadata: Dict[str, Any], page_count: Optional[int] = None) -> "JsonPageWriter":
+        return JsonPageWriter(self, metadata, page_count)
+
+
+class JsonPageWriter(PageWriter):
+    """
+    Serializes one page at a time into the same document json.dump(indent=2)
+    would produce for {"metadata": ..., "pages": [...]}.
+    """
+
+    def __init__(self, formatter: BaseFormatter, metadata: Dict[str, Any], page_count: Optional[int] = None):
+        super().__init__(formatter, metadata, page_count)
+        domain = formatter._get_domain(metadata.get("base_url", ""))
+        self._out = _OutputFile(os.path.join(formatter.output_dir, f"{domain}.json"),
+                                self._header() if page_count is not None else None)
+
+    def _header(self) -> str:
+        metadata = json.dumps(self.metadata, indent=2).replace("\n", "\n  ")
+        return f'{{\n  "metadata": {metadata},\n  "pages": ['
+
+    def add(self, page: Page):
+        # json.dumps escapes newlines inside strings, so re-indenting by line is safe
+        item = json.dumps(page.model_dump(), indent=2).replace("\n", "\n    ")
+        self._out.body.write(("," if self.count else "") + "\n    " + item)
+        self.count += 1
+
+    def close(self):
+        self._finalize_metadata()
+        self._out.finish(self._header(), "\n  ]\n}" if self.count else "]\n}")
+        logger.info(f"Successfully wrote JSON output to {self._out.path}")
+
+    def abort(self):
+        self._out.discard()
 
 class YamlFormatter(BaseFormatter):
     """Formats output into a YAML file."""
 
     def write(self, pages: List[Page], metadata: Dict[str, Any]):
-        domain = self._get_domain(metadata.get("base_url", ""))
-        filepath = os.path.join(self.output_dir, f"{domain}.yaml")
-
-        output_data = {
-            "metadata": metadata,
-            "pages": [page.model_dump() for page in pages]
-        }
-        
-        with open(filepath, "w", encoding="utf-8") as f:
-            yaml.dump(output_data, f, default_flow_style=False, sort_keys=False)
-        logger.info(f"Successfully wrote YAML output to {filepath}")
+        with self.open_stream(metadata, page_count=len(pages)) as writer:
+            for page in pages:
+                writer.add(page)
+
+    def open_stream(self, metadata: Dict[str, Any], page_count: Optional[int] = None) -> "YamlPageWriter":
+        return YamlPageWriter(self, metadata, page_count)
+
+
+class YamlPageWriter(PageWriter):
+    """
+    Emits one page at a time as an item of the top-level `pages` sequence;
+    the result equals yaml.dump of the whole {"metadata", "pages"} document.
+    """
+
+    def __init__(self, formatter: BaseFormatter, metadata: Dict[str, Any], page_count: Optional[int] = None):
+        super().__init__(formatter, metadata, page_count)
+        domain = formatter._get_domain(metadata.get("base_url", ""))
+        self._out = _OutputFile(os.path.join(formatter.output_dir, f"{domain}.yaml"),
+                                self._header() if page_count is not None else None)
+
+    def _header(self) -> str:
+        return self._dump({"metadata": self.metadata})
+
+    @staticmethod
+    def _dump(data) -> str:
+        return yaml.dump(data, Dumper=YamlDumper, default_flow_style=False, sort_keys=False)
+
+    def add(self, page: Page):
+        if self.count == 0:
+            self._out.body.write("pages:\n")
+        # Block sequences under a mapping key are not indented, so each item is a self-contained dump
+        self._out.body.write(self._dump([page.model_dump()]))
+        self.count += 1
+
+    def close(self):
+        self._finalize_metadata()
+        self._out.finish(self._header(), "" if self.count else "pages: []\n")
+        logger.info(f"Successfully wrote YAML output to {self._out.path}")
+
+    def abort(self):
+        self._out.discard()
+
+
+class JsonlFormatter(BaseFormatter):
+    """
+    Formats output into JSON Lines: a {"metadata": ...} line, then one compact page object per line.
+    """
+
+    def write(self, pages: List[Page], metadata: Dict[str, Any]):
+        with self.open_stream(metadata, page_count=len(pages)) as writer:
+            for page in pages:
+                writer.add(page)
+
+    def open_stream(self, metadata: Dict[str, Any], page_count: Optional[int] = None) -> "JsonlPageWriter":
+        return JsonlPageWriter(self, metadata, page_count)
+
+
+class JsonlPageWriter(PageWriter):
+    """Writes each page as one JSON line as soon as it is added."""
+
+    def __init__(self, formatter: BaseFormatter, metadata: Dict[str, Any], page_count: Optional[int] = None):
+        super().__init__(formatter, metadata, page_count)
+        domain = formatter._get_domain(metadata.get("base_url", ""))
+        self._out = _OutputFile(os.path.join(formatter.output_dir, f"{domain}.jsonl"),
+                                self._header() if page_count is not None else None)
+
+    def _header(self) -> str:
+        return json.dumps({"metadata": self.metadata}, ensure_ascii=False) + "\n"
+
+    def add(self, page: Page):
+        self._out.body.write(page.model_dump_json())
+        self._out.body.write("\n")
+        self.count += 1
+
+    def close(self):
+        self._finalize_metadata()
+        self._out.finish(self._header())
+        logger.info(f"Successfully wrote JSONL output to {self._out.path}")
+
+    def abort(self):
+        self._out.discard()
@@ -2,12 +2,21 @@
 The main orchestrator class that ties everything together.
 This is the primary public-facing class for the library.
 """
+import os
 import time
+import asyncio
 import logging
+from typing import Iterable, Optional
 
+from checkpoint import CheckpointJournal
+
+from .boilerplate import BoilerplateFilter
+from .browser_pool import BrowserPool
 from .crawler import WebCrawler
-from .enhancer import AIEnhancer
-from .formatter import TextFormatter, JsonFormatter, YamlFormatter, BaseFormatter
+from .data_models import BatchResult, Page, SiteResult
+from .enhancer import AIEnhancer, NO_DESCRIPTION, FAILED_DESCRIPTION, estimate_cost, new_usage
+from .formatter import TextFormatter, JsonFormatter, YamlFormatter, JsonlFormatter, BaseFormatter
+from .page_store import PageStore
 
 # Basic logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,58 +25,357 @@ logger = logging.getLogger(__name__)
 class LLMSGenerator:
     """
     Orchestrates the process of crawling, enhancing, and formatting website content.
+
+    All runs of one generator share its crawler's browser pool; pass
+    `browser_pool` to share browsers between generators as well. Use it as
+    an async context manager (or call close()) to shut the browsers down.
+
+    Args:
+        browser_pool: Browser pool shared by all runs (its size caps concurrent crawls).
+        enhancer: AIEnhancer shared by all runs (its limiter caps LLM concurrency and tokens per minute).
+        output_dir: Directory the formatters write to.
+        connections_per_crawl: Pages each crawl fetches concurrently; see WebCrawler.
+        strip_boilerplate: Remove blocks repeated across a site's pages (navigation, footers,
+            banners) before enhancing and formatting; see BoilerplateFilter. Repeated blocks are
+            learned from the first pages of each crawl, after which pages stream through.
+        refresh_after_days: Regenerate cached AI descriptions older than this many days
+            (ignored when `enhancer` is given; configure its cache instead).
     """
-    def __init__(self):
-        self.crawler = WebCrawler()
-        self.enhancer = AIEnhancer()
+    def __init__(self, browser_pool: Optional[BrowserPool] = None, enhancer: Optional[AIEnhancer] = None,
+                 output_dir: str = "output", connections_per_crawl: Optional[int] = None,
+                 strip_boilerplate: bool = True, refresh_after_days: Optional[float] = None):
+        self.crawler = WebCrawler(pool=browser_pool, connections_per_crawl=connections_per_crawl)
+        self.enhancer = enhancer or AIEnhancer(refresh_after_days=refresh_after_days)
+        self.output_dir = output_dir
+        self.strip_boilerplate = strip_boilerplate
         self.formatters = {
-            "text": TextFormatter(),
-            "json": JsonFormatter(),
-            "yaml": YamlFormatter(),
+            "text": TextFormatter(output_dir),
+            "json": JsonFormatter(output_dir),
+            "yaml": YamlFormatter(output_dir),
+            "jsonl": JsonlFormatter(output_dir),
         }
 
+    async def __aenter__(self) -> "LLMSGenerator":
+        await self.crawler.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """Closes the browsers owned by this generator's crawler."""
+        await self.crawler.close()
+
     async def run(
         self,
         url: str,
         strategy: str = "systematic",
         output_format: str = "text",
-        max_pages: int = 50
-    ):
+        max_pages: int = 50,
+        incremental: bool = False,
+        llm_workers: Optional[int] = None,
+        resume: bool = False
+    ) -> SiteResult:
         """
         Executes the full pipeline: crawl, enhance, and write output.
 
+        The stages run concurrently: pages stream out of the crawler into the
+        enhancer through a bounded queue, and each enhanced page goes
+        straight to the formatter's incremental writer. Wall time approaches
+        the slower of crawling and enhancing rather than their sum, and
+        memory stays flat as the site grows: page content lives in an
+        on-disk PageStore, not in the Page objects in flight.
+
+        Progress is checkpointed next to the output: a journal of crawled
+        pages and generated descriptions, plus the page store holding their
+        content. With resume=True a run that died picks up from there;
+        journaled pages are not processed again and described pages cost no
+        LLM call. crawl4ai's link frontier is internal to it, so the crawl
+        itself restarts and skips the URLs it already delivered. The
+        checkpoint is deleted when the run completes.
+
         Args:
             url: The base URL of the website to process.
-            strategy: The crawl strategy to use ('systematic', 'comprehensive', 'sitemap').
-            output_format: The desired output format ('text', 'json', 'yaml').
+            strategy: The crawl strategy to use ('systematic', 'comprehensive', 'sitemap',
+                'sitemap-incremental').
+            output_format: The desired output format ('text', 'json', 'yaml', 'jsonl').
             max_pages: The maximum number of pages to process.
+            incremental: Report how many pages changed since the last run. Unchanged pages reuse their
+                description from the enhancer's DescriptionCache either way; a cache miss counts as a change.
+            llm_workers: Cap on this run's concurrent LLM calls (default: the enhancer limiter's max).
+            resume: Continue from the checkpoint of an interrupted run of the same URL and strategy.
+
+        Returns:
+            A SiteResult with page counts, LLM usage and timing.
         """
         start_time = time.time()
         logger.info(f"Starting generation for {url}...")
 
-        # 1. Crawl the website
-        pages = await self.crawler.crawl(url, strategy, max_pages)
-        if not pages:
-            logger.warning("No pages were found during the crawl. Exiting.")
-            return
-
-        # 2. Enhance pages with AI descriptions (OpenAI only)
-        enhanced_pages = await self.enhancer.enhance_pages(pages)
-
-        # 3. Format and write the output
         formatter = self.formatters.get(output_format)
         if not formatter:
             logger.error(f"Unknown output format '{output_format}'. Defaulting to 'text'.")
             formatter = self.formatters["text"]
-        
+
+        changed = 0
+        usage = new_usage()
+        llm_before = self.enhancer.client.stats()
+
+        # 1. Crawl the website (streaming); wait for the first page before creating any output.
+        # Page content is spilled to the checkpoint's page store and read back by each stage on demand.
+        checkpoint = os.path.join(formatter.output_dir, f"{formatter._get_domain(url)}.checkpoint")
+        journal, page_store, resumed = self._open_checkpoint(checkpoint, url, strategy, resume)
+        described = {page.url for page in resumed if page.description}
+        crawled = self.crawler.crawl_stream(url, strategy, max_pages, page_store)
+
+        async def pages_in_order():
+            # Checkpointed pages first, then whatever the crawl adds to them
+            seen = {page.url for page in resumed}
+            for page in resumed[:max_pages]:
+                yield page
+            count = min(len(resumed), max_pages)
+            async for page in crawled:
+                if count >= max_pages:
+                    break
+                if page.url in seen:
+                    continue
+                seen.add(page.url)
+                page_store.flush()
+                journal.append("crawled", url=page.url, title=page.title, word_count=page.word_count,
+                               metadata=page.metadata, offset=page.content_ref.offset,
+                               length=page.content_ref.length)
+                count += 1
+                yield page
+
+        pages = pages_in_order()
+        try:
+            first = await pages.__anext__()
+        except StopAsyncIteration:
+            await crawled.aclose()
+            self._close_checkpoint(journal, page_store, completed=True)
+            logger.warning("No pages were found during the crawl. Exiting.")
+            return SiteResult(url=url, status="empty", seconds=round(time.time() - start_time, 2))
+        except BaseException:
+            await pages.aclose()
+            await crawled.aclose()
+            self._close_checkpoint(journal, page_store, completed=False)
+            raise
+
+        # Boilerplate is stripped before the content is hashed, described or written
+        boilerplate = BoilerplateFilter(page_store) if self.strip_boilerplate else None
+
+        async def pages_to_enhance():
+            nonlocal changed
+            site_pages = _prepend(first, pages)
+            if boilerplate is not None:
+                site_pages = boilerplate.filter_stream(site_pages)
+            async for page in site_pages:
+                # Look the page up here rather than in the enhancer's feeder, so cache misses are counted
+                if incremental and page.description is None and not self.enhancer.from_cache(page):
+                    changed += 1
+                yield page
+
+        # 2. Enhance pages with AI descriptions (OpenAI only) and 3. write each one as it is ready
         metadata = {
             "base_url": url,
             "crawl_strategy": strategy,
             "ai_provider": "openai",
-            "page_count": len(enhanced_pages),
+            "page_count": 0,    # filled in by the writer
             "site_name": formatter._get_domain(url)
         }
-        formatter.write(enhanced_pages, metadata)
-        
+        enhanced = self.enhancer.enhance_stream(pages_to_enhance(), workers=llm_workers, usage=usage,
+                                                cache_lookup=not incremental)
+        completed = False
+        try:
+            with formatter.open_stream(metadata) as writer:
+                async for page in enhanced:
+                    writer.add(page)
+                    if page.description not in (None, NO_DESCRIPTION, FAILED_DESCRIPTION) and page.url not in described:
+                        journal.append("enhanced", url=page.url, description=page.description)
+            completed = True
+        finally:
+            # Stop the enhancer workers, then release the leased browser, even if a stage failed
+            await enhanced.aclose()
+            await pages.aclose()
+            await crawled.aclose()
+            self._close_checkpoint(journal, page_store, completed)
+        if incremental:
+            logger.info(f"Incremental run: {changed}/{writer.count} pages changed since the last run.")
+        if boilerplate is not None:
+            logger.info(f"{url}: {boilerplate.summary()}")
+
+        logger.info(f"LLM call metrics: {self.enhancer.metrics()}")
+        logger.info(f"LLM calls for {url}:\n{self.enhancer.client.report(since=llm_before)}")
         duration = time.time() - start_time
         logger.info(f"🎉 Generation complete for {url} in {duration:.2f} seconds.")
+        return SiteResult(
+            url=url,
+            pages=writer.count,
+            changed=changed if incremental else None,
+            llm_calls=usage["calls"],
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"],
+            cost_usd=round(estimate_cost(usage), 6),
+            seconds=round(duration, 2),
+            boilerplate_bytes_saved=boilerplate.bytes_saved if boilerplate else 0,
+            boilerplate_tokens_saved=boilerplate.tokens_saved if boilerplate else 0,
+        )
+
+    async def run_batch(
+        self,
+        urls: Iterable[str],
+        strategy: str = "systematic",
+        output_format: str = "text",
+        max_pages: int = 50,
+        incremental: bool = False,
+        site_concurrency: Optional[int] = None,
+        site_timeout: Optional[float] = None,
+        resume: bool = False
+    ) -> BatchResult:
+        """
+        Runs many sites concurrently under this generator's shared budgets.
+
+        Browsers (pool size), LLM concurrency and tokens per minute (the
+        enhancer's limiter) are global across the batch. Sites start in input
+        order, and each site that is enhancing may use at most its fair share
+        of the LLM concurrency, recomputed by the limiter on every call, so one
+        large site cannot starve the others and the last sites get the whole
+        limit. A site
+        that fails or times out is recorded as an error; the rest carry on.
+        Each site writes its own output files, as run() does.
+
+        Finished sites are journaled in the output directory. With
+        resume=True, sites finished by an interrupted batch are skipped and
+        unfinished ones resume from their own checkpoints.
+
+        Args:
+            urls: Base URLs of the sites. Output files are named by domain, so only the first URL
+                of each domain is kept.
+            strategy: The crawl strategy to use for every site.
+            output_format: The output format for every site.
+            max_pages: The maximum number of pages per site.
+            incremental: Report each site's pages changed since its last run; see run().
+            site_concurrency: Sites processed at once (default: the browser pool size).
+            site_timeout: Seconds after which a site is abandoned.
+            resume: Continue an interrupted batch.
+
+        Returns:
+            A BatchResult with per-site results, throughput and cost totals.
+        """
+        by_domain = {}
+        for url in urls:
+            domain = self.formatters["text"]._get_domain(url)
+            if domain not in by_domain:
+                by_domain[domain] = url
+            elif by_domain[domain] != url:
+                logger.warning(f"Skipping {url}: {by_domain[domain]} already covers {domain}")
+        urls = list(by_domain.values())
+        site_concurrency = max(1, min(site_concurrency or self.crawler.pool.size, len(urls) or 1))
+        journal = CheckpointJournal(os.path.join(self.output_dir, "batch.checkpoint.jsonl"), resume=resume)
+        finished = {r["result"]["url"]: SiteResult(**r["result"]) for r in journal.of("site")}
+        results = [finished.get(url) for url in urls]
+        pending = iter([(i, url) for i, url in enumerate(urls) if url not in finished])
+        done = len(urls) - sum(1 for r in results if r is None)
+        start_time = time.time()
+        logger.info(f"Starting batch of {len(urls)} sites, {site_concurrency} at a time"
+                    + (f" ({done} already finished)" if done else ""))
+
+        async def run_site(url: str) -> SiteResult:
+            site_start = time.time()
+            try:
+                return await asyncio.wait_for(
+                    self.run(url, strategy, output_format, max_pages, incremental, resume=resume),
+                    site_timeout)
+            except asyncio.TimeoutError:
+                error = f"timed out after {site_timeout}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            logger.error(f"Site {url} failed: {error}")
+            return SiteResult(url=url, status="error", error=error, seconds=round(time.time() - site_start, 2))
+
+        async def worker():
+            nonlocal done
+            for index, url in pending:
+                results[index] = result = await run_site(url)
+                done += 1
+                if result.status != "error":
+                    journal.append("site", result=result.model_dump())
+                logger.info(f"[{done}/{len(urls)}] {url}: {result.status}, {result.pages} pages in {result.seconds:.1f}s")
+
+        with journal:
+            await asyncio.gather(*(worker() for _ in range(site_concurrency)))
+        journal.complete()
+        return self._summarize(results, time.time() - start_time)
+
+    def _summarize(self, results, seconds: float) -> BatchResult:
+        usage = new_usage()
+        for result in results:
+            usage["calls"] += result.llm_calls
+            usage["prompt_tokens"] += result.prompt_tokens
+            usage["completion_tokens"] += result.completion_tokens
+        pages = sum(r.pages for r in results)
+        summary = BatchResult(
+            sites=results,
+            sites_ok=sum(1 for r in results if r.status != "error"),
+            sites_failed=sum(1 for r in results if r.status == "error"),
+            pages=pages,
+            seconds=round(seconds, 2),
+            pages_per_second=round(pages / seconds, 2) if seconds else 0.0,
+            sites_per_minute=round(len(results) * 60 / seconds, 2) if seconds else 0.0,
+            llm_calls=usage["calls"],
+            prompt_tokens=usage["prompt_tokens"],
+            completion_tokens=usage["completion_tokens"],
+            cost_usd=round(estimate_cost(usage), 6),
+            metrics={**self.enhancer.metrics(), "browsers": self.crawler.pool.stats(),
+                     "llm": self.enhancer.client.stats()},
+        )
+        logger.info(f"Batch complete: {summary.sites_ok}/{len(results)} sites ok, {pages} pages in {seconds:.1f}s "
+                    f"({summary.pages_per_second} pages/s), {summary.llm_calls} LLM calls, ${summary.cost_usd:.4f}")
+        return summary
+
+    @staticmethod
+    def _open_checkpoint(path: str, url: str, strategy: str, resume: bool):
+        """Opens the run's journal and page store; on resume, also returns the journaled pages."""
+        journal = CheckpointJournal(path + ".jsonl", resume=resume)
+        runs = journal.of("run")
+        if runs and (runs[0]["url"], runs[0]["strategy"]) != (url, strategy):
+            logger.warning(f"Checkpoint {journal.path} belongs to another run; starting over.")
+            journal.close()
+            journal, resume = CheckpointJournal(path + ".jsonl"), False
+        if not journal.records:
+            journal.append("run", url=url, strategy=strategy)
+        page_store = PageStore(path + ".pages", resume=resume)
+
+        pages = {}
+        for record in journal.of("crawled"):
+            ref = page_store.ref(record["offset"], record["length"])
+            if ref is None:
+                continue    # its content never reached the disk; the crawl will deliver it again
+            pages[record["url"]] = Page(url=record["url"], title=record["title"], content="", content_ref=ref,
+                                        word_count=record["word_count"], metadata=record["metadata"])
+        for record in journal.of("enhanced"):
+            if record["url"] in pages:
+                pages[record["url"]].description = record["description"]
+        if pages:
+            described = sum(1 for page in pages.values() if page.description)
+            logger.info(f"Resuming {url}: {len(pages)} pages from the checkpoint, {described} already described.")
+        return journal, page_store, list(pages.values())
+
+    @staticmethod
+    def _close_checkpoint(journal: CheckpointJournal, page_store: PageStore, completed: bool):
+        """Closes the checkpoint; a completed run deletes it, an interrupted one keeps it for resume."""
+        page_store.close()
+        if completed:
+            journal.complete()
+            try:
+                os.remove(page_store.path)
+            except OSError:
+                pass
+        else:
+            journal.close()
+            logger.info(f"Checkpoint kept at {journal.path}; run again with resume=True to continue.")
+
+
+async def _prepend(first, rest):
+    yield first
+    async for item in rest:
+        yield item
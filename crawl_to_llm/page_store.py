@@ -0,0 +1,116 @@
+"""
+Out-of-core storage for crawled page content.
+
+Large crawls keep every page's markdown alive until it is written out. A
+PageStore appends content to a single blob file instead; pages carry a
+small ContentRef (offset/length into the file) and read their content back
+only when a stage actually needs it.
+"""
+import os
+import re
+import tempfile
+import threading
+from typing import Optional
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def count_words(text: str) -> int:
+    """Same result as len(text.split()) without building a list of every word."""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
+class ContentRef:
+    """Handle to one page's content inside a PageStore (UTF-8 byte offset and length)."""
+
+    __slots__ = ("store", "offset", "length")
+
+    def __init__(self, store: "PageStore", offset: int, length: int):
+        self.store = store
+        self.offset = offset
+        self.length = length
+
+    def read(self, max_chars: Optional[int] = None) -> str:
+        return self.store.read(self, max_chars)
+
+    def __repr__(self) -> str:
+        return f"ContentRef(offset={self.offset}, length={self.length})"
+
+
+class PageStore:
+    """
+    Append-only blob file of page contents.
+
+    Args:
+        path: Blob file location; by default a temporary file that is
+            deleted when the store closes.
+        resume: Keep the existing file's content, so refs recorded earlier
+            (see ref()) stay readable, instead of truncating it.
+
+    Refs are only valid while the store is open. Usable as a context manager.
+    """
+
+    def __init__(self, path: Optional[str] = None, resume: bool = False):
+        self.temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="crawl_to_llm-", suffix=".pages")
+            os.close(fd)
+        self.path = path
+        self._file = open(path, "a+b" if resume else "w+b")
+        self._size = self._flushed = os.path.getsize(path)
+        self._lock = threading.Lock()
+
+    def put(self, text: str) -> ContentRef:
+        data = text.encode("utf-8")
+        with self._lock:
+            ref = ContentRef(self, self._size, len(data))
+            self._file.write(data)
+            self._size += len(data)
+        return ref
+
+    def ref(self, offset: int, length: int) -> Optional[ContentRef]:
+        """Re-creates a ref from a recorded offset and length; None if the file does not hold it."""
+        if offset < 0 or length < 0 or offset + length > self._size:
+            return None
+        return ContentRef(self, offset, length)
+
+    def read(self, ref: ContentRef, max_chars: Optional[int] = None) -> str:
+        """Content for ref; with max_chars, only enough bytes for that many characters are read."""
+        length = ref.length if max_chars is None else min(ref.length, max_chars * 4)
+        with self._lock:
+            if ref.offset + length > self._flushed:
+                self._file.flush()
+                self._flushed = self._size
+            data = os.pread(self._file.fileno(), length, ref.offset)
+        if length < ref.length:
+            # Cut mid-file: the last character may be split across the boundary
+            return data.decode("utf-8", errors="ignore")[:max_chars]
+        text = data.decode("utf-8")
+        return text if max_chars is None else text[:max_chars]
+
+    @property
+    def size(self) -> int:
+        """Bytes of content stored so far."""
+        return self._size
+
+    def flush(self):
+        """Hands buffered content to the OS, so it survives a crash of this process."""
+        with self._lock:
+            self._file.flush()
+            self._flushed = self._size
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.temporary:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "PageStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,175 @@
+"""
+Adaptive concurrency and rate-limit handling for LLM calls.
+
+AdaptiveLimiter is an AIMD controller: the concurrency limit grows by one
+for every `limit` successful calls and is halved on a 429 or when latency
+exceeds the target. A Retry-After pauses every caller, and an optional
+tokens-per-minute budget holds calls back before the provider rejects them.
+Callers that join() as a stream share the limit fairly: each may have at
+most ceil(limit / streams) calls in flight, recomputed on every acquire, so
+shares grow as other streams leave.
+Classifying failures (is_retryable, retry_after, backoff_delay) is
+llm_client's job.
+"""
+import asyncio
+import collections
+import math
+import time
+from typing import Any, Dict, Optional
+
+INITIAL_CONCURRENCY = 5
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 20
+TARGET_LATENCY = 10.0       # seconds; slower successful calls count as congestion
+DECREASE_COOLDOWN = 1.0     # one multiplicative cut per this many seconds
+MAX_RETRIES = 5             # retries per call made by callers of the limiter (AIEnhancer)
+TPM_WINDOW = 60.0
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit with Retry-After pauses and a tokens-per-minute budget.
+
+    Callers bracket each request with acquire() / release(); release()
+    reports how the request went and drives the limit. Pass the key from
+    join() to both to hold a stream to its fair share.
+
+    Args:
+        initial: Starting concurrency limit.
+        min_limit: Lower bound for the limit.
+        max_limit: Upper bound for the limit (size worker pools to this).
+        target_latency: Successful calls slower than this shrink the limit.
+        tpm: Tokens-per-minute budget, or None for no budget.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY, min_limit: int = MIN_CONCURRENCY,
+                 max_limit: int = MAX_CONCURRENCY, target_latency: float = TARGET_LATENCY,
+                 tpm: Optional[int] = None):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.tpm = tpm
+        self.in_flight = 0
+        self._streams: Dict[object, int] = {}     # joined stream -> calls in flight
+        self._cond: Optional[asyncio.Condition] = None
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._tokens = collections.deque()     # (monotonic time, tokens) within the window
+        self._token_sum = 0
+        # metrics
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.throttle_time = 0.0    # seconds callers waited on Retry-After pauses or the token budget
+        self.backoff_time = 0.0     # seconds spent in retry backoff
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _wait_time(self, now: float, tokens: int) -> float:
+        wait = self._paused_until - now
+        while self._tokens and self._tokens[0][0] <= now - TPM_WINDOW:
+            self._token_sum -= self._tokens.popleft()[1]
+        if self.tpm:
+            if self._tokens and self._token_sum + tokens > self.tpm:
+                wait = max(wait, self._tokens[0][0] + TPM_WINDOW - now)
+        return wait
+
+    def join(self) -> object:
+        """Registers a stream of calls that gets a fair share of the limit; returns its key."""
+        stream = object()
+        self._streams[stream] = 0
+        return stream
+
+    async def leave(self, stream: object):
+        """Unregisters a stream; the others' shares grow accordingly."""
+        cond = self._condition()
+        async with cond:
+            self._streams.pop(stream, None)
+            cond.notify_all()
+
+    def share(self) -> int:
+        """Calls each joined stream may have in flight right now."""
+        return max(1, math.ceil(int(self.limit) / max(len(self._streams), 1)))
+
+    async def acquire(self, tokens: int = 0, stream: Optional[object] = None):
+        """Waits for a free slot (within the stream's share), the end of any Retry-After pause and room in the token budget."""
+        cond = self._condition()
+        async with cond:
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(now, tokens)
+                if (wait <= 0 and self.in_flight < int(self.limit)
+                        and (stream not in self._streams or self._streams[stream] < self.share())):
+                    break
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(cond.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    self.throttle_time += time.monotonic() - now
+                else:
+                    await cond.wait()
+            self.in_flight += 1
+            if stream in self._streams:
+                self._streams[stream] += 1
+            self.requests += 1
+            if tokens:
+                self._tokens.append((time.monotonic(), tokens))
+                self._token_sum += tokens
+
+    async def release(self, latency: Optional[float] = None, throttled: bool = False,
+                      retry_after: Optional[float] = None, stream: Optional[object] = None):
+        """
+        Returns a slot and adjusts the limit.
+
+        Args:
+            latency: Duration of a successful call (None for failures).
+            throttled: The call was rejected with 429.
+            retry_after: Seconds the provider asked every caller to wait.
+            stream: The key passed to acquire().
+        """
+        cond = self._condition()
+        async with cond:
+            self.in_flight -= 1
+            if stream in self._streams:
+                self._streams[stream] -= 1
+            now = time.monotonic()
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if throttled:
+                self.throttled += 1
+                self._decrease(now)
+            elif latency is not None:
+                if latency > self.target_latency:
+                    self._decrease(now)
+                else:
+                    self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            cond.notify_all()
+
+    def _decrease(self, now: float):
+        # Calls already in flight see the same overload; cut once per cooldown, not once each
+        if now - self._last_decrease >= DECREASE_COOLDOWN:
+            self.limit = max(float(self.min_limit), self.limit / 2)
+            self._last_decrease = now
+
+    def record_retry(self, delay: float = 0.0):
+        self.retries += 1
+        self.backoff_time += delay
+
+    def metrics(self) -> Dict[str, Any]:
+        self._wait_time(time.monotonic(), 0)    # drops token entries that left the window
+        return {
+            "concurrency": int(self.limit),
+            "in_flight": self.in_flight,
+            "streams": len(self._streams),
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "throttle_time": round(self.throttle_time, 2),
+            "backoff_time": round(self.backoff_time, 2),
+            "tokens_last_minute": self._token_sum,
+        }
@@ -0,0 +1,142 @@
+"""
+Sitemap discovery and parsing for the incremental sitemap strategy.
+
+Sitemaps are located through robots.txt "Sitemap:" lines, falling back to
+/sitemap.xml. Sitemap indexes are followed (bounded depth) and gzipped
+sitemaps are decompressed. Each URL comes with its <lastmod>, normalized
+to UTC so that values can be compared across runs.
+"""
+import gzip
+import io
+import logging
+import urllib.parse
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+FETCH_TIMEOUT = 15.0
+MAX_INDEX_DEPTH = 3     # sitemap index -> sitemap index -> ... -> urlset
+USER_AGENT = "Mozilla/5.0 (compatible; crawl_to_llm)"
+
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: Optional[str]      # ISO 8601 in UTC, or the raw value if it could not be parsed
+
+
+def normalize_lastmod(value: Optional[str]) -> Optional[str]:
+    """W3C datetime (2024, 2024-05-01, 2024-05-01T10:00:00+02:00, ...) as an ISO UTC timestamp."""
+    if not value:
+        return None
+    value = value.strip()
+    for fmt in ("%Y", "%Y-%m"):
+        try:
+            return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).isoformat()
+        except ValueError:
+            pass
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.astimezone(timezone.utc).isoformat()
+
+
+def lastmod_advanced(new: Optional[str], old: Optional[str]) -> bool:
+    """True if the sitemap reports a change since old. Unknown on either side counts as changed."""
+    if new is None or old is None:
+        return True
+    return new > old if new[:4].isdigit() and old[:4].isdigit() else new != old
+
+
+def parse_sitemap(data: bytes):
+    """
+    Parses one sitemap document.
+
+    Returns:
+        (entries, child_sitemaps): URL entries of a <urlset> and the sitemap
+        locations listed by a <sitemapindex>.
+    """
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    entries, children = [], []
+    loc = lastmod = None
+    for _, elem in ET.iterparse(io.BytesIO(data), events=("end",)):
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if tag == "loc":
+            loc = (elem.text or "").strip()
+        elif tag == "lastmod":
+            lastmod = elem.text
+        elif tag in ("url", "sitemap"):
+            if loc:
+                if tag == "url":
+                    entries.append(SitemapEntry(loc, normalize_lastmod(lastmod)))
+                else:
+                    children.append(loc)
+            loc = lastmod = None
+            elem.clear()
+    return entries, children
+
+
+async def fetch_sitemap(session, base_url: str, max_urls: Optional[int] = None) -> List[SitemapEntry]:
+    """
+    All URL entries of a site's sitemaps, in document order, without duplicates.
+
+    Args:
+        session: An aiohttp.ClientSession.
+        base_url: Any URL of the site.
+        max_urls: Stop after this many entries.
+    """
+    parts = urllib.parse.urlsplit(base_url)
+    root = f"{parts.scheme or 'https'}://{parts.netloc}"
+    queue = [(url, 0) for url in await _robots_sitemaps(session, root)] or [(f"{root}/sitemap.xml", 0)]
+    seen_sitemaps, seen_urls, entries = set(), set(), []
+    while queue and (max_urls is None or len(entries) < max_urls):
+        url, depth = queue.pop(0)
+        if url in seen_sitemaps:
+            continue
+        seen_sitemaps.add(url)
+        data = await _get(session, url)
+        if data is None:
+            continue
+        try:
+            found, children = parse_sitemap(data)
+        except (ET.ParseError, OSError, EOFError) as e:
+            logger.warning(f"Could not parse sitemap {url}: {e}")
+            continue
+        for entry in found:
+            if entry.loc not in seen_urls:
+                seen_urls.add(entry.loc)
+                entries.append(entry)
+        if depth < MAX_INDEX_DEPTH:
+            queue.extend((child, depth + 1) for child in children)
+    logger.info(f"Sitemap for {root}: {len(entries)} URLs from {len(seen_sitemaps)} sitemap files")
+    return entries[:max_urls] if max_urls is not None else entries
+
+
+async def _robots_sitemaps(session, root: str) -> List[str]:
+    data = await _get(session, f"{root}/robots.txt")
+    if not data:
+        return []
+    sitemaps = []
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        key, _, value = line.partition(":")
+        if key.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+async def _get(session, url: str) -> Optional[bytes]:
+    import aiohttp
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT)) as resp:
+            if resp.status != 200:
+                return None
+            return await resp.read()
+    except Exception as e:
+        logger.warning(f"Could not fetch {url}: {e}")
+        return None
+
@@ -0,0 +1,180 @@
+"""
+Digest-SHA256 lines for FLM Forward targets.
+
+Producer side: `compute_digests` streams each target through SHA-256 in
+fixed-size chunks (a 500 MB whitepaper never sits in memory) and runs many
+targets concurrently.
+
+Consumer side: `verify_digests` checks a manifest's `Digest-SHA256:` lines.
+A local cache stores each target's ETag / Last-Modified next to its digest,
+so unchanged targets answer with 304 and are not downloaded again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+from flm_parser import parse_manifest
+
+UA            = "ForwardLinkBot/0.1 (+https://your-project)"
+CHUNK_SIZE    = 64 * 1024
+FETCH_TIMEOUT = 20
+MAX_WORKERS   = 8
+CACHE_PATH    = ".cache_digests.json"
+
+
+@dataclass
+class DigestResult:
+    url: str
+    digest: Optional[str]       # hex SHA-256 of the body, None on error
+    cached: bool = False        # served from the validator cache (304 / not downloaded)
+    size: int = 0               # bytes streamed (0 when cached)
+    elapsed: float = 0.0
+    error: str = ""
+    expected: Optional[str] = None  # set by verify_digests
+
+    @property
+    def ok(self) -> bool:
+        return self.digest is not None and (self.expected is None or self.digest == self.expected)
+
+
+class DigestCache:
+    """
+    JSON cache of url -> {digest, etag, last_modified, checked}.
+
+    Args:
+        path: Cache file location.
+    """
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, url: str) -> Optional[dict]:
+        with self._lock:
+            return self.entries.get(url)
+
+    def put(self, url: str, digest: str, headers):
+        with self._lock:
+            self.entries[url] = {
+                "digest": digest,
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "checked": int(time.time()),
+            }
+
+    def save(self):
+        with self._lock:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+
+
+def _conditional_headers(entry: Optional[dict]) -> dict:
+    headers = {"User-Agent": UA}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def stream_digest(url: str, session: Optional[requests.Session] = None,
+                  cache: Optional[DigestCache] = None, timeout: float = FETCH_TIMEOUT) -> DigestResult:
+    """
+    SHA-256 of a URL's body, streamed in CHUNK_SIZE pieces.
+
+    With a cache, the request carries the stored validators and a 304
+    reuses the cached digest without downloading the body.
+    """
+    start = time.perf_counter()
+    session = session or requests
+    entry = cache.get(url) if cache else None
+    try:
+        with session.get(url, headers=_conditional_headers(entry), timeout=timeout, stream=True) as r:
+            if r.status_code == 304 and entry:
+                return DigestResult(url, entry["digest"], cached=True, elapsed=time.perf_counter() - start)
+            r.raise_for_status()
+            h = hashlib.sha256()
+            size = 0
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                h.update(chunk)
+                size += len(chunk)
+            digest = h.hexdigest()
+            if cache:
+                cache.put(url, digest, r.headers)
+            return DigestResult(url, digest, size=size, elapsed=time.perf_counter() - start)
+    except requests.RequestException as e:
+        return DigestResult(url, None, elapsed=time.perf_counter() - start, error=str(e))
+
+
+def compute_digests(urls: Iterable[str], max_workers: int = MAX_WORKERS,
+                    cache: Optional[DigestCache] = None) -> Dict[str, DigestResult]:
+    """
+    Stream-hash many Forward targets concurrently.
+
+    Args:
+        urls: Forward targets (duplicates are hashed once).
+        max_workers: Concurrent downloads.
+        cache: Optional validator cache; saved once all targets are done.
+
+    Returns:
+        dict[str, DigestResult]: url -> result, in input order.
+    """
+    urls = list(dict.fromkeys(urls))
+    local = threading.local()
+
+    def work(url):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return stream_digest(url, local.session, cache)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = dict(zip(urls, pool.map(work, urls)))
+    if cache:
+        cache.save()
+    return results
+
+
+def digest_lines(digests: Dict[str, DigestResult]) -> List[str]:
+    """`Digest-SHA256: <url> <hex>` lines for every target that hashed successfully."""
+    return [f"Digest-SHA256: {url} {r.digest}" for url, r in digests.items() if r.digest]
+
+
+def parse_digest_lines(manifest: str) -> Dict[str, str]:
+    """url -> expected hex digest from a manifest's Digest-SHA256 lines."""
+    return parse_manifest(manifest).digests
+
+
+def verify_digests(manifest: str, max_workers: int = MAX_WORKERS,
+                   cache: Optional[DigestCache] = None) -> List[DigestResult]:
+    """
+    Consumer-side check of every Digest-SHA256 line in a manifest.
+
+    Targets whose cached digest already matches and whose validators say
+    "unchanged" (304) are not downloaded again.
+
+    Returns:
+        list[DigestResult]: One result per digest line; `ok` is False on mismatch or fetch error.
+    """
+    expected = parse_digest_lines(manifest)
+    cache = cache if cache is not None else DigestCache()
+    results = compute_digests(expected, max_workers=max_workers, cache=cache)
+    for url, result in results.items():
+        result.expected = expected[url]
+    return list(results.values())
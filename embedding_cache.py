@@ -0,0 +1,199 @@
+"""
+On-disk embedding cache keyed by model name + content hash.
+
+Vectors live in a memory-mapped float32 matrix (one file per model), and a
+small JSON index maps content hashes to matrix rows. Lookups return copies,
+never views into the memmap, since an evicted row is overwritten in place.
+
+Layout:
+    <cache_dir>/<model>/vectors.f32   float32 matrix, shape (capacity, dim)
+    <cache_dir>/<model>/index.json    {"dim", "capacity", "rows": [[key, row], ...]}
+
+`rows` is stored in LRU order (oldest first); once `max_entries` is reached
+the least recently used row is overwritten in place.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+CACHE_DIR   = ".cache_embeddings"
+MAX_ENTRIES = 100_000      # rows per model before LRU eviction kicks in
+_MIN_ROWS   = 1_024        # initial memmap capacity, doubled on growth
+
+
+def content_key(text: str) -> str:
+    """SHA-256 of the whitespace-normalised text."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache for a single model.
+
+    Args:
+        model_name: Name of the embedding model; part of the cache key.
+        cache_dir: Root directory for all model caches.
+        max_entries: Size cap; least recently used rows are evicted beyond it.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = CACHE_DIR, max_entries: int = MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._index_path = os.path.join(self.path, "index.json")
+        self._lock = threading.Lock()
+
+        self.dim: Optional[int] = None
+        self._capacity = 0
+        self._rows: "OrderedDict[str, int]" = OrderedDict()
+        self._vectors: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    # ── persistence ──────────────────────────────────────────────
+    def _load(self):
+        if not (os.path.exists(self._index_path) and os.path.exists(self._vectors_path)):
+            return
+        try:
+            with open(self._index_path, encoding="utf-8") as f:
+                index = json.load(f)
+            self.dim = index["dim"]
+            self._capacity = index["capacity"]
+            self._rows = OrderedDict((k, r) for k, r in index["rows"])
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                      shape=(self._capacity, self.dim))
+        except (OSError, ValueError, KeyError):
+            # Corrupt or truncated cache: start over rather than serve bad vectors
+            self.dim, self._capacity, self._rows, self._vectors = None, 0, OrderedDict(), None
+
+    def flush(self):
+        """Write the index and sync the memmap to disk."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._vectors is None:
+            return
+        self._vectors.flush()
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "capacity": self._capacity,
+                       "rows": list(self._rows.items())}, f)
+        os.replace(tmp, self._index_path)
+
+    def _ensure_capacity(self, rows_needed: int):
+        """Grow the memmap (by doubling, up to max_entries) to hold rows_needed rows."""
+        if rows_needed <= self._capacity:
+            return
+        new_capacity = max(_MIN_ROWS, self._capacity)
+        while new_capacity < rows_needed:
+            new_capacity *= 2
+        new_capacity = min(new_capacity, self.max_entries)
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        # Extending the file keeps existing rows in place; the tail reads as zeros
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._capacity = new_capacity
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(self._capacity, self.dim))
+
+    # ── lookups ──────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, text: str) -> bool:
+        return content_key(text) in self._rows
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return a copy of the cached vector, or None."""
+        key = content_key(text)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return np.array(self._vectors[row])
+
+    def _put_locked(self, key: str, vector: np.ndarray):
+        if self.dim is None:
+            self.dim = int(vector.shape[-1])
+        if key in self._rows:
+            row = self._rows[key]
+            self._rows.move_to_end(key)
+        elif len(self._rows) < self.max_entries:
+            row = len(self._rows)
+            self._ensure_capacity(row + 1)
+            self._rows[key] = row
+        else:
+            # Evict the least recently used entry and reuse its row
+            _, row = self._rows.popitem(last=False)
+            self._rows[key] = row
+        self._vectors[row] = vector
+
+    def put(self, text: str, vector: np.ndarray):
+        """Store a single vector. Call flush() to persist the index."""
+        with self._lock:
+            self._put_locked(content_key(text), np.asarray(vector, dtype=np.float32))
+
+    def get_or_compute(self, texts: Sequence[str],
+                       compute: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Batch lookup; missing texts are embedded with a single `compute` call.
+
+        Args:
+            texts: Texts to embed. Duplicates are only computed once.
+            compute: Function mapping a list of texts to a (n, dim) array.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim), in input order.
+        """
+        keys = [content_key(t) for t in texts]
+        # Held across compute so a concurrent batch cannot evict rows mid-gather
+        with self._lock:
+            hits, missing = {}, {}
+            for i, (key, text) in enumerate(zip(keys, texts)):
+                if key in self._rows:
+                    hits[i] = self._rows[key]
+                    self._rows.move_to_end(key)
+                elif key not in missing:
+                    missing[key] = text
+            self.misses += len(missing)
+            self.hits += len(hits)
+
+            # Gather hits before storing misses: a small cache may evict them
+            gathered = self._vectors[list(hits.values())] if hits else None
+            fresh = {}
+            if missing:
+                computed = np.asarray(compute(list(missing.values())), dtype=np.float32)
+                for key, vector in zip(missing, computed):
+                    self._put_locked(key, vector)
+                    fresh[key] = vector
+                self._flush_locked()
+
+            if self.dim is None:
+                return np.empty((0, 0), dtype=np.float32)
+            out = np.empty((len(keys), self.dim), dtype=np.float32)
+            if hits:
+                out[list(hits)] = gathered
+            for i, key in enumerate(keys):
+                if i not in hits:
+                    out[i] = fresh[key]
+            return out
+
+    def stats(self) -> dict:
+        return {"model": self.model_name, "entries": len(self._rows), "capacity": self._capacity,
+                "dim": self.dim, "hits": self.hits, "misses": self.misses}
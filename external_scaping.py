@@ -1,35 +1,92 @@
 from link_harvesting.link_harvester import (
-    seed_urls_via_openai,
-    fetch, extract_text, verify, summarise, base_domain
+    seed_urls_via_openai, crawl_outward, stored_urls,
+    fetch, extract_text, verify, summarise, base_domain, site_scheme
 )
 from collections import defaultdict
+from vector_index import VectorIndex, aggregate_max
+from verify import get_embeddings
+from typing import Optional
+import os
 
 # ─── hard limits you can tweak once and forget ─────────────
 _OPENAI_LIMIT = 20      # how many URLs to ask the search model for
-_MAX_ROWS     = 5      # stop after N verified pages
+_CRAWL_LIMIT  = 10      # pages of the seed domain to scan for outward links
+_MAX_ROWS     = 5       # stop after N verified pages
+_INDEX_DIR    = ".cache_embeddings/candidates"
+
+def rank_candidates_for_domain(domain: str, candidates: list[str],
+                               domain_pages: Optional[list[str]] = None,
+                               top_k: int = 50) -> list[tuple[str, float]]:
+    """
+    Rank candidate forward links by relevance to a domain's pages.
+
+    Candidate embeddings are kept in a per-domain VectorIndex on disk, so
+    only URLs not seen on earlier runs are fetched and embedded.
+
+    Parameters
+    ----------
+    domain       : str        e.g.  "peec.ai"
+    candidates   : list[str]  external URLs to rank
+    domain_pages : list[str]  page texts of the domain (default: its home page)
+    top_k        : int        how many ranked candidates to return
+
+    Returns
+    -------
+    list[tuple[str, float]]
+        [(candidate_url, cosine_score), ...] best first
+    """
+    domain = domain.strip('/')
+    if domain_pages is None:
+        domain_pages = [extract_text(fetch(f"{site_scheme()}://{domain}"))]
+    domain_pages = [t for t in domain_pages if t]
+    if not domain_pages or not candidates:
+        return []
+
+    index_path = os.path.join(_INDEX_DIR, domain.replace('/', '_'))
+    index = VectorIndex.load(index_path)
+
+    new_urls, new_texts = [], []
+    for url in dict.fromkeys(candidates):
+        if url not in index:
+            txt = extract_text(fetch(url))
+            if txt:
+                new_urls.append(url)
+                new_texts.append(txt)
+    if new_urls:
+        index.add(new_urls, get_embeddings(new_texts))
+        index.save(index_path)
+
+    # One batched query per domain page, scored against this call's candidates
+    # only (the index also holds every earlier run's); a candidate scores its best match
+    hits = index.search_among(get_embeddings(domain_pages), candidates, k=top_k)
+    return aggregate_max(hits)[:top_k]
 
 def get_external_links(domain: str, brand: str) -> dict[str, list[str]]:
     """
-    Harvest ONLY 'openai-search' external links.
-    
+    Harvest external links from OpenAI search, links.db and the domain's
+    own outward links, ranked by relevance before the LLM relevance check.
+
     Parameters
     ----------
     domain : str   e.g.  "peec.ai"
     brand  : str   e.g.  "Peec AI"
-    
+
     Returns
     -------
     dict[str, str]
         { seed_url : external_url }
         (one entry per accepted page, up to _MAX_ROWS)
     """
-    seed_url = f"https://{domain.strip('/')}"
+    seed_url = f"{site_scheme()}://{domain.strip('/')}"
     mapping  = defaultdict(list)
     count    = 0
 
-    for ext in seed_urls_via_openai(brand, limit=_OPENAI_LIMIT):
-        html = fetch(ext)
-        txt  = extract_text(html)
+    candidates = list(seed_urls_via_openai(brand, limit=_OPENAI_LIMIT))
+    candidates += stored_urls(brand)
+    candidates += sorted(crawl_outward(seed_url, limit=_CRAWL_LIMIT, delay=0.2))
+
+    for ext, _ in rank_candidates_for_domain(domain, candidates):
+        txt  = extract_text(fetch(ext))
         if txt and verify(txt, brand):
             mapping[seed_url].append(ext)
             count += 1
@@ -0,0 +1,284 @@
+"""
+Single-pass parser for llms.txt / flm.txt manifests.
+
+`parse_manifest` walks the text once, line by line, and returns a Manifest
+with the title, summary, sections, links (markdown and bare URLs, each
+counted once), Forward targets, Digest-SHA256 lines, User-agent groups and
+any other directives (Include, Expire, Forward-manifest, Merkle-Proof, ...).
+
+Parsed manifests can be exported for bulk loading:
+
+- JSONL: one manifest per line, human readable.
+- Indexed binary (".flmidx"): length-prefixed compact records followed by
+  an offset table, so a crawler can mmap the file and jump to record i
+  without reading the ones before it.
+"""
+import json
+import mmap
+import re
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+# Markdown links first so the URL inside [text](url) is not matched again as a bare URL
+LINK_RE = re.compile(
+    r'\[([^\]]*)\]\(([^)\s]+)(?:\s+"[^"]*")?\)'
+    r'|(https?://[^\s<>"{}|\\^`\[\]]+[^\s<>"{}|\\^`\[\].,;:!?)])'
+)
+DIRECTIVE_RE = re.compile(r"^([A-Za-z][A-Za-z0-9-]*)\s*:\s*(.*?)\s*$")
+DIRECTIVES = {"user-agent", "allow", "disallow", "forward", "digest-sha256", "include",
+              "expire", "forward-manifest", "sitemap", "crawl-delay", "merkle-proof"}
+
+
+@dataclass
+class Link:
+    url: str
+    title: Optional[str] = None     # None for bare URLs
+    section: Optional[str] = None   # heading the link appeared under
+    line: int = 0
+
+    @property
+    def is_markdown(self) -> bool:
+        return self.title is not None
+
+
+@dataclass
+class Section:
+    name: str
+    level: int
+    links: List[Link] = field(default_factory=list)
+
+
+@dataclass
+class UserAgentGroup:
+    agents: List[str] = field(default_factory=list)
+    allow: List[str] = field(default_factory=list)
+    disallow: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Manifest:
+    source: Optional[str] = None
+    title: Optional[str] = None
+    summary: Optional[str] = None   # first blockquote
+    sections: List[Section] = field(default_factory=list)
+    links: List[Link] = field(default_factory=list)
+    forwards: List[str] = field(default_factory=list)
+    digests: Dict[str, str] = field(default_factory=dict)
+    groups: List[UserAgentGroup] = field(default_factory=list)
+    directives: List[Tuple[str, str]] = field(default_factory=list)   # everything else, in order
+
+    def directive_urls(self) -> List[str]:
+        """Absolute URLs named on directive lines (Forward, Digest-SHA256, Sitemap, Include, ...)."""
+        urls = list(self.forwards)
+        urls.extend(self.digests)
+        for _, value in self.directives:
+            urls.extend(bare for _, _, bare in LINK_RE.findall(value) if bare)
+        return urls
+
+    # ── compact (de)serialisation ─────────────────────────────────
+    def to_record(self) -> list:
+        """Positional form used by the JSONL/binary exports (no repeated keys)."""
+        return [
+            self.source, self.title, self.summary,
+            [[s.name, s.level] for s in self.sections],
+            [[l.url, l.title, l.section, l.line] for l in self.links],
+            self.forwards,
+            self.digests,
+            [[g.agents, g.allow, g.disallow] for g in self.groups],
+            self.directives,
+        ]
+
+    @classmethod
+    def from_record(cls, rec: list) -> "Manifest":
+        source, title, summary, sections, links, forwards, digests, groups, directives = rec
+        links = [Link(*l) for l in links]
+        by_name = {}
+        secs = []
+        for name, level in sections:
+            sec = Section(name, level)
+            secs.append(sec)
+            by_name.setdefault(name, sec)
+        for link in links:
+            if link.section in by_name:
+                by_name[link.section].links.append(link)
+        return cls(source, title, summary, secs, links, forwards, digests,
+                   [UserAgentGroup(*g) for g in groups], [tuple(d) for d in directives])
+
+
+def parse_manifest(text: str, base_url: Optional[str] = None, source: Optional[str] = None) -> Manifest:
+    """
+    Parse an llms.txt or flm.txt document in one linear pass.
+
+    Args:
+        text: The manifest body.
+        base_url: If given, relative markdown links are resolved against it.
+        source: Where the manifest came from (stored on the result).
+
+    Returns:
+        Manifest: Structured records for the document.
+    """
+    m = Manifest(source=source)
+    links = m.links
+    find_links = LINK_RE.findall
+    section_name: Optional[str] = None
+    section_links: Optional[List[Link]] = None
+    group: Optional[UserAgentGroup] = None
+    group_has_rules = False
+
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.strip()
+        if not line:
+            continue
+        first = line[0]
+
+        if first == "#":
+            level = len(line) - len(line.lstrip("#"))
+            name = line[level:].strip()
+            # robots-style "# comment" lines in flm.txt have no heading text worth keeping
+            if level == 1 and m.title is None and name:
+                m.title = name
+            elif name:
+                section = Section(name, level)
+                section_name, section_links = name, section.links
+                m.sections.append(section)
+            continue
+
+        if first == ">" and m.summary is None:
+            m.summary = line[1:].strip()
+            continue
+
+        if first.isalpha():
+            d = DIRECTIVE_RE.match(line)
+            if d and d.group(1).lower() in DIRECTIVES and not d.group(2).startswith("//"):
+                key, value = d.group(1).lower(), d.group(2)
+                if key == "user-agent":
+                    # Consecutive User-agent lines share one group (robots.txt semantics)
+                    if group is None or group_has_rules:
+                        group = UserAgentGroup()
+                        m.groups.append(group)
+                        group_has_rules = False
+                    group.agents.append(value)
+                elif key in ("allow", "disallow"):
+                    if group is None:
+                        group = UserAgentGroup(agents=["*"])
+                        m.groups.append(group)
+                    getattr(group, key).append(value)
+                    group_has_rules = True
+                elif key == "forward":
+                    if value:
+                        m.forwards.append(value.split()[0])
+                elif key == "digest-sha256":
+                    parts = value.split()
+                    if len(parts) == 2:
+                        m.digests[parts[0]] = parts[1].lower()
+                else:
+                    m.directives.append((d.group(1), value))
+                continue
+
+        # Cheap pre-check: most prose lines have no link at all
+        if "http" not in line and "](" not in line:
+            continue
+        for title, url, bare in find_links(line):
+            if bare:
+                link = Link(bare, None, section_name, lineno)
+            else:
+                if base_url and not url.startswith(("http://", "https://", "mailto:", "#")):
+                    url = urljoin(base_url, url)
+                link = Link(url, title, section_name, lineno)
+            links.append(link)
+            if section_links is not None:
+                section_links.append(link)
+
+    return m
+
+
+# ── JSONL export ──────────────────────────────────────────────────
+def write_jsonl(manifests: Iterable[Manifest], path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for manifest in manifests:
+            f.write(json.dumps(manifest.to_record(), separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[Manifest]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Manifest.from_record(json.loads(line))
+
+
+# ── indexed binary export ─────────────────────────────────────────
+# Layout: MAGIC | (u32 length, record bytes)* | u64 offsets[count] | u64 table_offset | u64 count | MAGIC
+MAGIC = b"FLMIDX01"
+_U32 = struct.Struct("<I")
+_TRAILER = struct.Struct("<QQ8s")
+
+
+def write_index(manifests: Iterable[Manifest], path: str) -> int:
+    """Write manifests to an indexed binary file. Returns the record count."""
+    offsets = []
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        pos = len(MAGIC)
+        for manifest in manifests:
+            data = json.dumps(manifest.to_record(), separators=(",", ":")).encode("utf-8")
+            offsets.append(pos)
+            f.write(_U32.pack(len(data)))
+            f.write(data)
+            pos += _U32.size + len(data)
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.write(_TRAILER.pack(pos, len(offsets), MAGIC))
+    return len(offsets)
+
+
+class ManifestIndex:
+    """
+    Random-access reader for files written by write_index (memory-mapped).
+
+    Usage:
+        with ManifestIndex("manifests.flmidx") as index:
+            first = index[0]
+            for manifest in index: ...
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        table_offset, count, magic = _TRAILER.unpack_from(self._mm, len(self._mm) - _TRAILER.size)
+        if magic != MAGIC or self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an FLM index file")
+        self._count = count
+        self._offsets = struct.unpack_from(f"<{count}Q", self._mm, table_offset)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def raw(self, i: int) -> bytes:
+        """Undecoded record bytes (JSON array) for record i."""
+        offset = self._offsets[i]
+        (length,) = _U32.unpack_from(self._mm, offset)
+        start = offset + _U32.size
+        return self._mm[start:start + length]
+
+    def __getitem__(self, i: int) -> Manifest:
+        return Manifest.from_record(json.loads(self.raw(i)))
+
+    def __iter__(self) -> Iterator[Manifest]:
+        for i in range(self._count):
+            yield self[i]
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,94 @@
+"""
+End-to-end llms.txt / FLM generation for a domain, with an incremental mode.
+
+A full run summarises every page, harvests and verifies external links,
+signs certificates and hashes Forward targets. An incremental run loads the
+previous ManifestState and redoes those steps only for pages whose content
+hash changed; unchanged sections are spliced into the new document as-is.
+
+Page summaries are journaled while the run progresses; if it dies, a run
+with resume=True continues from the checkpoint instead of starting over.
+
+Every run prints the LLM calls it made (latency, tokens, cost per call
+site); see llm_client.
+"""
+import os
+
+import internal_scaping
+import external_scaping
+import llms_txt_generation
+import verify
+import digest
+import llm_client
+from certificate import DEFAULT_COMMITMENT, SIGNING_ALGORITHM, needs_renewal
+from checkpoint import CheckpointJournal
+from manifest_state import ManifestState, STATE_DIR
+
+
+def build_llms_txt(domain: str, incremental: bool = False, max_scapes: int = 3,
+                   state_dir: str = STATE_DIR, resume: bool = False,
+                   commitment: str = DEFAULT_COMMITMENT, algorithm: str = SIGNING_ALGORITHM) -> str:
+    """
+    Generate the llms.txt for a domain
+
+    Args:
+        domain (str): e.g. "peec.ai"
+        incremental (bool): Reuse the previous run's per-page state
+        max_scapes (int): Maximum number of internal pages to summarise
+        state_dir (str): Where per-domain state files live
+        resume (bool): Continue from the checkpoint of an interrupted run
+        commitment (str): "hashes" or "merkle"; Merkle certificates carry only the root and
+            each forward link's inclusion proof is written as a Merkle-Proof line
+        algorithm (str): Signature algorithm of new certificates, "rsa" or "ed25519"
+
+    Returns:
+        str: The llms.txt document
+    """
+    llm_before = llm_client.stats()
+    state = ManifestState.load(domain, state_dir) if incremental else ManifestState(domain, state_dir)
+    brand = domain.replace('.', ' ').rstrip('https://')
+
+    seed_url = domain.strip().rstrip('/')
+    if not seed_url.startswith(('http://', 'https://')):
+        seed_url = f"{internal_scaping.site_scheme()}://{seed_url}"
+
+    journal_path = os.path.join(state_dir, domain.replace("/", "_") + ".checkpoint.jsonl")
+    with CheckpointJournal(journal_path, resume=resume) as journal:
+        internal_links = internal_scaping.get_summaries(domain, max_scapes, state=state, journal=journal)
+    # Pages that are no longer reachable drop out of the manifest
+    state.pages = {url: page for url, page in state.pages.items() if url in internal_links or url == seed_url}
+
+    # External links hang off the seed page; only re-harvest, verify and sign when it changed
+    # (or when the stored certificate uses the other commitment mode, or is about to expire)
+    seed = state.page(seed_url)
+    if (seed_url in state.changed or not seed.external_links or (commitment == "merkle") != bool(seed.proofs)
+            or (seed.certificate and needs_renewal(seed.certificate))):
+        external_links = external_scaping.get_external_links(domain, brand)
+        certificates, proofs = verify.get_certificates(external_links, commitment=commitment,
+                                                              algorithm=algorithm)
+        seed.external_links = external_links.get(seed_url, [])
+        seed.certificate = certificates[seed_url][0] if certificates.get(seed_url) else None
+        seed.proofs = proofs.get(seed_url, {})
+        state.changed.add(seed_url)
+    external_links = {seed_url: seed.external_links} if seed.external_links and seed.certificate else {}
+    certificates = {seed_url: [seed.certificate]} if seed.certificate else {}
+    proofs = {seed_url: seed.proofs} if seed.certificate and seed.proofs else {}
+
+    # Validators make this a round of 304s when the targets did not change
+    results = digest.compute_digests(seed.external_links, cache=digest.DigestCache())
+    digests = {url: r.digest for url, r in results.items() if r.digest}
+    if digests != seed.digests:
+        seed.digests = digests
+        state.changed.add(seed_url)
+
+    if state.changed or not state.summary:
+        state.summary = internal_scaping.create_summary(internal_links)
+
+    llmstxt = llms_txt_generation.create_llms_txt(domain, state.summary, internal_links, external_links,
+                                                  certificates, digests, state=state, proofs=proofs)
+    state.document = llmstxt
+    state.save()
+    journal.complete()
+    print(f"{len(state.changed)}/{len(internal_links)} pages regenerated for {domain}")
+    print(llm_client.report(since=llm_before))
+    return llmstxt
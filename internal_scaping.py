@@ -1,25 +1,28 @@
 import requests
 import json
 from bs4 import BeautifulSoup
-import re
 import os
 from pathlib import Path
-from openai import OpenAI
+import llm_client
+from dataclasses import asdict
+from typing import Optional
+from checkpoint import CheckpointJournal
+from manifest_state import ManifestState, PageState
+from flm_parser import parse_manifest
+from link_harvesting.link_harvester import site_scheme
 
 
 from dotenv import load_dotenv
 load_dotenv()
 
-client = OpenAI()
-
-
 
 def summarize(text: str) -> dict:
     """
     Summarize the text
     """
     # Summarize the content using LLM
-    response = client.chat.completions.create(
+    response = llm_client.chat(
+        "internal_scaping.summarize",
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "You shortly summarize the content of the page. Additionally, you check if the site is very important/essential to understand what the domain is about (specific subsites are usually not important). You output a json object with the following fields: title: string, summary: string, important: boolean."},
@@ -33,16 +36,25 @@ def summarize(text: str) -> dict:
 
 
 
-def get_summaries(domain: str, max_scapes: int = 3) -> dict[str, str]:
+def get_summaries(domain: str, max_scapes: int = 3, state: Optional[ManifestState] = None,
+                  journal: Optional[CheckpointJournal] = None) -> dict[str, str]:
     """
     Scape the domain and return the llms.txt file
+
+    With a ManifestState, pages are re-fetched with their stored validators
+    and only pages whose content hash changed are summarized again.
+
+    With a CheckpointJournal, every finished page (its summary, the links
+    found on it and its page state) is journaled. Replayed records are
+    restored first, so a resumed run neither re-fetches nor re-summarizes
+    them and continues from the remaining frontier.
     """
     print(f"Scaping {domain}")
     domain = domain.strip().rstrip('/')
 
     # Ensure domain is a full URL
     if not domain.startswith(('http://', 'https://')):
-        domain = f"https://{domain}"
+        domain = f"{site_scheme()}://{domain}"
 
     summaries = dict()
     internal_links = set([domain])
@@ -74,8 +86,8 @@ def get_summaries(domain: str, max_scapes: int = 3) -> dict[str, str]:
             print(f"LLMs.txt found")
             llms_txt_content = response.text
             # Parse markdown links from llms.txt
-            md_links = re.findall(r'\[([^\]]+)\]\(([^\)]+)\)', llms_txt_content)
-            for _, url in md_links:
+            md_links = [link.url for link in parse_manifest(llms_txt_content).links if link.is_markdown]
+            for url in md_links:
                 if url.startswith(domain) or url.startswith(f"{domain}/"):
                     if url.startswith('/'):
                         url = f"{domain}{url}"
@@ -85,13 +97,39 @@ def get_summaries(domain: str, max_scapes: int = 3) -> dict[str, str]:
     except requests.exceptions.RequestException as e:
         print(f"LLMs.txt not available")
 
+    if journal:
+        for record in journal.of("page"):
+            url = record["url"]
+            summaries[url] = record["summary"]
+            internal_links.update(record["links"])
+            if state and record["page"]:
+                state.pages[url] = PageState(**record["page"])
+                if record["changed"]:
+                    state.changed.add(url)
+        internal_links -= summaries.keys()
+        if summaries:
+            print(f"Resumed with {len(summaries)} pages from the checkpoint")
+
+    def checkpoint(url: str, links):
+        if journal:
+            journal.append("page", url=url, summary=summaries[url], links=sorted(links),
+                           changed=state is not None and url in state.changed,
+                           page=asdict(state.page(url)) if state else None)
+
     while internal_links:
         if len(summaries) >= max_scapes:
             break
         url = internal_links.pop()
         print(f"[{len(summaries)+1}/{len(internal_links)+len(summaries)+1}] Scaping {url}")
         try:
-            response = requests.get(url)
+            response = requests.get(url, headers=state.conditional_headers(url) if state else None)
+            if state and response.status_code == 304:
+                # Unchanged since the last run: reuse summary and discovered links
+                page = state.pages[url]
+                summaries[url] = page.summary
+                internal_links.update(set(page.links) - summaries.keys())
+                checkpoint(url, page.links)
+                continue
             if response.status_code == 200:
                 # Parse HTML and extract meaningful content
                 soup = BeautifulSoup(response.text, "html.parser")
@@ -100,7 +138,12 @@ def get_summaries(domain: str, max_scapes: int = 3) -> dict[str, str]:
                 site_content = soup.get_text()
                 site_content = " ".join(site_content.split())
 
-                summaries[url] = summarize(site_content)
+                if state is None or state.update(url, site_content, response.headers):
+                    summaries[url] = summarize(site_content)
+                    if state:
+                        state.page(url).summary = summaries[url]
+                else:
+                    summaries[url] = state.pages[url].summary
                 new_links_raw = soup.find_all("a")
                 new_links = set()
                 for link in new_links_raw:
@@ -117,7 +160,10 @@ def get_summaries(domain: str, max_scapes: int = 3) -> dict[str, str]:
                     else:
                         continue
                     new_links.add(href)
+                if state:
+                    state.page(url).links = sorted(new_links)
                 internal_links.update(new_links - summaries.keys())
+                checkpoint(url, new_links)
 
         except requests.exceptions.RequestException as e:
             print(f"Failed: {e}")
@@ -141,7 +187,8 @@ def create_summary(summaries: dict[str, dict[str, str]]) -> str:
     print("#"*50)
 
 
-    response = client.chat.completions.create(
+    response = llm_client.chat(
+        "internal_scaping.create_summary",
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": "You create a summary of the domain based on the summaries of the internal pages. You output the summary as a string."},
@@ -157,3 +204,4 @@ if __name__ == "__main__":
     summaries = get_summaries("peec.ai")
     result = create_summary(summaries)
     print(result)
+    print(llm_client.report())
@@ -0,0 +1,323 @@
+"""
+Bulk FLM consumer  –  poll flm.txt across very large domain lists
+
+`fetch_flm` in link_harvester handles one domain at a time with blocking
+requests. This module polls 100k+ domains from a single event loop:
+
+- one pooled aiohttp session, a global concurrency limit and at most one
+  connection per host (FLM hosts are polled politely, never in parallel)
+- DNS answers cached for DNS_TTL seconds by the connector
+- results buffered and written to the store in batches as they arrive
+- runs are journalled; an interrupted run resumes where it stopped
+- stored ETag / Last-Modified make scheduled re-polls mostly 304s
+
+Usage (from the repo root):
+    python -m link_harvesting.flm_consumer domains.txt [--db PATH] [--concurrency N] [--every SECONDS]
+
+Testing against a local fake-domain server: pass url_template="http://{domain}:PORT"
+and resolver=StaticResolver("127.0.0.1"); every domain then resolves to the
+local server, which sees the domain in the Host header.
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+from flm_parser import parse_manifest
+
+# ─────────────────────────── 1. config ───────────────────────────────
+UA                 = "ForwardLinkBot/0.1 (+https://your-project)"
+FLM_PATHS          = ("/flm.txt", "/.well-known/flm.txt", "/robots.txt")
+URL_TEMPLATE       = "https://{domain}"
+DB_PATH            = "link_harvesting/flm_manifests.db"
+GLOBAL_CONCURRENCY = 200           # domains in flight
+PER_HOST           = 1             # connections per host
+FETCH_TIMEOUT      = 8
+DNS_TTL            = 300           # seconds a resolved address is reused
+BATCH_SIZE         = 500           # results per store write
+MAX_BYTES          = 1_000_000     # manifests larger than this are truncated
+
+
+# ─────────────────── 2. records & domain input ──────────────────────
+@dataclass
+class FLMRecord:
+    domain: str
+    status: str                     # ok | not_modified | missing | error
+    url: Optional[str] = None       # manifest location that answered
+    http_status: Optional[int] = None
+    forwards: List[str] = field(default_factory=list)
+    digests: Dict[str, str] = field(default_factory=dict)
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: str = ""
+    fetched: float = 0.0
+
+
+def norm_domain(line: str) -> str:
+    d = line.strip().lower()
+    if "://" in d:
+        d = d.split("://", 1)[1]
+    return d.split("/", 1)[0]
+
+
+def iter_domains(lines: Iterable[str]) -> Iterator[str]:
+    """Normalised, de-duplicated domains; blank lines and # comments skipped."""
+    seen: Set[str] = set()
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        d = norm_domain(line)
+        if d and d not in seen:
+            seen.add(d)
+            yield d
+
+
+class StaticResolver(AbstractResolver):
+    """Resolve every hostname to one address (for fake-domain test servers)."""
+
+    def __init__(self, address: str = "127.0.0.1"):
+        self.address = address
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        return [{"hostname": host, "host": self.address, "port": port,
+                 "family": socket.AF_INET, "proto": 0, "flags": socket.AI_NUMERICHOST}]
+
+    async def close(self):
+        pass
+
+
+# ─────────────────── 3. storage backend ─────────────────────────────
+class SQLiteStore:
+    """
+    Latest manifest per domain plus a journal of runs.
+
+    Any object with the same methods (start_run, done_since, get,
+    write_many, finish_run, close) can be passed to BulkFLMConsumer.
+
+    Args:
+        path: SQLite database file.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(
+            """CREATE TABLE IF NOT EXISTS manifests(
+                 domain TEXT PRIMARY KEY, status TEXT, url TEXT, http_status INTEGER,
+                 forwards TEXT, digests TEXT, etag TEXT, last_modified TEXT,
+                 error TEXT, fetched REAL);
+               CREATE INDEX IF NOT EXISTS manifests_fetched ON manifests(fetched);
+               CREATE TABLE IF NOT EXISTS runs(
+                 id INTEGER PRIMARY KEY, started REAL, finished REAL);"""
+        )
+
+    def start_run(self, resume: bool = True) -> Tuple[int, float]:
+        """Reuse the last run if it never finished (and resume is set), else open a new one."""
+        row = self.conn.execute("SELECT id, started, finished FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        if resume and row and row[2] is None:
+            return row[0], row[1]
+        started = time.time()
+        cur = self.conn.execute("INSERT INTO runs (started) VALUES (?)", (started,))
+        self.conn.commit()
+        return cur.lastrowid, started
+
+    def done_since(self, started: float) -> Set[str]:
+        return {r[0] for r in self.conn.execute("SELECT domain FROM manifests WHERE fetched >= ?", (started,))}
+
+    def get(self, domain: str) -> Optional[FLMRecord]:
+        row = self.conn.execute(
+            "SELECT domain, status, url, http_status, forwards, digests, etag, last_modified, error, fetched "
+            "FROM manifests WHERE domain = ?", (domain,)).fetchone()
+        if not row:
+            return None
+        rec = FLMRecord(*row)
+        rec.forwards, rec.digests = json.loads(rec.forwards or "[]"), json.loads(rec.digests or "{}")
+        return rec
+
+    def write_many(self, records: List[FLMRecord]):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO manifests VALUES (?,?,?,?,?,?,?,?,?,?)",
+            [(r.domain, r.status, r.url, r.http_status, json.dumps(r.forwards), json.dumps(r.digests),
+              r.etag, r.last_modified, r.error, r.fetched) for r in records],
+        )
+        self.conn.commit()
+
+    def finish_run(self, run_id: int):
+        self.conn.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run_id))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+# ─────────────────── 4. async consumer ──────────────────────────────
+class BulkFLMConsumer:
+    """
+    Poll flm.txt for many domains concurrently and store what they declare.
+
+    Args:
+        store: Storage backend (see SQLiteStore).
+        concurrency: Global limit on domains / connections in flight.
+        per_host: Connection limit per host.
+        timeout: Per-request timeout in seconds.
+        dns_ttl: Seconds a DNS answer is cached.
+        url_template: Base URL for a domain; "{domain}" is substituted.
+        resolver: Optional aiohttp resolver (e.g. StaticResolver for tests).
+        batch_size: Results buffered before each store write.
+    """
+
+    def __init__(self, store, concurrency: int = GLOBAL_CONCURRENCY, per_host: int = PER_HOST,
+                 timeout: float = FETCH_TIMEOUT, dns_ttl: int = DNS_TTL, url_template: str = URL_TEMPLATE,
+                 resolver: Optional[AbstractResolver] = None, batch_size: int = BATCH_SIZE):
+        self.store = store
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.dns_ttl = dns_ttl
+        self.url_template = url_template
+        self.resolver = resolver
+        self.batch_size = batch_size
+        self._buffer: List[FLMRecord] = []
+        self.stats: Dict[str, int] = {}
+
+    async def fetch_domain(self, session: aiohttp.ClientSession, domain: str) -> FLMRecord:
+        """Try the FLM locations in order; the one that answered last time goes first."""
+        prev = self.store.get(domain)
+        base = self.url_template.format(domain=domain)
+        urls = [base + path for path in FLM_PATHS]
+        if prev and prev.url in urls:
+            urls.remove(prev.url)
+            urls.insert(0, prev.url)
+
+        rec = FLMRecord(domain, "missing")
+        for url in urls:
+            headers = {}
+            if prev and prev.url == url and prev.status in ("ok", "not_modified"):
+                if prev.etag:
+                    headers["If-None-Match"] = prev.etag
+                if prev.last_modified:
+                    headers["If-Modified-Since"] = prev.last_modified
+            try:
+                async with session.get(url, headers=headers) as r:
+                    rec.http_status = r.status
+                    if r.status == 304 and headers:
+                        return FLMRecord(domain, "not_modified", url, 304, prev.forwards, prev.digests,
+                                         prev.etag, prev.last_modified, fetched=time.time())
+                    if r.status != 200:
+                        continue
+                    body = await r.content.read(MAX_BYTES)
+                    manifest = parse_manifest(body.decode(r.charset or "utf-8", errors="replace"), source=url)
+                    # robots.txt only counts when it actually carries Forward lines
+                    if url.endswith("/robots.txt") and not manifest.forwards:
+                        continue
+                    return FLMRecord(domain, "ok", url, r.status, manifest.forwards, manifest.digests,
+                                     r.headers.get("ETag"), r.headers.get("Last-Modified"), fetched=time.time())
+            except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeError, LookupError) as e:
+                # DNS / connect failures hit every path on the host alike
+                rec.status, rec.error = "error", str(e) or type(e).__name__
+                break
+        rec.fetched = time.time()
+        return rec
+
+    def _record(self, rec: FLMRecord):
+        self.stats[rec.status] = self.stats.get(rec.status, 0) + 1
+        self._buffer.append(rec)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.store.write_many(self._buffer)
+            self._buffer = []
+
+    async def _worker(self, session, queue: asyncio.Queue):
+        while True:
+            domain = await queue.get()
+            if domain is None:
+                return
+            self._record(await self.fetch_domain(session, domain))
+
+    async def run(self, domains: Iterable[str], resume: bool = True) -> Dict[str, int]:
+        """
+        Poll every domain once.
+
+        Args:
+            domains: Domain names (or lines of a domain list file); streamed, not loaded up front.
+            resume: Continue the last run if it was interrupted, skipping domains it already stored.
+
+        Returns:
+            dict: Counts per status, plus "skipped" and "seconds".
+        """
+        start = time.perf_counter()
+        run_id, started = self.store.start_run(resume)
+        done = self.store.done_since(started)
+        self.stats = {"skipped": 0}
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host,
+                                         ttl_dns_cache=self.dns_ttl, resolver=self.resolver)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        # Bounded queue: the domain list is never fully materialised
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"User-Agent": UA}) as session:
+            workers = [asyncio.create_task(self._worker(session, queue)) for _ in range(self.concurrency)]
+            try:
+                for domain in iter_domains(domains):
+                    if domain in done:
+                        self.stats["skipped"] += 1
+                        continue
+                    await queue.put(domain)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                # On Ctrl-C everything fetched so far is still stored; the run stays open for resume
+                for w in workers:
+                    w.cancel()
+                self.flush()
+        self.store.finish_run(run_id)
+        self.stats["seconds"] = round(time.perf_counter() - start, 2)
+        return self.stats
+
+
+def consume(domains: Iterable[str], db_path: str = DB_PATH, resume: bool = True, **kwargs) -> Dict[str, int]:
+    """Synchronous entry point: poll domains into a SQLiteStore at db_path."""
+    store = SQLiteStore(db_path)
+    try:
+        return asyncio.run(BulkFLMConsumer(store, **kwargs).run(domains, resume=resume))
+    finally:
+        store.close()
+
+
+# ─────────────────────────  entry  ───────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Poll flm.txt across a list of domains.")
+    parser.add_argument("domains_file", help="one domain per line")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--concurrency", type=int, default=GLOBAL_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=FETCH_TIMEOUT)
+    parser.add_argument("--no-resume", action="store_true", help="start a fresh run even if the last one was interrupted")
+    parser.add_argument("--every", type=float, default=0, help="repeat the poll every N seconds")
+    args = parser.parse_args()
+
+    while True:
+        with open(args.domains_file, encoding="utf-8") as f:
+            stats = consume(f, args.db, resume=not args.no_resume,
+                            concurrency=args.concurrency, timeout=args.timeout)
+        print("Run complete:", json.dumps(stats))
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,18 +7,18 @@ Example:
     python link_harvester.py https://www.bmw.com bmw
 """
 
-import os, re, sys, time, json, hashlib, sqlite3, signal, requests, openai
+import os, re, sys, time, json, hashlib, sqlite3, signal, requests
 from urllib.parse import urljoin, urldefrag, urlparse
 from bs4 import BeautifulSoup
 import pathlib
+from flm_parser import parse_manifest
+import llm_client
 
 # ──────────────────────── 0. load .env manually ──────────────────────
 from dotenv import load_dotenv
 load_dotenv()
 
 # ─────────────────────────── 1. config ───────────────────────────────
-openai.api_key = os.getenv("OPENAI_API_KEY") or "MISSING_KEY"
-
 UA            = "ForwardLinkBot/0.1 (+https://your-project)"
 HEADERS       = {"User-Agent": UA}
 CACHE_DIR     = ".cache_html"; os.makedirs(CACHE_DIR, exist_ok=True)
@@ -31,6 +31,10 @@ GPT_VERIFY    = "gpt-4o-mini"             # relevance checker
 GPT_SUM       = "gpt-3.5-turbo"           # 30-token summary
 
 # ─────────────────── 2. domain helpers ───────────────────────────────
+def site_scheme() -> str:
+    """Scheme for bare domains: SITE_SCHEME, "http" for local stand-in sites."""
+    return os.getenv("SITE_SCHEME", "https")
+
 def norm_domain(d: str) -> str:
     if not d:
         return d
@@ -93,6 +97,11 @@ def store(brand, url, summary, prov):
     )
     conn.commit()
 
+def stored_urls(brand: str) -> list[str]:
+    """URLs previously harvested for this brand (any provenance)."""
+    rows = conn.execute("SELECT DISTINCT url FROM links WHERE brand = ?", (brand,))
+    return [r[0] for r in rows]
+
 # ─────────────────── 6. OpenAI helper calls ─────────────────────────
 def seed_urls_via_openai(brand: str, limit=40) -> list[str]:
     sys_prompt = (
@@ -100,7 +109,8 @@ def seed_urls_via_openai(brand: str, limit=40) -> list[str]:
         '{"urls": ["https://example.com/..."]} listing external pages that '
         f"meaningfully discuss {brand}. No markdown, no commentary."
     )
-    rsp = openai.chat.completions.create(
+    rsp = llm_client.chat(
+        "link_harvester.seed_urls",
         model=GPT_SEARCH,
         messages=[{"role": "system", "content": sys_prompt},
                   {"role": "user",   "content": ""}],
@@ -118,7 +128,8 @@ def verify(text: str, brand: str) -> bool:
         "Return JSON {\"relevant\": bool} — true only if the passage meaningfully "
         f"discusses the company {brand}."
     )
-    rsp = openai.chat.completions.create(
+    rsp = llm_client.chat(
+        "link_harvester.verify",
         model=GPT_VERIFY,
         messages=[{"role": "system", "content": sys_prompt},
                   {"role": "user",   "content": text[:1500]}],
@@ -128,7 +139,8 @@ def verify(text: str, brand: str) -> bool:
     return json.loads(rsp.choices[0].message.content)["relevant"]
 
 def summarise(text: str, brand: str) -> str:
-    rsp = openai.chat.completions.create(
+    rsp = llm_client.chat(
+        "link_harvester.summarise",
         model=GPT_SUM,
         messages=[{"role": "system",
                    "content": f"Summarise in <=30 tokens what this passage says about {brand}."},
@@ -141,25 +153,32 @@ def summarise(text: str, brand: str) -> str:
 # ───────────────────────── 7. FLM fetch ─────────────────────────────
 def fetch_flm(domain: str):
     for path in ("/flm.txt", "/.well-known/flm.txt", "/robots.txt"):
-        url = f"https://{domain}{path}"
+        url = f"{site_scheme()}://{domain}{path}"
         try:
             r = requests.get(url, headers=HEADERS, timeout=8)
             if r.ok:
-                for m in re.finditer(r"(?i)^forward:\s*(\S+)", r.text, re.M):
-                    yield m.group(1).strip()
+                yield from parse_manifest(r.text, source=url).forwards
         except requests.RequestException:
             continue
 
 # ─────────────────── 8. simple outward crawler ──────────────────────
+HREF_RE = re.compile(r'href=["\'](.*?)["\']')
+
+def extract_links(html: str, base_url: str) -> list[str]:
+    """Absolute, fragment-free targets of the href attributes in html."""
+    links = []
+    for href in HREF_RE.findall(html):
+        link = urldefrag(urljoin(base_url, href))[0]
+        if not link.startswith(("mailto:", "javascript")):
+            links.append(link)
+    return links
+
 def crawl_outward(seed: str, limit=200, delay=1.0):
     queue, seen, results = [seed.rstrip("/")], set(), set()
     while queue and len(seen) < limit and not interrupted:
         url = queue.pop(0); seen.add(url)
         html = fetch(url); time.sleep(delay)
-        for href in re.findall(r'href=["\'](.*?)["\']', html):
-            link = urldefrag(urljoin(url, href))[0]
-            if link.startswith(("mailto:", "javascript")):
-                continue
+        for link in extract_links(html, url):
             if same_domain(seed, link):
                 if link not in seen:
                     queue.append(link)
@@ -194,6 +213,7 @@ def main(seed_url: str, brand: str):
 
     print("\nRun complete. Rows in DB:",
           conn.execute("SELECT COUNT(*) FROM links").fetchone()[0])
+    print(llm_client.report())
 
 # ─────────────── Ctrl-C graceful handler ────────────────
 # def _sig_handler(sig, frame):
@@ -0,0 +1,377 @@
+"""
+Shared OpenAI client with per-call-site accounting, for the pipeline
+scripts and crawl_to_llm alike.
+
+Every chat completion goes through chat() (sync) or achat() (async) with
+the name of its call site, e.g.
+
+    llm_client.chat("internal_scaping.summarize", model="gpt-4o-mini", messages=[...])
+
+The keyword arguments are those of client.chat.completions.create, and
+the OpenAI response is returned unchanged. Transient failures (429, 5xx,
+timeouts, connection errors) are retried with jittered backoff, honouring
+Retry-After; callers with their own retry policy (AIEnhancer and its
+AdaptiveLimiter) pass retries=0 and report theirs with record_retry().
+
+For each call site the process-wide client keeps a latency histogram,
+prompt and completion tokens, errors (failed attempts, retried or not),
+retries and the estimated cost; stats() returns the numbers and report()
+formats them as a table, either for the whole process or for one run
+(pass the stats() taken at its start). PRICES is the one price table;
+cost_of() prices token counts with it.
+"""
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0      # seconds before the first retry
+BACKOFF_CAP = 60.0
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)     # seconds; a last bucket holds the rest
+
+_RETRYABLE_STATUS = {408, 409, 429}     # and every 5xx
+_RETRYABLE_ERRORS = {"APITimeoutError", "APIConnectionError", "Timeout", "TimeoutError",
+                     "ServiceUnavailableError", "TryAgain", "ServerDisconnectedError"}
+
+# USD per 1K prompt / completion tokens; dated model names match by prefix
+PRICES = {
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-4o-search-preview": (0.0025, 0.01),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+class LLMUnavailable(Exception):
+    """The openai package or the API key is missing."""
+
+
+def price_of(model: str) -> Optional[Tuple[float, float]]:
+    """Prompt / completion price per 1K tokens of model, or None if unknown."""
+    for name in sorted(PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            return PRICES[name]
+    return None
+
+
+def cost_of(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of the tokens at model's price (0.0 for unknown models)."""
+    price = price_of(model)
+    if price is None:
+        return 0.0
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1000
+
+
+def token_counts(response, messages) -> Tuple[int, int]:
+    """Prompt and completion tokens reported by the response, else estimated at 4 characters per token."""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if not prompt_tokens:
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+    if not completion_tokens:
+        completion_tokens = sum(len(c.message.content or "") for c in response.choices) // 4
+    return prompt_tokens, completion_tokens
+
+
+def status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by an exception (openai 0.x / 1.x, httpx, aiohttp), if any."""
+    for attr in ("status_code", "http_status", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    value = getattr(getattr(exc, "response", None), "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds to wait according to the Retry-After(-Ms) response header, if present."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(exc, "headers", None)
+    if not headers:
+        return None
+
+    def header(name):
+        return headers.get(name) or headers.get(name.title())
+
+    try:
+        ms = header("retry-after-ms")
+        if ms is not None:
+            return max(float(ms) / 1000, 0.0)
+        value = header("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(when.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = status_of(exc)
+    if status is not None:
+        return status in _RETRYABLE_STATUS or status >= 500
+    return isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or type(exc).__name__ in _RETRYABLE_ERRORS
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def _retry_delay(exc: BaseException, attempt: int) -> float:
+    """Retry-After when the server sent one, else backoff."""
+    wait = retry_after(exc)
+    return min(wait, BACKOFF_CAP) if wait is not None else backoff_delay(attempt)
+
+
+class CallStats:
+    """Counters and latency histogram of one call site."""
+
+    FIELDS = ("calls", "errors", "retries", "prompt_tokens", "completion_tokens", "cost_usd", "seconds")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.histogram[i] += 1
+                return
+        self.histogram[-1] += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile latency (the max for the last bucket)."""
+        total = sum(self.histogram)
+        if not total:
+            return 0.0
+        rank, seen = q * total, 0
+        for i, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max_seconds
+        return self.max_seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats = {field: getattr(self, field) for field in self.FIELDS}
+        stats.update(
+            cost_usd=round(self.cost_usd, 6),
+            seconds=round(self.seconds, 3),
+            mean_seconds=round(self.seconds / self.calls, 3) if self.calls else 0.0,
+            p50_seconds=self.percentile(0.5),
+            p95_seconds=self.percentile(0.95),
+            max_seconds=round(self.max_seconds, 3),
+            histogram=dict(zip([f"<={b}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"],
+                               self.histogram)),
+        )
+        return stats
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallStats":
+        stats = cls()
+        for field in cls.FIELDS:
+            setattr(stats, field, data[field])
+        stats.max_seconds = data["max_seconds"]
+        stats.histogram = list(data["histogram"].values())
+        return stats
+
+
+class LLMClient:
+    """
+    OpenAI chat completions, sync and async, with per-call-site statistics.
+
+    Args:
+        max_retries: Default retries per call for transient failures.
+        **client_kwargs: Passed to openai.OpenAI / openai.AsyncOpenAI (api_key, base_url, timeout, ...).
+
+    The OpenAI clients are created on first use, so importing a script
+    does not require an API key; the async one is created per event loop.
+    Thread-safe.
+    """
+
+    def __init__(self, max_retries: int = MAX_RETRIES, **client_kwargs):
+        self.max_retries = max_retries
+        self.client_kwargs = client_kwargs
+        self._sync = None
+        self._async = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, CallStats] = {}
+
+    def _openai(self, name: str):
+        try:
+            import openai
+        except ImportError:
+            raise LLMUnavailable("openai is not installed. Please run: pip install openai")
+        if not (self.client_kwargs.get("api_key") or os.getenv("OPENAI_API_KEY")):
+            raise LLMUnavailable("OpenAI API key not found in environment variable.")
+        # Retries happen here, where they are counted
+        return getattr(openai, name)(max_retries=0, **self.client_kwargs)
+
+    @property
+    def sync_client(self):
+        if self._sync is None:
+            self._sync = self._openai("OpenAI")
+        return self._sync
+
+    @property
+    def async_client(self):
+        # httpx connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._async is None or self._async_loop is not loop:
+            self._async, self._async_loop = self._openai("AsyncOpenAI"), loop
+        return self._async
+
+    def reconnect(self):
+        """Drops the OpenAI clients, so the next call picks up the current api key / endpoint. Stats are kept."""
+        with self._lock:
+            self._sync = self._async = self._async_loop = None
+
+    def chat(self, site: str, retries: Optional[int] = None, **kwargs):
+        """client.chat.completions.create(**kwargs), accounted under site, with up to retries retries."""
+        client = self.sync_client
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            start = time.monotonic()
+            try:
+                response = client.chat.completions.create(**kwargs)
+            except Exception as e:
+                self._count(site, "errors")
+                if attempt < retries and is_retryable(e):
+                    self._count(site, "retries")
+                    time.sleep(_retry_delay(e, attempt))
+                    continue
+                raise
+            self._record(site, kwargs, response, time.monotonic() - start)
+            return response
+
+    async def achat(self, site: str, retries: Optional[int] = None, **kwargs):
+        """Async client.chat.completions.create(**kwargs), accounted under site, with up to retries retries."""
+        client = self.async_client
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            start = time.monotonic()
+            try:
+                response = await client.chat.completions.create(**kwargs)
+            except Exception as e:
+                self._count(site, "errors")
+                if attempt < retries and is_retryable(e):
+                    self._count(site, "retries")
+                    await asyncio.sleep(_retry_delay(e, attempt))
+                    continue
+                raise
+            self._record(site, kwargs, response, time.monotonic() - start)
+            return response
+
+    def record_retry(self, site: str):
+        """Counts a retry a caller with its own retry policy makes after a failed call."""
+        self._count(site, "retries")
+
+    def _site(self, site: str) -> CallStats:
+        if site not in self._stats:
+            self._stats[site] = CallStats()
+        return self._stats[site]
+
+    def _count(self, site: str, field: str):
+        with self._lock:
+            stats = self._site(site)
+            setattr(stats, field, getattr(stats, field) + 1)
+
+    def _record(self, site: str, kwargs: Dict[str, Any], response, seconds: float):
+        prompt_tokens, completion_tokens = token_counts(response, kwargs.get("messages", []))
+        with self._lock:
+            stats = self._site(site)
+            stats.calls += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost_usd += cost_of(kwargs.get("model", ""), prompt_tokens, completion_tokens)
+            stats.observe(seconds)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Call site -> counters, latency percentiles and histogram."""
+        with self._lock:
+            return {site: stats.as_dict() for site, stats in self._stats.items()}
+
+    def report(self, since: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Table of calls, latency, tokens and cost per call site.
+
+        Args:
+            since: A stats() snapshot; only what happened after it is reported.
+        """
+        rows = []
+        for site, current in sorted(self.stats().items()):
+            stats = CallStats.from_dict(current)
+            if since and site in since:
+                before = CallStats.from_dict(since[site])
+                for field in CallStats.FIELDS:
+                    setattr(stats, field, getattr(stats, field) - getattr(before, field))
+                stats.histogram = [a - b for a, b in zip(stats.histogram, before.histogram)]
+                # The all-time max is the window's only if it grew since the snapshot; otherwise
+                # the window's max is unknown and the overflow bucket reports its lower bound
+                if stats.max_seconds <= before.max_seconds:
+                    stats.max_seconds = LATENCY_BUCKETS[-1]
+            if stats.calls or stats.errors:
+                rows.append((site, stats))
+        lines = [f"{'call site':<36} {'calls':>6} {'retries':>7} {'errors':>6} {'p50 s':>6} {'p95 s':>6} "
+                 f"{'prompt tok':>10} {'compl tok':>9} {'cost $':>9}"]
+        for site, s in rows:
+            lines.append(f"{site[:36]:<36} {s.calls:>6} {s.retries:>7} {s.errors:>6} {s.percentile(0.5):>6.2f} "
+                         f"{s.percentile(0.95):>6.2f} {s.prompt_tokens:>10} {s.completion_tokens:>9} "
+                         f"{s.cost_usd:>9.4f}")
+        total = sum(s.cost_usd for _, s in rows)
+        lines.append(f"{'total':<36} {sum(s.calls for _, s in rows):>6} {sum(s.retries for _, s in rows):>7} "
+                     f"{sum(s.errors for _, s in rows):>6} {'':>6} {'':>6} "
+                     f"{sum(s.prompt_tokens for _, s in rows):>10} {sum(s.completion_tokens for _, s in rows):>9} "
+                     f"{total:>9.4f}")
+        return "\n".join(lines)
+
+
+_client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """The process-wide client shared by every script and by crawl_to_llm."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
+
+
+def reset():
+    """Reconnects the shared client, e.g. after OPENAI_BASE_URL changed; its stats are kept."""
+    get_client().reconnect()
+
+
+def chat(site: str, **kwargs):
+    return get_client().chat(site, **kwargs)
+
+
+async def achat(site: str, **kwargs):
+    return await get_client().achat(site, **kwargs)
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    return get_client().stats()
+
+
+def report(since: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    return get_client().report(since)
@@ -1,6 +1,49 @@
+from typing import Optional
+from manifest_state import ManifestState
+from merkle import encode_proof
 
 
-def create_llms_txt(domain: str, summary: str, internal_links: dict[str, dict[str, str]], external_links: dict[str, str], certificates: dict[str, str]) -> str:
+def render_page_section(url: str, summary: dict[str, str], external_links: dict[str, str], certificates: dict[str, str], digests: Optional[dict[str, str]] = None, proofs: Optional[dict[str, dict]] = None) -> str:
+    """
+    Render the llms.txt section for a single page
+
+    Args:
+        url (str): The page URL
+        summary (dict[str, str]): The page's title and summary
+        external_links, certificates, digests, proofs: As for create_llms_txt
+
+    Returns:
+        str: The page section, including its trailing separator
+    """
+    # Use markdown header for the title
+    section = f"### {summary['title']}\n"
+
+    # Use proper markdown link format
+    section += f"**URL:** [{url}]({url})\n"
+
+    # Format summary with proper markdown
+    section += f"**Summary:**\n{summary['summary']}\n"
+
+    # Add external links if they exist
+    if url in external_links:
+        section += f"**External Links:**\n"
+        cert_line = certificates[url][0].split('\n')[1]
+        for x in external_links[url]:
+            section += f"- [{x.lstrip('https://').split('/')[0]}]({x}) - {cert_line}\n"
+        for x in external_links[url]:
+            if digests and digests.get(x):
+                section += f"Digest-SHA256: {x} {digests[x]}\n"
+        page_proofs = (proofs or {}).get(url) or {}
+        for x in external_links[url]:
+            if x in page_proofs:
+                section += f"Merkle-Proof: {x} {encode_proof(page_proofs[x])}\n"
+
+    # Add horizontal rule to separate entries
+    section += "\n\n"
+    return section
+
+
+def create_llms_txt(domain: str, summary: str, internal_links: dict[str, dict[str, str]], external_links: dict[str, str], certificates: dict[str, str], digests: Optional[dict[str, str]] = None, state: Optional[ManifestState] = None, proofs: Optional[dict[str, dict]] = None) -> str:
     """
     Create a llms.txt file for the domain
 
@@ -10,6 +53,9 @@ def create_llms_txt(domain: str, summary: str, internal_links: dict[str, dict[st
         internal_links (dict[str, dict[str, str]]): A dictionary of internal links, where the key is the URL and the value is a dictionary with the title and summary
         external_links (dict[str, str]): A dictionary of external links, where the key is the internal link and the value is the external link
         certificates (dict[str, str]): A dictionary of certificates, where the key is the internal link and the value is the certificate
+        digests (dict[str, str], optional): SHA-256 hex digest per external link, emitted as Digest-SHA256 lines
+        state (ManifestState, optional): Previous manifest state; sections of unchanged pages are spliced in as-is
+        proofs (dict[str, dict], optional): Per internal link, the Merkle inclusion proof of each external link, emitted as Merkle-Proof lines
 
     Returns:
         str: The llms.txt file as a string
@@ -21,23 +67,14 @@ def create_llms_txt(domain: str, summary: str, internal_links: dict[str, dict[st
 
     # pages overview
     llmstxt += "\n## Pages Overview\n"
-    for url, summary in internal_links.items():
-        # Use markdown header for the title
-        llmstxt += f"### {summary['title']}\n"
-
-        # Use proper markdown link format
-        llmstxt += f"**URL:** [{url}]({url})\n"
-
-        # Format summary with proper markdown
-        llmstxt += f"**Summary:**\n{summary['summary']}\n"
-
-        # Add external links if they exist
-        if url in external_links:
-            llmstxt += f"**External Links:**\n"
-            for x in external_links[url]:
-                llmstxt += f"- [{x.lstrip('https://').split('/')[0]}]({x}) - {certificates[url][0].split('\n')[1]}\n"
-
-        # Add horizontal rule to separate entries
-        llmstxt += "\n\n"
+    for url, page_summary in internal_links.items():
+        page = state.page(url) if state else None
+        if page and page.section and url not in state.changed:
+            llmstxt += page.section
+            continue
+        section = render_page_section(url, page_summary, external_links, certificates, digests, proofs)
+        if page:
+            page.section = section
+        llmstxt += section
 
     return llmstxt
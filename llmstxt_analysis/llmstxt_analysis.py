@@ -9,10 +9,10 @@ then analyzes the links in each file to determine:
 - Statistics grouped by domain
 """
 
+import argparse
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
-import re
 from collections import defaultdict, Counter
 import time
 import json
@@ -22,9 +22,14 @@ import signal
 import os
 import hashlib
 
+# Allow running as a script from this directory as well as from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flm_parser import parse_manifest
+from checkpoint import CheckpointJournal
+
 
 class LLMSTxtAnalyzer:
-    def __init__(self):
+    def __init__(self, resume: bool = False):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -39,6 +44,9 @@ class LLMSTxtAnalyzer:
         self.cache_expire_hours = 24
         os.makedirs(self.cache_dir, exist_ok=True)
 
+        # Found llms.txt URLs and per-file analyses, so an interrupted run can be resumed
+        self.journal = CheckpointJournal(os.path.join(self.cache_dir, "analysis.checkpoint.jsonl"), resume=resume)
+
     def signal_handler(self, signum, frame):
         """Handle Ctrl+C gracefully"""
         print("\n\nReceived interrupt signal (Ctrl+C)...")
@@ -104,17 +112,11 @@ class LLMSTxtAnalyzer:
         if not content:
             return []
 
-        # Find URLs using regex
-        url_pattern = r'https?://[^\s<>"{}|\\^`[\]]+[^\s<>"{}|\\^`[\].,;:!?)]'
-        urls = re.findall(url_pattern, content)
-
-        # Also look for markdown-style links
-        markdown_pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-        markdown_matches = re.findall(markdown_pattern, content)
-        for _, url in markdown_matches:
-            if url.startswith('http'):
-                urls.append(url)
-
+        # One pass over the file; markdown links are not double-counted as bare URLs
+        manifest = parse_manifest(content)
+        urls = [link.url for link in manifest.links if link.url.startswith('http')]
+        # Directive lines (Forward:, Sitemap:, ...) are parsed apart from the links
+        urls.extend(url for url in manifest.directive_urls() if url.startswith('http'))
         return urls
 
     def get_domain(self, url: str) -> str:
@@ -225,6 +227,12 @@ class LLMSTxtAnalyzer:
 
     def scrape_llmstxt_site(self):
         """Scrape the main llmstxt.site page for llms.txt links"""
+        checkpointed = self.journal.of('urls')
+        if checkpointed:
+            self.llms_txt_urls = set(checkpointed[-1]['urls'])
+            print(f"Resuming with {len(self.llms_txt_urls)} llms.txt links from the checkpoint")
+            return
+
         print("Scraping https://llmstxt.site/ for llms.txt links...")
 
         content = self.fetch_page('https://llmstxt.site/')
@@ -240,13 +248,34 @@ class LLMSTxtAnalyzer:
             print(f"  - {link}")
 
         self.llms_txt_urls = llms_txt_links
+        self.journal.append('urls', urls=sorted(llms_txt_links))
+
+    def add_analysis(self, url: str, analysis: Dict):
+        """Store one file's analysis and add it to the domain statistics"""
+        self.link_data[url] = analysis
+
+        # Update domain statistics using normalized domain for better grouping
+        domain = analysis['normalized_source_domain']
+        self.domain_stats[domain]['internal'] += analysis['internal_links']
+        self.domain_stats[domain]['external'] += analysis['external_links']
+        self.domain_stats[domain]['total'] += analysis['total_links']
 
     def analyze_all_llms_txt_files(self):
         """Analyze all found llms.txt files"""
+        for record in self.journal.of('analysis'):
+            analysis = record['analysis']
+            analysis['external_domains'] = Counter(analysis['external_domains'])
+            self.add_analysis(record['url'], analysis)
+        if self.link_data:
+            print(f"\nResuming: {len(self.link_data)} files already analyzed")
+
         print("\nAnalyzing all llms.txt files...")
         print("Press Ctrl+C to stop scraping and generate statistics with current data")
 
         for i, url in enumerate(self.llms_txt_urls, 1):
+            if url in self.link_data:
+                continue
+
             # Check for interruption
             if self.interrupted:
                 print(f"\nInterrupted after processing {i-1} files.")
@@ -256,13 +285,8 @@ class LLMSTxtAnalyzer:
 
             analysis = self.analyze_llms_txt_file(url)
             if analysis:
-                self.link_data[url] = analysis
-
-                # Update domain statistics using normalized domain for better grouping
-                domain = analysis['normalized_source_domain']
-                self.domain_stats[domain]['internal'] += analysis['internal_links']
-                self.domain_stats[domain]['external'] += analysis['external_links']
-                self.domain_stats[domain]['total'] += analysis['total_links']
+                self.add_analysis(url, analysis)
+                self.journal.append('analysis', url=url, analysis=analysis)
 
             # Be nice to servers
             time.sleep(0.5)
@@ -393,36 +417,49 @@ class LLMSTxtAnalyzer:
         # Set up signal handler for Ctrl+C
         signal.signal(signal.SIGINT, self.signal_handler)
 
+        # The checkpoint is deleted only after a finished run; an interrupted or crashed one keeps it
+        finished = False
         try:
-            # Step 1: Scrape llmstxt.site for llms.txt links
-            self.scrape_llmstxt_site()
-
-            if not self.llms_txt_urls:
-                print("No llms.txt links found. Exiting.")
-                return
+            try:
+                # Step 1: Scrape llmstxt.site for llms.txt links
+                self.scrape_llmstxt_site()
 
-            # Step 2: Analyze each llms.txt file (caching happens transparently)
-            self.analyze_all_llms_txt_files()
+                if not self.llms_txt_urls:
+                    print("No llms.txt links found. Exiting.")
+                    finished = not self.interrupted
+                    return
 
-        except KeyboardInterrupt:
-            # This shouldn't happen now since we handle it with signal handler
-            print("\nKeyboard interrupt received...")
-            self.interrupted = True
+                # Step 2: Analyze each llms.txt file (caching happens transparently)
+                self.analyze_all_llms_txt_files()
 
-        # Step 3: Generate statistics (always run this, even if interrupted)
-        if self.link_data:
-            self.generate_statistics()
-        else:
-            print("\nNo data collected to generate statistics.")
+            except KeyboardInterrupt:
+                # This shouldn't happen now since we handle it with signal handler
+                print("\nKeyboard interrupt received...")
+                self.interrupted = True
 
-        if self.interrupted:
-            print("\nAnalysis interrupted by user.")
-        else:
-            print("\nAnalysis complete!")
+            # Step 3: Generate statistics (always run this, even if interrupted)
+            if self.link_data:
+                self.generate_statistics()
+            else:
+                print("\nNo data collected to generate statistics.")
 
+            if self.interrupted:
+                print("\nAnalysis interrupted by user.")
+                print(f"Checkpoint saved to {self.journal.path}; run with --resume to continue.")
+            else:
+                finished = True
+                print("\nAnalysis complete!")
+        finally:
+            if finished:
+                self.journal.complete()
+            else:
+                self.journal.close()
 
 def main():
-    analyzer = LLMSTxtAnalyzer()
+    parser = argparse.ArgumentParser(description="Analyze the links in every llms.txt listed on llmstxt.site.")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint of an interrupted run")
+    args = parser.parse_args()
+    analyzer = LLMSTxtAnalyzer(resume=args.resume)
     analyzer.run()
 
 
@@ -0,0 +1,115 @@
+"""
+Per-page state of the last generated manifest, for incremental regeneration.
+
+One JSON file per domain stores, for every page: the HTTP validators, a
+hash of the extracted text, the LLM summary, the links discovered on it,
+its external links / certificate and the rendered llms.txt section. A
+refresh only redoes the expensive steps for pages whose hash changed.
+"""
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set
+
+STATE_DIR = ".flm_state"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PageState:
+    url: str
+    content_hash: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    summary: Optional[dict] = None              # {"title", "summary", "important"}
+    links: List[str] = field(default_factory=list)          # internal links found on the page
+    external_links: List[str] = field(default_factory=list)
+    certificate: Optional[str] = None
+    proofs: Dict[str, list] = field(default_factory=dict)   # external link -> Merkle inclusion proof
+    digests: Dict[str, str] = field(default_factory=dict)   # external link -> SHA-256
+    section: Optional[str] = None               # rendered llms.txt section
+    updated: int = 0
+
+
+class ManifestState:
+    """
+    Stored state for one domain's manifest.
+
+    Args:
+        domain: Domain the manifest belongs to.
+        state_dir: Directory holding one JSON file per domain.
+    """
+
+    def __init__(self, domain: str, state_dir: str = STATE_DIR):
+        self.domain = domain
+        self.path = os.path.join(state_dir, domain.replace("/", "_") + ".json")
+        self.pages: Dict[str, PageState] = {}
+        self.summary: Optional[str] = None      # domain-level summary
+        self.document: Optional[str] = None     # last generated llms.txt
+        self.changed: Set[str] = set()          # urls refreshed during this run
+
+    @classmethod
+    def load(cls, domain: str, state_dir: str = STATE_DIR) -> "ManifestState":
+        state = cls(domain, state_dir)
+        if os.path.exists(state.path):
+            try:
+                with open(state.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                state.pages = {url: PageState(**page) for url, page in data.get("pages", {}).items()}
+                state.summary = data.get("summary")
+                state.document = data.get("document")
+            except (OSError, ValueError, TypeError):
+                state.pages = {}
+        return state
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"domain": self.domain, "summary": self.summary, "document": self.document,
+                       "pages": {url: asdict(p) for url, p in self.pages.items()}}, f)
+        os.replace(tmp, self.path)
+
+    def page(self, url: str) -> PageState:
+        if url not in self.pages:
+            self.pages[url] = PageState(url)
+        return self.pages[url]
+
+    def conditional_headers(self, url: str) -> dict:
+        """If-None-Match / If-Modified-Since for a page we have seen before."""
+        page = self.pages.get(url)
+        headers = {}
+        if page and page.summary is not None:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def update(self, url: str, text: str, headers) -> bool:
+        """
+        Record a fresh fetch of url. Returns True if its content changed.
+
+        A changed page loses its summary, external links, certificate and
+        rendered section so that they are regenerated.
+        """
+        page = self.page(url)
+        page.etag = headers.get("ETag")
+        page.last_modified = headers.get("Last-Modified")
+        new_hash = content_hash(text)
+        if new_hash == page.content_hash and page.summary is not None:
+            return False
+        page.content_hash = new_hash
+        page.summary = None
+        page.external_links = []
+        page.certificate = None
+        page.digests = {}
+        page.section = None
+        page.updated = int(time.time())
+        self.changed.add(url)
+        return True
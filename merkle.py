@@ -0,0 +1,105 @@
+"""
+Merkle-tree commitments over forward-link URL lists.
+
+A certificate only needs to carry the root; a verifier checks one URL with
+an O(log n) inclusion proof instead of the full list of hashes.
+
+Hashing follows RFC 6962 domain separation so a leaf can never be passed
+off as an inner node:
+    leaf = SHA256(0x00 || url)
+    node = SHA256(0x01 || left || right)
+An odd node at the end of a level is carried up unchanged.
+
+Proofs are lists of [sibling_hex, side] where side is "L" or "R" — the
+position of the sibling relative to the running hash. In a manifest they
+are written as one token, e.g. "Lab12..,Rcd34.." ("-" for a one-leaf tree),
+on a "Merkle-Proof: <url> <proof>" line next to the link.
+"""
+import hashlib
+from typing import Dict, List, Sequence
+
+ALGORITHM = "sha256-merkle"
+
+
+def leaf_hash(url: str) -> bytes:
+    return hashlib.sha256(b"\x00" + url.encode("utf-8")).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+class MerkleTree:
+    """
+    Merkle tree over a list of URLs (order matters, duplicates are kept).
+
+    Args:
+        urls: Leaves of the tree, in manifest order.
+    """
+
+    def __init__(self, urls: Sequence[str]):
+        if not urls:
+            raise ValueError("Cannot build a Merkle tree without leaves")
+        self.urls = list(urls)
+        self.levels: List[List[bytes]] = [[leaf_hash(u) for u in self.urls]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self) -> str:
+        return self.levels[-1][0].hex()
+
+    def proof(self, index: int) -> List[List[str]]:
+        """Inclusion proof for the leaf at index."""
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append([level[sibling].hex(), "L" if sibling < index else "R"])
+            index //= 2
+        return proof
+
+    def proofs(self) -> Dict[str, List[List[str]]]:
+        """Inclusion proof for every URL (the first occurrence wins for duplicates)."""
+        out = {}
+        for i, url in enumerate(self.urls):
+            if url not in out:
+                out[url] = self.proof(i)
+        return out
+
+
+def merkle_root(urls: Sequence[str]) -> str:
+    return MerkleTree(urls).root
+
+
+def verify_proof(url: str, proof: List[List[str]], root: str) -> bool:
+    """Check that url is committed to by root."""
+    running = leaf_hash(url)
+    try:
+        for sibling_hex, side in proof:
+            sibling = bytes.fromhex(sibling_hex)
+            running = node_hash(sibling, running) if side == "L" else node_hash(running, sibling)
+    except (ValueError, TypeError):
+        return False
+    return running.hex() == root
+
+
+def encode_proof(proof: List[List[str]]) -> str:
+    """Compact text form of a proof for Merkle-Proof manifest lines."""
+    return ",".join(side + sibling_hex for sibling_hex, side in proof) or "-"
+
+
+def decode_proof(text: str) -> List[List[str]]:
+    """Inverse of encode_proof; raises ValueError on malformed input."""
+    if text == "-":
+        return []
+    proof = []
+    for step in text.split(","):
+        if len(step) < 2 or step[0] not in "LR":
+            raise ValueError(f"Malformed proof step '{step}'")
+        proof.append([step[1:], step[0]])
+    return proof
@@ -0,0 +1,232 @@
+"""
+Local vector index for ranking candidate forward links.
+
+Vectors are L2-normalised on insert so inner product == cosine similarity.
+Two search modes:
+
+- exact:  one (queries x n) matrix multiply + argpartition. Used for small
+          indexes and whenever the caller asks for it.
+- approx: inverted-file (IVF) index. Vectors are bucketed by their nearest
+          k-means centroid and a query only scans the `nprobe` closest
+          buckets. Built lazily once the index grows past `APPROX_THRESHOLD`.
+
+Persistence is a directory with `vectors.npy`, `ids.json` and (if trained)
+`centroids.npy`.
+"""
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+APPROX_THRESHOLD = 20_000   # switch 'auto' searches to IVF above this many vectors
+_KMEANS_ITERS    = 10
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the k best scores per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, part, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over (id, vector) pairs with batched top-k search.
+
+    Args:
+        nlist: Number of IVF buckets for approximate search (default: ~sqrt(n)).
+        nprobe: Buckets scanned per query in approximate mode.
+    """
+
+    def __init__(self, nlist: Optional[int] = None, nprobe: int = 8):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ids: List[str] = []
+        self._id_rows: Dict[str, int] = {}
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        # IVF state
+        self._centroids: Optional[np.ndarray] = None
+        self._assign = np.empty(0, dtype=np.int64)
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, id_: str) -> bool:
+        return id_ in self._id_rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size]
+
+    # ── building ─────────────────────────────────────────────────
+    def add(self, ids: Sequence[str], vectors: np.ndarray):
+        """Add or replace vectors. Existing ids are updated in place."""
+        vectors = _normalize(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if self._size == 0 and self._vectors.shape[1] != vectors.shape[1]:
+            self._vectors = np.empty((0, vectors.shape[1]), dtype=np.float32)
+
+        new_rows = []
+        for id_, vec in zip(ids, vectors):
+            row = self._id_rows.get(id_)
+            if row is not None:
+                self._vectors[row] = vec
+                if self._centroids is not None:
+                    self._assign[row] = self._nearest_centroid(vec[None])[0]
+            else:
+                new_rows.append((id_, vec))
+        if not new_rows:
+            return
+
+        # Amortised growth, like a list
+        needed = self._size + len(new_rows)
+        if needed > len(self._vectors):
+            grown = np.empty((max(needed, 2 * len(self._vectors), 64), self._vectors.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        for id_, vec in new_rows:
+            self._id_rows[id_] = self._size
+            self.ids.append(id_)
+            self._vectors[self._size] = vec
+            self._size += 1
+
+        if self._centroids is not None:
+            added = self._vectors[needed - len(new_rows):needed]
+            self._assign = np.concatenate([self._assign, self._nearest_centroid(added)])
+            # Centroids drift as the index doubles; retrain rather than degrade recall
+            if self._size > 2 * self._trained_size:
+                self.train()
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1)
+
+    def train(self, seed: int = 0):
+        """(Re)build the IVF buckets with spherical k-means."""
+        data = self.vectors
+        if len(data) == 0:
+            return
+        nlist = self.nlist or max(1, int(np.sqrt(len(data))))
+        nlist = min(nlist, len(data))
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERS):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, data)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+        self._centroids = centroids
+        self._assign = np.argmax(data @ centroids.T, axis=1)
+        self._trained_size = len(data)
+
+    # ── searching ────────────────────────────────────────────────
+    def search(self, queries: np.ndarray, k: int = 10, mode: str = "auto") -> List[List[Tuple[str, float]]]:
+        """
+        Batched top-k cosine search.
+
+        Args:
+            queries: (q, dim) array (a single vector is accepted too).
+            k: Results per query.
+            mode: 'exact', 'approx' or 'auto' (approx above APPROX_THRESHOLD).
+
+        Returns:
+            One list of (id, score) per query, best first.
+        """
+        queries = _normalize(queries)
+        if self._size == 0:
+            return [[] for _ in range(len(queries))]
+        if mode == "auto":
+            mode = "approx" if self._size > APPROX_THRESHOLD else "exact"
+        if mode == "approx":
+            return self._search_approx(queries, k)
+        if mode != "exact":
+            raise ValueError(f"Unknown search mode '{mode}'")
+
+        scores = queries @ self.vectors.T
+        top = _top_k(scores, k)
+        return [[(self.ids[j], float(scores[i, j])) for j in row] for i, row in enumerate(top)]
+
+    def search_among(self, queries: np.ndarray, ids: Iterable[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Exact top-k cosine search over the given ids only (ids not in the index are skipped).
+
+        Costs (queries x len(ids)) whatever the size of the index, and never
+        drops an id the way an IVF probe can.
+        """
+        queries = _normalize(queries)
+        rows = np.fromiter(dict.fromkeys(self._id_rows[id_] for id_ in ids if id_ in self._id_rows),
+                           dtype=np.int64)
+        if len(rows) == 0:
+            return [[] for _ in range(len(queries))]
+        scores = queries @ self._vectors[rows].T
+        top = _top_k(scores, k)
+        return [[(self.ids[rows[j]], float(scores[i, j])) for j in row] for i, row in enumerate(top)]
+
+    def _search_approx(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        if self._centroids is None:
+            self.train()
+        nprobe = min(self.nprobe, len(self._centroids))
+        probes = _top_k(queries @ self._centroids.T, nprobe)
+        results = []
+        for query, buckets in zip(queries, probes):
+            rows = np.flatnonzero(np.isin(self._assign, buckets))
+            scores = self.vectors[rows] @ query
+            top = _top_k(scores[None], k)[0]
+            results.append([(self.ids[rows[j]], float(scores[j])) for j in top])
+        return results
+
+    # ── persistence ──────────────────────────────────────────────
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+        centroids_path = os.path.join(path, "centroids.npy")
+        if self._centroids is not None:
+            np.save(centroids_path, self._centroids)
+        elif os.path.exists(centroids_path):
+            os.remove(centroids_path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "VectorIndex":
+        """Load a saved index; returns an empty one if nothing is stored at path."""
+        index = cls(**kwargs)
+        vectors_path = os.path.join(path, "vectors.npy")
+        if not os.path.exists(vectors_path):
+            return index
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            ids = json.load(f)
+        vectors = np.load(vectors_path)
+        if len(ids):
+            index.add(ids, vectors)
+        centroids_path = os.path.join(path, "centroids.npy")
+        if os.path.exists(centroids_path) and len(ids):
+            index._centroids = np.load(centroids_path)
+            index._assign = index._nearest_centroid(index.vectors)
+            index._trained_size = len(index)
+        return index
+
+
+def aggregate_max(results: Iterable[List[Tuple[str, float]]]) -> List[Tuple[str, float]]:
+    """Merge per-query results, keeping each id's best score, sorted best first."""
+    best: Dict[str, float] = {}
+    for hits in results:
+        for id_, score in hits:
+            if score > best.get(id_, -np.inf):
+                best[id_] = score
+    return sorted(best.items(), key=lambda item: item[1], reverse=True)
@@ -1,12 +1,25 @@
-from typing import List
+from typing import Dict, List, Optional
 from sentence_transformers import SentenceTransformer
 import requests
 import numpy as np
 from collections import defaultdict
-from certificate import sign
-import json
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+import threading
+import time
+from certificate import DEFAULT_COMMITMENT, SIGNING_ALGORITHM, sign_many
+from embedding_cache import EmbeddingCache
 import click
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+CHUNK_TOKENS = 200      # MiniLM truncates at 256 word pieces; leave room for special tokens
+CHUNK_OVERLAP = 50
+MAX_CHUNKS = 64         # per document, sampled evenly across long pages
+FETCH_TIMEOUT = 10
+FETCH_WORKERS = 8       # bounded pool shared by source pages and forward links
+SCORE_THRESHOLD = 0.1
+
 # --------------------
 # Utility Functions
 # --------------------
@@ -23,43 +36,233 @@ def get_embedding(text, model):
     """Get sentence embedding for the text"""
     return model.encode(text)
 
-def similarity(a, b):
+@lru_cache(maxsize=1)
+def get_model():
+    """Load the sentence-transformer once per process"""
+    return SentenceTransformer(MODEL_NAME)
+
+@lru_cache(maxsize=1)
+def get_embedding_cache():
+    """On-disk embedding cache shared by every similarity call"""
+    return EmbeddingCache(MODEL_NAME)
+
+def get_embeddings(texts: List[str]) -> np.ndarray:
+    """Embed a batch of texts, reusing cached vectors and encoding only the misses"""
+    model = get_model()
+    return get_embedding_cache().get_or_compute(texts, lambda batch: model.encode(batch))
+
+def chunk_text(text: str, model=None, window: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP,
+               max_chunks: int = MAX_CHUNKS) -> List[str]:
+    """
+    Split text into overlapping token windows that fit the model's input
+
+    Uses the model's own tokenizer when available, else whitespace tokens.
+    Very long documents keep `max_chunks` windows spread evenly across the text.
+    """
+    tokenizer = getattr(model, 'tokenizer', None)
+    if tokenizer is not None:
+        tokens = tokenizer.tokenize(text)
+        join = tokenizer.convert_tokens_to_string
+    else:
+        tokens = text.split()
+        join = ' '.join
+
+    step = max(window - overlap, 1)
+    starts = list(range(0, max(len(tokens) - overlap, 1), step))
+    if len(starts) > max_chunks:
+        starts = [starts[i] for i in np.linspace(0, len(starts) - 1, max_chunks).astype(int)]
+    return [join(tokens[i:i + window]) for i in starts]
+
+def chunked_similarity(a, b, pool: str = 'max'):
+    """
+    Cosine similarity over chunk pairs instead of the truncated whole documents
+
+    Both documents are chunked and embedded in one batch; the score pools the
+    full chunk-pair cosine matrix, computed with a single matrix multiply.
+
+    Args:
+        a (str): First text.
+        b (str): Second text.
+        pool (str): 'max' (best matching chunk pair) or 'mean' (average over all pairs).
+    """
+    model = get_model()
+    chunks_a = chunk_text(a, model)
+    chunks_b = chunk_text(b, model)
+
+    embeddings = get_embeddings(chunks_a + chunks_b)
+    embeddings = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    scores = embeddings[:len(chunks_a)] @ embeddings[len(chunks_a):].T
+
+    if pool == 'max':
+        return float(scores.max())
+    if pool == 'mean':
+        return float(scores.mean())
+    raise ValueError(f"Unknown pooling '{pool}'")
+
+def similarity(a, b, chunked: bool = False, pool: str = 'max'):
     """Calculate cosine similarity between two texts using sentence embeddings"""
-    # Initialize model
-    model = SentenceTransformer('all-MiniLM-L6-v2')
-    
-    # Get embeddings
-    embedding_a = get_embedding(a, model)
-    embedding_b = get_embedding(b, model)
+    if chunked:
+        return chunked_similarity(a, b, pool)
+
+    # Get embeddings (cached by content hash, so a source page is encoded once)
+    embedding_a, embedding_b = get_embeddings([a, b])
     
     # Calculate cosine similarity
     similarity_score = np.dot(embedding_a, embedding_b) / (np.linalg.norm(embedding_a) * np.linalg.norm(embedding_b))
     return similarity_score
 
-def get_certificates(external_links: dict[str, list[str]]) -> dict[str, str]:
+# --------------------
+# Verification results
+# --------------------
+@dataclass
+class LinkResult:
+    """Outcome of checking a single forward link"""
+    url: str
+    status: str                 # "success" | "fail" | "error"
+    score: Optional[float] = None
+    elapsed: float = 0.0        # seconds spent fetching and scoring this link
+    message: str = ""
+
+@dataclass
+class VerificationResult:
+    """Aggregated outcome for one source URL and its forward links"""
+    source_url: str
+    status: str                 # "success" only if every forward link verified
+    message: str
+    links: List[LinkResult] = field(default_factory=list)
+    elapsed: float = 0.0        # wall time for the whole source URL
+
+    @property
+    def verified_links(self) -> List[str]:
+        return [link.url for link in self.links if link.status == "success"]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+def score_link(source_text: str, link_text: str) -> float:
+    """Relevance score between the source page and a forward link"""
+    return similarity(source_text, link_text, chunked=True)
+
+# --------------------
+# Verification engine
+# --------------------
+class VerificationEngine:
+    """
+    Verifies forward links concurrently with a bounded fetch pool
+
+    Each source page is downloaded once no matter how many forward links
+    point at it; forward links are fetched and scored in parallel.
+
+    Args:
+        max_workers (int): Maximum number of concurrent HTTP fetches.
+        timeout (float): Per-request timeout in seconds.
+        threshold (float): Minimum score for a forward link to verify.
+    """
+
+    def __init__(self, max_workers: int = FETCH_WORKERS, timeout: float = FETCH_TIMEOUT,
+                 threshold: float = SCORE_THRESHOLD):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.threshold = threshold
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # requests.Session is not guaranteed thread-safe, so keep one per worker
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def fetch_text(self, url: str) -> str:
+        response = self._session().get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return normalize(response.text)
+
+    def _verify_link(self, source: Future, link: str) -> LinkResult:
+        start = time.perf_counter()
+        try:
+            link_text = self.fetch_text(link)
+            source_text = source.result()
+        except requests.RequestException as e:
+            return LinkResult(link, "error", elapsed=time.perf_counter() - start, message=str(e))
+
+        score = float(score_link(source_text, link_text))
+        elapsed = time.perf_counter() - start
+        if score < self.threshold:
+            return LinkResult(link, "fail", score, elapsed,
+                              f"Forward link not verified, because score is lower than {self.threshold}")
+        return LinkResult(link, "success", score, elapsed, "Forward link verified")
+
+    def verify_many(self, external_links: Dict[str, List[str]]) -> Dict[str, VerificationResult]:
+        """
+        Verify every (source URL, forward links) pair
+
+        Args:
+            external_links (dict[str, list[str]]): Source URL -> forward links to verify.
+
+        Returns:
+            dict[str, VerificationResult]: One aggregated result per source URL.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Sources are queued first, so a link task never waits on an unscheduled fetch
+            sources = {src: pool.submit(self.fetch_text, src) for src in external_links}
+            pending = {src: [pool.submit(self._verify_link, sources[src], link) for link in dict.fromkeys(links)]
+                       for src, links in external_links.items()}
+
+            results = {}
+            for src, futures in pending.items():
+                links = [f.result() for f in futures]
+                try:
+                    sources[src].result()
+                except requests.RequestException as e:
+                    results[src] = VerificationResult(src, "error", f"Source page could not be fetched: {e}",
+                                                      links, time.perf_counter() - start)
+                    continue
+                failed = [link for link in links if link.status != "success"]
+                if failed:
+                    message = f"{len(failed)}/{len(links)} forward links not verified"
+                    results[src] = VerificationResult(src, "fail", message, links, time.perf_counter() - start)
+                else:
+                    results[src] = VerificationResult(src, "success", "Forward link verified", links,
+                                                      time.perf_counter() - start)
+        return results
+
+def get_certificates(external_links: dict[str, list[str]], max_workers: int = FETCH_WORKERS,
+                     commitment: str = DEFAULT_COMMITMENT,
+                     algorithm: str = SIGNING_ALGORITHM) -> tuple[dict[str, list[str]], dict[str, dict]]:
     """
     Get the certificates for the external links
 
     Args:
         external_links (dict[str, str]): A dictionary of external links, where the key is the internal link and the value is the external link
+        max_workers (int): Maximum number of concurrent fetches while verifying
+        commitment (str): "hashes" or "merkle" (see certificate.Signer.issue)
+        algorithm (str): Signature algorithm, "rsa" or "ed25519"
 
     Returns:
-        dict[str, str]: A dictionary of certificates, where the key is the internal link and the value is the certificate
+        tuple: (certificates, proofs). certificates maps the internal link to its certificates;
+        proofs maps the internal link to {external link: Merkle inclusion proof} (empty in "hashes" mode)
     """
     certificates = defaultdict(list)
-    for internal_link, external_link in external_links.items():
-        verified_result = verify_forward_link(internal_link, external_link)
-
-        verified_result = json.loads(verified_result)
-        if verified_result["status"] == "success":
-            certificate, _ = sign(internal_link, external_link)
-            if certificate:
-                certificates[internal_link].append(certificate)
+    results = VerificationEngine(max_workers=max_workers).verify_many(external_links)
+    verified = []
+    for internal_link, result in results.items():
+        for link in result.links:
+            click.echo(f"{link.status:<8} score={link.score} {link.elapsed:.2f}s {link.url}")
+        if result.status == "success":
+            verified.append((internal_link, external_links[internal_link]))
         else:
-            click.echo(f"❌ Forward link not verified for {internal_link}")
-    return certificates
+            click.echo(f"❌ Forward link not verified for {internal_link}: {result.message}")
 
-def verify_forward_link(source_url: str, forward_link: list[str]):
+    # One batch with the cached signing key instead of a fresh key per link
+    proofs = {}
+    for issued in sign_many(verified, commitment, algorithm) if verified else []:
+        certificates[issued.url].append(issued.cert_pem)
+        if issued.proofs:
+            proofs[issued.url] = issued.proofs
+    return certificates, proofs
+
+def verify_forward_link(source_url: str, forward_link: list[str]) -> VerificationResult:
     """
     Verifies if a forward link is correctly mentioned for the source URL
 
@@ -74,25 +277,10 @@ def verify_forward_link(source_url: str, forward_link: list[str]):
         source_url (str): The URL of the source page containing the forward link.
         forward_link (list[str]): The forward link to verify.
 
-    Raises:
-        NotImplementedError: This function is a stub and needs implementation.
+    Returns:
+        VerificationResult: Overall status plus per-link scores and timings.
     """
-    llm_response = requests.get(source_url, timeout=10)
-    llm_response.raise_for_status()
-    llm_text = normalize(llm_response.text)
-
-    for link in forward_link:
-        forward_link_response = requests.get(link, timeout=10)
-        forward_link_response.raise_for_status()
-        forward_link_text = normalize(forward_link_response.text)
-
-        # score = similarity(llm_text, forward_link_text)
-        score = 0.3
-        print(f"Score: {score}, link: {link}")
-        if score < 0.1:
-            return f"""{"status": "fail", "message": "Forward link not verified, because score is lower than {score}"}"""
-
-    return """{"status": "success", "message": "Forward link verified"}"""
+    return VerificationEngine().verify_many({source_url: forward_link})[source_url]
 
 if __name__ == "__main__":
     result = verify_forward_link(source_url='https://www.purdueglobal.edu/blog/student-life/valuable-health-wellness-blogs/', forward_link=['https://www.acefitness.org/resources/pros/expert-articles/'])